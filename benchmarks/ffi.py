@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 Sebastian Wiesner <lunaryorn@gmail.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+
+"""
+    Benchmark the per-call overhead of the FFI backends of pyudev.
+
+    Run this script with ``python benchmarks/ffi.py``.  Backends, which are
+    not available, are skipped.
+
+    .. moduleauthor::  Sebastian Wiesner  <lunaryorn@gmail.com>
+"""
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from pyudev import Context
+from pyudev._util import udev_list_iterate
+from pyudev._libudev import BACKENDS, load_udev_library
+
+
+REPEAT = 5
+NUMBER = 20000
+
+
+def best_of(function, number=NUMBER):
+    """
+    Return the best time of a single call of ``function`` in microseconds.
+    """
+    return min(timeit.repeat(function, repeat=REPEAT,
+                             number=number)) / number * 1e6
+
+
+class Handle(object):
+    """
+    A libudev object, passed to libudev like pyudev objects.
+    """
+
+    def __init__(self, pointer):
+        self._as_parameter_ = pointer
+
+
+def benchmark(libudev, sys_path):
+    udev = Handle(libudev.udev_new())
+    device = Handle(libudev.udev_device_new_from_syspath(udev, sys_path))
+    get_sys_name = libudev.udev_device_get_sysname
+    get_property_value = libudev.udev_device_get_property_value
+    get_properties = libudev.udev_device_get_properties_list_entry
+
+    def sys_name():
+        get_sys_name(device)
+
+    def property_value():
+        get_property_value(device, b'DEVPATH')
+
+    def list_iteration():
+        for _ in udev_list_iterate(libudev, get_properties(device)):
+            pass
+    entries = sum(1 for _ in udev_list_iterate(libudev, get_properties(device)))
+    try:
+        return [('udev_device_get_sysname', best_of(sys_name)),
+                ('udev_device_get_property_value', best_of(property_value)),
+                ('properties list ({0} entries)'.format(entries),
+                 best_of(list_iteration, NUMBER // 10))]
+    finally:
+        libudev.udev_device_unref(device)
+        libudev.udev_unref(udev)
+
+
+def main():
+    context = Context()
+    device = next(iter(context.list_devices(subsystem='block')), None)
+    if device is None:
+        device = next(iter(context.list_devices()))
+    sys_path = device.sys_path.encode(sys.getfilesystemencoding())
+    for backend in BACKENDS:
+        try:
+            libudev = load_udev_library(backend)
+        except ImportError as error:
+            print('{0}: not available ({1})'.format(backend, error))
+            continue
+        for name, microseconds in benchmark(libudev, sys_path):
+            print('{0}: {1}: {2:.3f} us per call'.format(
+                backend, name, microseconds))
+
+
+if __name__ == '__main__':
+    main()
@@ -38,11 +38,60 @@
                         absolute_import)
 
 
+import sys
+
+
 __version__ = '0.17'
 __version_info__ = tuple(map(int, __version__.split('.')))
 __all__ = ['Context', 'Device']
 
 
-from pyudev.device import *
-from pyudev.core import *
-from pyudev.monitor import *
+# the public names of this package, and the modules defining them
+_LAZY_ATTRIBUTES = {
+    'Device': 'pyudev.device',
+    'Attributes': 'pyudev.device',
+    'Tags': 'pyudev.device',
+    'RawDevice': 'pyudev.device',
+    'DeviceNotFoundError': 'pyudev.device',
+    'DeviceNotFoundAtPathError': 'pyudev.device',
+    'DeviceNotFoundByNameError': 'pyudev.device',
+    'DeviceNotFoundByNumberError': 'pyudev.device',
+    'DeviceNotFoundInEnvironmentError': 'pyudev.device',
+    'udev_version': 'pyudev.core',
+    'live_handles': 'pyudev.core',
+    'HandleCounts': 'pyudev.core',
+    'Context': 'pyudev.core',
+    'Enumerator': 'pyudev.core',
+    'Monitor': 'pyudev.monitor',
+    'MonitorObserver': 'pyudev.monitor',
+}
+
+# the submodules defining these names, which "import pyudev" imported
+# eagerly before
+_LAZY_MODULES = frozenset(m.rpartition('.')[2]
+                          for m in _LAZY_ATTRIBUTES.values())
+
+
+if sys.version_info >= (3, 7):
+    # import submodules on first access of their names (PEP 562), to keep
+    # "import pyudev" cheap
+    from importlib import import_module
+
+    def __getattr__(name):
+        if name in _LAZY_MODULES:
+            # importing a submodule binds it in this package
+            return import_module('pyudev.' + name)
+        module_name = _LAZY_ATTRIBUTES.get(name)
+        if module_name is None:
+            raise AttributeError('module {0!r} has no attribute {1!r}'.format(
+                __name__, name))
+        value = getattr(import_module(module_name), name)
+        globals()[name] = value
+        return value
+
+    def __dir__():
+        return sorted(set(globals()) | set(_LAZY_ATTRIBUTES) | _LAZY_MODULES)
+else:
+    from pyudev.device import *
+    from pyudev.core import *
+    from pyudev.monitor import *
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 Sebastian Wiesner <lunaryorn@gmail.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+"""
+    pyudev._arrays
+    ==============
+
+    Internal helpers for typed, preallocated arrays.
+
+    NumPy is used if it is available, otherwise the arrays fall back to the
+    :mod:`array` module of the standard library.
+
+    .. moduleauthor::  Sebastian Wiesner  <lunaryorn@gmail.com>
+"""
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+from array import array
+from collections import namedtuple
+
+from pyudev._util import string_to_bool
+
+
+MaskedColumn = namedtuple('MaskedColumn', 'data mask')
+MaskedColumn.__doc__ = """
+A column of values with a mask of missing entries.
+
+``data`` is an :class:`array.array` (or a :func:`list` for string columns)
+holding the values.  ``mask`` is an :class:`array.array` of type ``'b'``,
+which is ``1`` for every missing value and ``0`` otherwise.  Missing values
+are ``0`` (or ``None`` in string columns) in ``data``.
+"""
+
+
+_INTEGER_TYPECODES = 'bBhHiIlLqQ'
+_FLOAT_TYPECODES = 'fd'
+
+
+def load_numpy():
+    """
+    Import and return :mod:`numpy`, or return ``None``, if numpy is not
+    available.
+
+    The import is deferred to the first call, to keep ``import pyudev`` free of
+    numpy.
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _converter_for_kind(kind):
+    """
+    Get a converter for values of the given ``kind``.
+
+    ``kind`` is one of ``'i'`` (integer), ``'f'`` (floating point), ``'b'``
+    (boolean) or ``'O'`` (unicode strings).
+    """
+    if kind == 'i':
+        return int
+    elif kind == 'f':
+        return float
+    elif kind == 'b':
+        return string_to_bool
+    else:
+        return None
+
+
+class ColumnBuilder(object):
+    """
+    Fill preallocated, typed columns row by row.
+
+    ``size`` is the number of rows.  ``names`` is a sequence of column names.
+    ``dtypes`` maps column names to types.  Types are either type codes of the
+    :mod:`array` module (e.g. ``'q'`` or ``'d'``), ``'?'`` for booleans, or –
+    if numpy is available – anything that :class:`numpy.dtype` accepts.
+    Columns without a type hold unicode strings.
+    """
+
+    def __init__(self, size, names, dtypes=None, numpy=None):
+        self.size = size
+        self.numpy = numpy
+        dtypes = dtypes or {}
+        self._data = {}
+        self._mask = {}
+        self._converters = {}
+        for name in names:
+            dtype = dtypes.get(name)
+            kind = self._kind(dtype)
+            self._converters[name] = _converter_for_kind(kind)
+            self._data[name] = self._allocate(kind, dtype)
+            if numpy is not None:
+                self._mask[name] = numpy.ones(size, dtype=bool)
+            else:
+                self._mask[name] = array(str('b'), [1]) * size
+
+    def _kind(self, dtype):
+        if dtype is None:
+            return 'O'
+        if self.numpy is not None:
+            kind = self.numpy.dtype(dtype).kind
+            return 'i' if kind == 'u' else kind
+        if dtype == '?':
+            return 'b'
+        if dtype in _INTEGER_TYPECODES:
+            return 'i'
+        if dtype in _FLOAT_TYPECODES:
+            return 'f'
+        raise ValueError('Invalid type code: {0!r}'.format(dtype))
+
+    def _allocate(self, kind, dtype):
+        size = self.size
+        if self.numpy is not None:
+            if kind == 'O':
+                return self.numpy.empty(size, dtype=object)
+            return self.numpy.zeros(size, dtype=dtype)
+        if kind == 'O':
+            return [None] * size
+        typecode = 'b' if kind == 'b' else dtype
+        return array(str(typecode), [0]) * size
+
+    def set(self, name, row, value):
+        """
+        Store the unicode string ``value`` in column ``name`` at ``row``.
+
+        ``value`` is converted to the type of the column.  If ``value`` is
+        ``None`` or cannot be converted, the entry is left masked.
+        """
+        if value is None:
+            return
+        converter = self._converters[name]
+        if converter is not None:
+            try:
+                value = converter(value)
+            except ValueError:
+                return
+        try:
+            self._data[name][row] = value
+        except OverflowError:
+            return
+        self._mask[name][row] = 0
+
+    def finish(self):
+        """
+        Return the filled columns as dictionary mapping column names to
+        masked columns.
+
+        With numpy the columns are :class:`numpy.ma.MaskedArray` objects,
+        otherwise :class:`MaskedColumn` tuples.
+        """
+        columns = {}
+        for name, data in self._data.items():
+            mask = self._mask[name]
+            if self.numpy is not None:
+                columns[name] = self.numpy.ma.MaskedArray(data, mask=mask)
+            else:
+                columns[name] = MaskedColumn(data, mask)
+        return columns
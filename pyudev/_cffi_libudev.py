@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 Sebastian Wiesner <lunaryorn@gmail.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+"""
+    pyudev._cffi_libudev
+    ====================
+
+    Wrapper types for libudev on top of :mod:`cffi`.
+
+    The wrapper provides the same interface as the :mod:`ctypes` wrapper in
+    :mod:`pyudev._libudev`:  Pointer arguments are taken from the
+    ``_as_parameter_`` attribute of pyudev objects, string results are
+    returned as byte strings or ``None``, and functions raise the same
+    exceptions on errors.
+
+    The library is loaded in ABI mode, so no C compiler is required.
+
+    .. moduleauthor::  Sebastian Wiesner  <lunaryorn@gmail.com>
+"""
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+from ctypes import c_char, c_char_p, c_int, c_ulonglong
+
+from cffi import FFI
+
+from pyudev._libudev import (PROTOTYPES, ERROR_CHECKERS,
+                             check_negative_errorcode, check_errno,
+                             check_errno_on_null_pointer, exception_from_errno,
+                             udev_p, udev_enumerate_p, udev_list_entry_p,
+                             udev_device_p, udev_monitor_p)
+
+
+__all__ = ['CffiUdevLibrary']
+
+
+C_TYPES = {
+    udev_p: 'struct udev *',
+    udev_enumerate_p: 'struct udev_enumerate *',
+    udev_list_entry_p: 'struct udev_list_entry *',
+    udev_device_p: 'struct udev_device *',
+    udev_monitor_p: 'struct udev_monitor *',
+    c_char_p: 'const char *',
+    c_char: 'char',
+    c_int: 'int',
+    c_ulonglong: 'unsigned long long',
+    None: 'void',
+}
+
+POINTER_TYPES = frozenset([udev_p, udev_enumerate_p, udev_list_entry_p,
+                           udev_device_p, udev_monitor_p])
+
+
+def make_cdef():
+    """
+    Create the declarations of all functions in
+    :data:`~pyudev._libudev.SIGNATURES` for :meth:`cffi.FFI.cdef()`.
+
+    Return the declarations as string.
+    """
+    lines = ['struct udev;', 'struct udev_enumerate;',
+             'struct udev_list_entry;', 'struct udev_device;',
+             'struct udev_monitor;']
+    for name, (argtypes, restype) in sorted(PROTOTYPES.items()):
+        arguments = ', '.join(C_TYPES[a] for a in argtypes) or 'void'
+        lines.append('{0} {1}({2});'.format(C_TYPES[restype], name,
+                                            arguments))
+    return '\n'.join(lines)
+
+
+ffi = FFI()
+ffi.cdef(make_cdef())
+
+
+def _check_errno(result, func, *args):
+    # like check_errno, but with the errno saved by cffi
+    if result != 0:
+        errno = ffi.errno
+        if errno != 0:
+            raise exception_from_errno(errno)
+    return result
+
+
+def _check_errno_on_null_pointer(result, func, *args):
+    # like check_errno_on_null_pointer, but with the errno saved by cffi
+    if not result:
+        errno = ffi.errno
+        if errno != 0:
+            raise exception_from_errno(errno)
+    return result
+
+
+CFFI_ERROR_CHECKERS = {
+    check_negative_errorcode: check_negative_errorcode,
+    check_errno: _check_errno,
+    check_errno_on_null_pointer: _check_errno_on_null_pointer,
+}
+
+
+def _wrap_function(name, function, argtypes, restype, errorchecker):
+    """
+    Wrap the cffi ``function`` called ``name`` to accept and return the same
+    values as the ctypes function with ``argtypes`` and ``restype``.
+
+    The wrapper is compiled from source for the exact signature of the
+    function, to avoid the overhead of generic argument handling and nested
+    wrappers on every call.
+    """
+    parameters = ['a{0}'.format(i) for i in range(len(argtypes))]
+    arguments = []
+    for parameter, argtype in zip(parameters, argtypes):
+        if argtype in POINTER_TYPES:
+            # pyudev objects pass their pointer in _as_parameter_, check
+            # for plain pointers first, because a failing getattr() is slow.
+            # Like ctypes, accept None as NULL pointer
+            arguments.append("{0} if isinstance({0}, cdata) else "
+                             "null if {0} is None else "
+                             "getattr({0}, '_as_parameter_', {0})".format(
+                                 parameter))
+        elif argtype is c_char_p:
+            # cffi does not accept None for string arguments
+            arguments.append('null if {0} is None else {0}'.format(
+                parameter))
+        else:
+            arguments.append(parameter)
+    lines = ['def {0}({1}):'.format(name, ', '.join(parameters)),
+             '    result = function({0})'.format(', '.join(arguments))]
+    if restype is c_char_p:
+        lines.append('    result = string(result) if result else None')
+    if errorchecker is not None:
+        lines.append('    return errorchecker(result, function, ({0}))'.format(
+            ''.join(p + ', ' for p in parameters)))
+    else:
+        lines.append('    return result')
+    namespace = dict(function=function, null=ffi.NULL, string=ffi.string,
+                     cdata=ffi.CData,
+                     errorchecker=CFFI_ERROR_CHECKERS.get(errorchecker))
+    exec(compile('\n'.join(lines), '<{0}>'.format(name), 'exec'), namespace)
+    return namespace[name]
+
+
+class CffiUdevLibrary(object):
+    """
+    The ``udev`` library loaded with :mod:`cffi`.
+
+    Like :class:`~pyudev._libudev.UdevLibrary`, functions are wrapped on
+    first access, and then stored as attributes of this object.  Only
+    functions declared in :data:`~pyudev._libudev.SIGNATURES` are available.
+    """
+
+    def __init__(self, library_name):
+        self._library = ffi.dlopen(library_name)
+
+    # Walking lists.  libudev has no function returning a whole list, so
+    # in ABI mode each entry still takes a native call, but these methods
+    # call the functions of the library directly, without the wrappers.
+    # Lists, which are not cdata, e.g. mocked lists in tests, are left to
+    # the generic functions in pyudev._util, by returning None.
+
+    def list_entries(self, entry):
+        """
+        Read all ``(name, value)`` pairs of the udev list starting at
+        ``entry``, like :func:`~pyudev._util.udev_list_entries()`.
+        """
+        if not isinstance(entry, ffi.CData):
+            return None
+        library = self._library
+        get_name = library.udev_list_entry_get_name
+        get_value = library.udev_list_entry_get_value
+        get_next = library.udev_list_entry_get_next
+        string = ffi.string
+        items = []
+        append = items.append
+        while entry:
+            name = get_name(entry)
+            value = get_value(entry)
+            append((string(name) if name else None,
+                    string(value) if value else None))
+            entry = get_next(entry)
+        return items
+
+    def list_names(self, entry):
+        """
+        Read all names of the udev list starting at ``entry``, like
+        :func:`~pyudev._util.udev_list_names()`.
+        """
+        if not isinstance(entry, ffi.CData):
+            return None
+        library = self._library
+        get_name = library.udev_list_entry_get_name
+        get_next = library.udev_list_entry_get_next
+        string = ffi.string
+        names = []
+        append = names.append
+        while entry:
+            name = get_name(entry)
+            append(string(name) if name else None)
+            entry = get_next(entry)
+        return names
+
+    def list_length(self, entry):
+        """
+        Count the entries of the udev list starting at ``entry``, like
+        :func:`~pyudev._util.udev_list_length()`.
+        """
+        if not isinstance(entry, ffi.CData):
+            return None
+        get_next = self._library.udev_list_entry_get_next
+        length = 0
+        while entry:
+            length += 1
+            entry = get_next(entry)
+        return length
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        prototype = PROTOTYPES.get(name)
+        if prototype is None:
+            raise AttributeError(name)
+        # raises AttributeError, if the library lacks this function
+        function = getattr(self._library, name)
+        argtypes, restype = prototype
+        function = _wrap_function(name, function, argtypes, restype,
+                                  ERROR_CHECKERS.get(name))
+        setattr(self, name, function)
+        return function
@@ -32,9 +32,9 @@
 
 import os
 import errno
+from threading import Lock
 from ctypes import (CDLL, Structure, POINTER, get_errno,
                     c_char, c_char_p, c_int, c_ulonglong)
-from ctypes.util import find_library
 
 
 class udev(Structure):
@@ -257,30 +257,131 @@ def check_errno_on_null_pointer(result, func, *args):
 )
 
 
-def load_udev_library():
+class UdevLibrary(object):
     """
-    Load the ``udev`` library and return a :class:`ctypes.CDLL` object for
-    it.  The library has errno handling enabled.
+    The loaded ``udev`` library.
+
+    Functions of the library are looked up on first access, given their
+    signature from :data:`SIGNATURES` and their error checker from
+    :data:`ERROR_CHECKERS`, and then stored as attribute of this object, so
+    that later accesses are plain attribute lookups.
+
+    Accessing a function, which the library does not provide, raises
+    :exc:`~exceptions.AttributeError`.
+    """
+
+    def __init__(self, library):
+        self._library = library
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        function = getattr(self._library, name)
+        prototype = PROTOTYPES.get(name)
+        if prototype is not None:
+            function.argtypes, function.restype = prototype
+            errorchecker = ERROR_CHECKERS.get(name)
+            if errorchecker:
+                function.errcheck = errorchecker
+        # only publish the function after it is completely configured, as
+        # other threads may access it concurrently
+        setattr(self, name, function)
+        return function
+
+
+#: Signatures of all functions by their full name
+PROTOTYPES = dict(('{0}_{1}'.format(namespace, funcname), signature)
+                  for namespace, members in SIGNATURES.items()
+                  for funcname, signature in members.items())
+
+
+#: The backends calling the real libudev, in order of preference
+BACKENDS = ('cffi', 'ctypes')
+
+_libraries = {}
+_libraries_lock = Lock()
+
+#: The enabled :class:`~pyudev.instrumentation.Instrumentation`, or ``None``
+instrumentation = None
+
+
+def load_udev_library(backend=None):
+    """
+    Load the ``udev`` library and return a library object for it.  The
+    library has errno handling enabled.
 
     Important functions are given proper signatures and return types to
     support type checking and argument conversion.
 
-    Raise :exc:`~exceptions.ImportError`, if the udev library was not found.
+    ``backend`` is the name of the FFI used to call libudev, either
+    ``'cffi'`` or ``'ctypes'``.  If ``None``, :mod:`cffi` is used if it is
+    installed, and :mod:`ctypes` otherwise.  Pass ``'ctypes'`` to use
+    :mod:`ctypes` even if :mod:`cffi` is installed.  The ``ctypes`` backend
+    returns a
+    :class:`UdevLibrary`, the ``cffi`` backend a
+    :class:`~pyudev._cffi_libudev.CffiUdevLibrary`, which provides the same
+    interface.  The ``'sysfs'`` backend does not use libudev at all, but
+    returns a :class:`~pyudev.sysfs.SysfsUdevLibrary`, which is never chosen
+    automatically.
+
+    The library is only loaded once per process and backend, later calls
+    return the same object.  If instrumentation is enabled (see
+    :func:`pyudev.instrumentation.enable()`), the library object is wrapped
+    to record all calls.
+
+    Raise :exc:`~exceptions.ImportError`, if the udev library was not found,
+    or if the ``cffi`` backend was requested, but :mod:`cffi` is not
+    installed.  Raise :exc:`~exceptions.ValueError`, if ``backend`` is
+    unknown.
+
+    .. versionchanged:: 0.17
+       Load the library only once, bind functions on first use, add
+       ``backend``, and support instrumentation.
     """
-    udev_library_name = find_library('udev')
-    if not udev_library_name:
-        raise ImportError('No library named udev')
-    libudev = CDLL(udev_library_name, use_errno=True)
-    # context function signature
-    for namespace, members in SIGNATURES.items():
-        for funcname in members:
-            fullname = '{0}_{1}'.format(namespace, funcname)
-            func = getattr(libudev, fullname, None)
-            if func:
-                argtypes, restype = members[funcname]
-                func.argtypes = argtypes
-                func.restype = restype
-                errorchecker = ERROR_CHECKERS.get(fullname)
-                if errorchecker:
-                    func.errcheck = errorchecker
+    libudev = _libraries.get(backend)
+    if libudev is None:
+        with _libraries_lock:
+            libudev = _load_udev_library(backend)
+    if instrumentation is not None:
+        return instrumentation.wrap(libudev)
     return libudev
+
+
+def _load_udev_library(backend):
+    libudev = _libraries.get(backend)
+    if libudev is not None:
+        return libudev
+    if backend is None:
+        for candidate in BACKENDS:
+            try:
+                libudev = _load_udev_library(candidate)
+            except _BackendUnavailable:
+                continue
+            break
+    elif backend == 'sysfs':
+        from pyudev.sysfs import SysfsUdevLibrary
+        libudev = SysfsUdevLibrary()
+    elif backend not in BACKENDS:
+        raise ValueError('Unknown backend: {0!r}'.format(backend))
+    else:
+        # ctypes.util imports subprocess, so import it only when needed
+        from ctypes.util import find_library
+        udev_library_name = find_library('udev')
+        if not udev_library_name:
+            raise ImportError('No library named udev')
+        if backend == 'cffi':
+            try:
+                from pyudev._cffi_libudev import CffiUdevLibrary
+            except ImportError as error:
+                raise _BackendUnavailable(error)
+            libudev = CffiUdevLibrary(udev_library_name)
+        else:
+            libudev = UdevLibrary(CDLL(udev_library_name, use_errno=True))
+    _libraries[backend] = libudev
+    return libudev
+
+
+class _BackendUnavailable(ImportError):
+    """
+    The Python module required by a backend is not installed.
+    """
@@ -32,6 +32,8 @@
 import os
 import sys
 import stat
+import time
+from threading import Lock
 
 
 if sys.version_info[0] == 2:
@@ -40,6 +42,59 @@
     text_type = str
 
 
+#: A monotonic clock, or the wall clock on Python versions without monotonic
+#: clock
+monotonic = getattr(time, 'monotonic', time.time)
+
+
+#: The filesystem encoding, which cannot change at runtime, and is thus
+#: looked up only once
+filesystem_encoding = sys.getfilesystemencoding()
+
+
+#: The :class:`~pyudev.interning.InternTable` shared by all decoded and
+#: encoded strings, or ``None``, if interning is disabled, which is the
+#: default.  Managed by :mod:`pyudev.interning`
+interning = None
+
+
+#: The number of live native handles by kind, see
+#: :func:`pyudev.live_handles()`
+handle_counts = dict(contexts=0, enumerators=0, devices=0, monitors=0)
+_handle_counts_lock = Lock()
+
+
+def acquire_handle(kind):
+    """
+    Count a new native handle of the given ``kind``, which is a key of
+    :data:`handle_counts`.
+    """
+    with _handle_counts_lock:
+        handle_counts[kind] += 1
+
+
+def release_handle(kind):
+    """
+    Count the release of a native handle of the given ``kind``.
+    """
+    with _handle_counts_lock:
+        handle_counts[kind] -= 1
+
+
+class ClosedLibrary(object):
+    """
+    Replaces the libudev library of a closed object, to raise
+    :exc:`~exceptions.ValueError` on any further use of the object, instead
+    of passing a released pointer to libudev.
+    """
+
+    def __init__(self, kind):
+        self.kind = kind
+
+    def __getattr__(self, name):
+        raise ValueError('{0} is closed'.format(self.kind))
+
+
 def ensure_byte_string(value):
     """
     Return the given ``value`` as bytestring.
@@ -49,7 +104,11 @@ def ensure_byte_string(value):
     :func:`sys.getfilesystemencoding()`).
     """
     if not isinstance(value, bytes):
-        value = value.encode(sys.getfilesystemencoding())
+        table = interning
+        if table is None:
+            value = value.encode(filesystem_encoding)
+        else:
+            value = table.encode(value)
     return value
 
 
@@ -62,10 +121,29 @@ def ensure_unicode_string(value):
     :func:`sys.getfilesystemencoding()`).
     """
     if not isinstance(value, text_type):
-        value = value.decode(sys.getfilesystemencoding())
+        table = interning
+        if table is None:
+            value = value.decode(filesystem_encoding)
+        else:
+            value = table.decode(value)
     return value
 
 
+def intern_strings(strings):
+    """
+    Share the given unicode ``strings``, which were decoded by other means
+    than :func:`ensure_unicode_string`, through the current
+    :class:`~pyudev.interning.InternTable`.
+
+    Return a list of unicode strings.
+    """
+    table = interning
+    if table is None:
+        return list(strings)
+    intern = table.intern
+    return [intern(s) for s in strings]
+
+
 def property_value_to_bytes(value):
     """
     Return a byte string, which represents the given ``value`` in a way
@@ -115,6 +193,89 @@ def udev_list_iterate(libudev, entry):
         entry = libudev.udev_list_entry_get_next(entry)
 
 
+def _walk_natively(libudev, method, entry):
+    """
+    Walk the udev list starting at ``entry`` with the given ``method`` of
+    ``libudev``, if the library provides it.
+
+    Return the result of the method, or ``None``, if the library cannot walk
+    this list itself.
+    """
+    # look at the class, because mocked libraries have any attribute, and
+    # wrappers like instrumentation do not provide these methods, so that
+    # every call is recorded
+    walk = getattr(type(libudev), method, None)
+    if walk is None:
+        return None
+    return walk(libudev, entry)
+
+
+def udev_list_entries(libudev, entry):
+    """
+    Read all name/value pairs of a udev list at once.
+
+    Like :func:`udev_list_iterate()`, but return a list of all ``(name,
+    value)`` tuples.  The list is read in one tight loop, with the libudev
+    functions looked up only once, which is considerably faster than
+    iterating with :func:`udev_list_iterate()`.
+
+    If ``libudev`` can walk lists itself, like
+    :class:`~pyudev._cffi_libudev.CffiUdevLibrary`, the list is read by the
+    library object, without the overhead of its function wrappers.
+    """
+    items = _walk_natively(libudev, 'list_entries', entry)
+    if items is not None:
+        return items
+    get_name = libudev.udev_list_entry_get_name
+    get_value = libudev.udev_list_entry_get_value
+    get_next = libudev.udev_list_entry_get_next
+    items = []
+    append = items.append
+    while entry:
+        append((get_name(entry), get_value(entry)))
+        entry = get_next(entry)
+    return items
+
+
+def udev_list_names(libudev, entry):
+    """
+    Read all names of a udev list at once.
+
+    Like :func:`udev_list_entries()`, but return a list of the names only,
+    as bytestrings.  Values are not read at all, which saves a call into
+    libudev per entry for lists whose values are not needed, like lists of
+    devices, links, tags or attributes.
+    """
+    names = _walk_natively(libudev, 'list_names', entry)
+    if names is not None:
+        return names
+    get_name = libudev.udev_list_entry_get_name
+    get_next = libudev.udev_list_entry_get_next
+    names = []
+    append = names.append
+    while entry:
+        append(get_name(entry))
+        entry = get_next(entry)
+    return names
+
+
+def udev_list_length(libudev, entry):
+    """
+    Count the entries of a udev list, without reading names or values.
+
+    Return the number of entries as integer.
+    """
+    length = _walk_natively(libudev, 'list_length', entry)
+    if length is not None:
+        return length
+    get_next = libudev.udev_list_entry_get_next
+    length = 0
+    while entry:
+        length += 1
+        entry = get_next(entry)
+    return length
+
+
 # for the sake of readability
 _is_char_device = stat.S_ISCHR
 _is_block_device = stat.S_ISBLK
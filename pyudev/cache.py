@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 Sebastian Wiesner <lunaryorn@gmail.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+"""
+    pyudev.cache
+    ============
+
+    Caching of enumeration results.
+
+    .. moduleauthor::  Sebastian Wiesner  <lunaryorn@gmail.com>
+"""
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+from fnmatch import fnmatchcase
+from threading import Lock
+from collections import namedtuple
+
+from pyudev._util import (ensure_unicode_string, property_value_to_bytes,
+                          monotonic)
+
+
+__all__ = ['EnumerationCache', 'MatchKey']
+
+
+MatchKey = namedtuple('MatchKey', 'subsystem sys_name tag parent attributes '
+                      'is_initialized properties')
+MatchKey.__doc__ = """
+The normalised filters of a cached enumeration.
+
+``subsystem``, ``sys_name`` and ``tag`` are unicode strings or ``None``.
+``parent`` is the :attr:`~pyudev.Device.device_path` of the parent device or
+``None``.  ``attributes`` and ``properties`` are sorted tuples of ``(name,
+value)`` pairs, where ``value`` is a byte string as passed to libudev.
+``is_initialized`` is a boolean.
+"""
+
+
+def _normalise_matches(matches):
+    if not matches:
+        return ()
+    return tuple(sorted((ensure_unicode_string(name),
+                         property_value_to_bytes(value))
+                        for name, value in matches.items()))
+
+
+def _optional_unicode(value):
+    return None if value is None else ensure_unicode_string(value)
+
+
+class _CacheEntry(object):
+    """
+    The result of a single cached enumeration.
+    """
+
+    def __init__(self, devices, expires, last_used):
+        self.devices = devices
+        self.device_paths = frozenset(d.device_path for d in devices)
+        self.expires = expires
+        self.last_used = last_used
+
+
+class EnumerationCache(object):
+    """
+    A cache for the results of device enumerations.
+
+    Each enumeration is keyed by its normalised filters (see
+    :class:`MatchKey`).  Cached results expire after ``ttl`` seconds, and at
+    most ``maxsize`` results are kept, evicting the least recently used ones:
+
+    >>> from pyudev import Context
+    >>> from pyudev.cache import EnumerationCache
+    >>> context = Context()
+    >>> cache = EnumerationCache(context, ttl=5)
+    >>> cache.list_devices(subsystem='block')
+    (Device(u'/sys/devices/pci0000:00/0000:00:1f.2/host0/target0:0:0/0:0:0:0/block/sda'), ...)
+
+    An attached :class:`~pyudev.Monitor` keeps the cache up to date.  Each
+    event only invalidates those results, which contain the device of the
+    event, or whose filters could match the device:
+
+    >>> monitor = Monitor.from_netlink(context)
+    >>> observer = cache.attach(monitor)
+
+    .. versionadded:: 0.17
+    """
+
+    def __init__(self, context, ttl=1.0, maxsize=128):
+        """
+        Create a new cache for enumerations in the given ``context``.
+
+        ``ttl`` is the number of seconds a result is cached, as number, or
+        ``None`` to cache results until they are invalidated.  ``maxsize`` is
+        the maximum number of cached results as integer.
+        """
+        if maxsize < 1:
+            raise ValueError('Invalid maxsize: {0!r}'.format(maxsize))
+        self.context = context
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = {}
+        self._lock = Lock()
+        self._tick = 0
+        # incremented on every invalidation, to not cache results of
+        # enumerations which ran concurrently to an invalidation
+        self._generation = 0
+
+    def __len__(self):
+        """
+        Return the number of cached results.
+        """
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(subsystem=None, sys_name=None, tag=None, parent=None,
+                 attributes=None, is_initialized=False, **properties):
+        """
+        Normalise the given filters into a :class:`MatchKey`.
+
+        The arguments are the same as for :meth:`list_devices()`.
+        """
+        return MatchKey(_optional_unicode(subsystem),
+                        _optional_unicode(sys_name),
+                        _optional_unicode(tag),
+                        None if parent is None else parent.device_path,
+                        _normalise_matches(attributes),
+                        bool(is_initialized),
+                        _normalise_matches(properties))
+
+    def _enumerate(self, key, parent):
+        enumerator = self.context.list_devices()
+        if key.subsystem is not None:
+            enumerator.match_subsystem(key.subsystem)
+        if key.sys_name is not None:
+            enumerator.match_sys_name(key.sys_name)
+        if key.tag is not None:
+            enumerator.match_tag(key.tag)
+        if parent is not None:
+            enumerator.match_parent(parent)
+        for attribute, value in key.attributes:
+            enumerator.match_attribute(attribute, value)
+        for property, value in key.properties:
+            enumerator.match_property(property, value)
+        if key.is_initialized:
+            enumerator.match_is_initialized()
+        return tuple(enumerator)
+
+    def list_devices(self, subsystem=None, sys_name=None, tag=None,
+                     parent=None, attributes=None, is_initialized=False,
+                     **properties):
+        """
+        List all devices matching the given filters, and cache the result.
+
+        ``subsystem``, ``sys_name``, ``tag``, ``parent`` and ``properties``
+        are interpreted like the keyword arguments of
+        :meth:`pyudev.Enumerator.match()`.  ``attributes`` is a dictionary
+        mapping attribute names to values, each passed to
+        :meth:`~pyudev.Enumerator.match_attribute()`.  If ``is_initialized``
+        is ``True``, only initialized devices are included (see
+        :meth:`~pyudev.Enumerator.match_is_initialized()`).
+
+        Return a tuple of :class:`~pyudev.Device` objects.
+        """
+        key = self.make_key(subsystem, sys_name, tag, parent, attributes,
+                            is_initialized, **properties)
+        now = monotonic()
+        with self._lock:
+            self._tick += 1
+            entry = self._entries.get(key)
+            if entry is not None and (entry.expires is None or
+                                      entry.expires > now):
+                entry.last_used = self._tick
+                return entry.devices
+            generation = self._generation
+        devices = self._enumerate(key, parent)
+        expires = None if self.ttl is None else now + self.ttl
+        with self._lock:
+            if generation != self._generation:
+                return devices
+            self._entries[key] = _CacheEntry(devices, expires, self._tick)
+            while len(self._entries) > self.maxsize:
+                oldest = min(self._entries,
+                             key=lambda k: self._entries[k].last_used)
+                del self._entries[oldest]
+        return devices
+
+    def _could_match(self, key, entry, device, old_path):
+        """
+        Check whether the result cached for ``key`` is affected by the event
+        ``device``.
+        """
+        if device.device_path in entry.device_paths:
+            return True
+        if old_path is not None and old_path in entry.device_paths:
+            return True
+        if key.subsystem is not None and not fnmatchcase(
+                device.subsystem or '', key.subsystem):
+            return False
+        if key.sys_name is not None and not fnmatchcase(
+                device.sys_name, key.sys_name):
+            return False
+        if key.tag is not None and key.tag not in device.tags:
+            return False
+        if key.parent is not None and not (
+                device.device_path == key.parent or
+                device.device_path.startswith(key.parent + '/')):
+            return False
+        if key.properties:
+            # libudev combines property filters with a logical OR
+            for property, pattern in key.properties:
+                value = device.get(property)
+                if value is not None and fnmatchcase(
+                        value, ensure_unicode_string(pattern)):
+                    break
+            else:
+                return False
+        # attribute filters are not checked, reading attributes of the event
+        # device is more expensive than re-enumerating
+        return True
+
+    def invalidate(self, device=None):
+        """
+        Invalidate cached results.
+
+        If ``device`` is ``None``, all results are invalidated.  Otherwise
+        ``device`` is a :class:`~pyudev.Device`, typically received from a
+        :class:`~pyudev.Monitor`, and only results which contain this device
+        (or its old path, for ``move`` events), or whose filters could match
+        this device, are invalidated.
+
+        Return the number of invalidated results.
+        """
+        with self._lock:
+            self._generation += 1
+            if device is None:
+                count = len(self._entries)
+                self._entries.clear()
+                return count
+            old_path = device.get('DEVPATH_OLD')
+            stale = [key for key, entry in self._entries.items()
+                     if self._could_match(key, entry, device, old_path)]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def handle_event(self, device):
+        """
+        Invalidate the results affected by the event of the given ``device``.
+
+        This method can directly be used as callback of a
+        :class:`~pyudev.MonitorObserver`.
+        """
+        self.invalidate(device)
+
+    def attach(self, monitor):
+        """
+        Invalidate cached results on events of the given ``monitor``.
+
+        ``monitor`` is a :class:`~pyudev.Monitor` of the :attr:`context` of
+        this cache.  Its events are received by a
+        :class:`~pyudev.MonitorObserver`, which is started by this method.
+
+        Return the started :class:`~pyudev.MonitorObserver`.  Call its
+        :meth:`~pyudev.MonitorObserver.stop()` method to detach the monitor
+        again.
+        """
+        from pyudev.monitor import MonitorObserver
+        observer = MonitorObserver(monitor, callback=self.handle_event)
+        observer.start()
+        return observer
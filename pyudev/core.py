@@ -29,18 +29,24 @@
 from __future__ import (print_function, division, unicode_literals,
                         absolute_import)
 
-try:
-    from subprocess import check_output
-except ImportError:
-    from pyudev._compat import check_output
+import os
+from collections import namedtuple
+from itertools import islice
+from fnmatch import fnmatchcase
 
-from pyudev.device import Device
+from pyudev.device import Device, DeviceNotFoundAtPathError
+from pyudev._arrays import ColumnBuilder, load_numpy
 from pyudev._libudev import load_udev_library
+from pyudev.query import And, plan
+from pyudev import _util
 from pyudev._util import (ensure_unicode_string, ensure_byte_string,
-                          udev_list_iterate, property_value_to_bytes)
+                          udev_list_names, udev_list_length,
+                          property_value_to_bytes, text_type,
+                          acquire_handle, release_handle, ClosedLibrary)
 
 
-__all__ = ['udev_version', 'Context', 'Enumerator']
+__all__ = ['udev_version', 'live_handles', 'HandleCounts', 'Context',
+           'Enumerator']
 
 
 def udev_version():
@@ -68,10 +74,67 @@ def udev_version():
 
     .. versionadded:: 0.8
     """
+    # import lazily, subprocess is expensive to import
+    try:
+        from subprocess import check_output
+    except ImportError:
+        from pyudev._compat import check_output
     output = ensure_unicode_string(check_output(['udevadm', '--version']))
     return int(output.strip())
 
 
+HandleCounts = namedtuple('HandleCounts',
+                          'contexts enumerators devices monitors')
+HandleCounts.__doc__ = """
+The number of live libudev objects, see :func:`live_handles()`.
+
+Each field is the number of :class:`Context`, :class:`Enumerator`,
+:class:`~pyudev.Device` and :class:`~pyudev.Monitor` objects, which were
+created, but neither closed nor garbage collected yet.
+"""
+
+
+def live_handles():
+    """
+    Count the libudev objects held by pyudev in this process.
+
+    Every :class:`Context`, :class:`Enumerator`, :class:`~pyudev.Device` and
+    :class:`~pyudev.Monitor` holds a reference to a libudev object, until it
+    is closed with ``close()`` or garbage collected.  Long-running programs
+    can compare these counts over time to find leaked objects:
+
+    >>> from pyudev import Context, live_handles
+    >>> with Context() as context:
+    ...     devices = list(context.list_devices(subsystem='block'))
+    ...     print(live_handles())
+    HandleCounts(contexts=1, enumerators=0, devices=12, monitors=0)
+
+    Return a :class:`HandleCounts` object.
+
+    .. versionadded:: 0.17
+    """
+    return HandleCounts(**_util.handle_counts)
+
+
+def _split_shards(kind, values, count):
+    """
+    Distribute ``values`` round-robin over at most ``count`` shards of the
+    given ``kind``.
+
+    Return a list of ``(kind, values)`` tuples.
+    """
+    count = min(count, len(values))
+    return [(kind, values[index::count]) for index in range(count)]
+
+
+def _close_devices(devices):
+    """
+    Close all ``devices``.
+    """
+    for device in devices:
+        device.close()
+
+
 class Context(object):
     """
     A device database connection.
@@ -86,17 +149,70 @@ class for almost anything else in pyudev.
 
     Instances of this class can directly be given as ``udev *`` to functions
     wrapped through :mod:`ctypes`.
+
+    A context releases its libudev object when garbage collected, or
+    explicitly with :meth:`close()`.  Contexts are context managers, which
+    close the context on exit:
+
+    >>> with Context() as context:
+    ...     sda = Device.from_name(context, 'block', 'sda')
+
+    .. versionchanged:: 0.17
+       Add :meth:`close()` and support for the ``with`` statement.
     """
 
-    def __init__(self):
+    def __init__(self, backend=None):
         """
         Create a new context.
+
+        ``backend`` selects the implementation of libudev.  It is either
+        ``None`` or the name of a backend as understood by
+        :func:`~pyudev._libudev.load_udev_library()` (``'cffi'``,
+        ``'ctypes'`` or ``'sysfs'``), or a library object, e.g. a
+        :class:`~pyudev.sysfs.SysfsUdevLibrary` reading a fixture tree.
+
+        .. versionchanged:: 0.17
+           Add ``backend``.
         """
-        self._libudev = load_udev_library()
+        self._backend = backend
+        if backend is None or isinstance(backend, (text_type, bytes)):
+            self._libudev = load_udev_library(backend)
+        else:
+            self._libudev = backend
         self._as_parameter_ = self._libudev.udev_new()
+        acquire_handle('contexts')
 
     def __del__(self):
-        self._libudev.udev_unref(self)
+        # __init__ fails without context, if no libudev was found
+        if getattr(self, '_as_parameter_', None) is not None:
+            self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Release the libudev object of this context.
+
+        Afterwards any use of this context, including the creation of
+        devices, enumerators and monitors, raises
+        :exc:`~exceptions.ValueError`.  Devices, enumerators and monitors
+        created before are not closed, but they should be closed before
+        their context.  Closing a closed context has no effect.
+
+        .. versionadded:: 0.17
+        """
+        handle = self._as_parameter_
+        if handle is None:
+            return
+        libudev = self._libudev
+        self._as_parameter_ = None
+        self._libudev = ClosedLibrary('Context')
+        release_handle('contexts')
+        libudev.udev_unref(handle)
 
     @property
     def sys_path(self):
@@ -158,13 +274,15 @@ def log_priority(self):
     def log_priority(self, value):
         self._libudev.udev_set_log_priority(self, value)
 
-    def list_devices(self, **kwargs):
+    def list_devices(self, *predicates, **kwargs):
         """
         List all available devices.
 
-        The arguments of this method are the same as for
+        The keyword arguments of this method are the same as for
         :meth:`Enumerator.match()`.  In fact, the arguments are simply passed
-        straight to method :meth:`~Enumerator.match()`.
+        straight to method :meth:`~Enumerator.match()`.  Positional arguments
+        are :mod:`predicates <pyudev.query>`, each passed to
+        :meth:`Enumerator.where()`.
 
         This function creates and returns an :class:`Enumerator` object,
         that can be used to filter the list of devices, and eventually
@@ -172,8 +290,13 @@ def list_devices(self, **kwargs):
 
         .. versionchanged:: 0.8
            Accept keyword arguments now for easy matching.
+        .. versionchanged:: 0.17
+           Accept predicates as positional arguments.
         """
-        return Enumerator(self).match(**kwargs)
+        enumerator = Enumerator(self).match(**kwargs)
+        for predicate in predicates:
+            enumerator.where(predicate)
+        return enumerator
 
 
 class Enumerator(object):
@@ -202,6 +325,12 @@ class Enumerator(object):
 
     Instances of this class can directly be given as given ``udev_enumerate *``
     to functions wrapped through :mod:`ctypes`.
+
+    Like :class:`Context`, an enumerator can be closed with :meth:`close()`
+    or in a ``with`` statement.
+
+    .. versionchanged:: 0.17
+       Add :meth:`close()` and support for the ``with`` statement.
     """
 
     def __init__(self, context):
@@ -216,10 +345,49 @@ def __init__(self, context):
             raise TypeError('Invalid context object')
         self.context = context
         self._as_parameter_ = context._libudev.udev_enumerate_new(context)
+        acquire_handle('enumerators')
         self._libudev = context._libudev
+        self._prefetch_attributes = ()
+        self._prefetch_workers = None
+        self._match_kinds = set()
+        # kinds of positive matches added by where(), see _check_match()
+        self._predicate_kinds = set()
+        # (kind, nomatch, method, args) of all matches, see scan_parallel()
+        self._matches = []
+        self._explanation = []
+        # predicate evaluated in python on each device, see where()
+        self._residual = None
 
     def __del__(self):
-        self._libudev.udev_enumerate_unref(self)
+        # __init__ fails without enumerator, if a ContextPool detects use of
+        # the context in a foreign thread
+        if getattr(self, '_as_parameter_', None) is not None:
+            self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Release the libudev object of this enumerator.
+
+        Devices already yielded by this enumerator remain valid, but any
+        further use of this enumerator raises :exc:`~exceptions.ValueError`.
+        Closing a closed enumerator has no effect.
+
+        .. versionadded:: 0.17
+        """
+        handle = self._as_parameter_
+        if handle is None:
+            return
+        libudev = self._libudev
+        self._as_parameter_ = None
+        self._libudev = ClosedLibrary('Enumerator')
+        release_handle('enumerators')
+        libudev.udev_enumerate_unref(handle)
 
     def match(self, **kwargs):
         """
@@ -276,10 +444,14 @@ def match_subsystem(self, subsystem, nomatch=False):
 
         Return the instance again.
         """
+        if not nomatch:
+            self._check_match('subsystem', 'match_subsystem')
         match = (self._libudev.udev_enumerate_add_match_subsystem
                  if not nomatch else
                  self._libudev.udev_enumerate_add_nomatch_subsystem)
         match(self, ensure_byte_string(subsystem))
+        self._record_match('subsystem', 'match_subsystem', subsystem,
+                           nomatch=nomatch)
         return self
 
     def match_sys_name(self, sys_name):
@@ -292,8 +464,10 @@ def match_sys_name(self, sys_name):
 
         .. versionadded:: 0.8
         """
+        self._check_match('sys_name', 'match_sys_name')
         self._libudev.udev_enumerate_add_match_sysname(
             self, ensure_byte_string(sys_name))
+        self._record_match('sys_name', 'match_sys_name', sys_name)
         return self
 
     def match_property(self, property, value):
@@ -312,8 +486,10 @@ def match_property(self, property, value):
 
         Return the instance again.
         """
+        self._check_match('property', 'match_property')
         self._libudev.udev_enumerate_add_match_property(
             self, ensure_byte_string(property), property_value_to_bytes(value))
+        self._record_match('property', 'match_property', property, value)
         return self
 
     def match_attribute(self, attribute, value, nomatch=False):
@@ -348,6 +524,8 @@ def match_attribute(self, attribute, value, nomatch=False):
                  self._libudev.udev_enumerate_add_nomatch_sysattr)
         match(self, ensure_byte_string(attribute),
               property_value_to_bytes(value))
+        self._record_match('attribute', 'match_attribute', attribute, value,
+                           nomatch=nomatch)
         return self
 
     def match_tag(self, tag):
@@ -362,7 +540,9 @@ def match_tag(self, tag):
 
         .. versionadded:: 0.6
         """
+        self._check_match('tag', 'match_tag')
         self._libudev.udev_enumerate_add_match_tag(self, ensure_byte_string(tag))
+        self._record_match('tag', 'match_tag', tag)
         return self
 
     def match_is_initialized(self):
@@ -384,6 +564,7 @@ def match_is_initialized(self):
         .. versionadded:: 0.8
         """
         self._libudev.udev_enumerate_add_match_is_initialized(self)
+        self._record_match('is_initialized', 'match_is_initialized')
         return self
 
     def match_parent(self, parent):
@@ -401,15 +582,566 @@ def match_parent(self, parent):
         .. versionadded:: 0.13
         """
         self._libudev.udev_enumerate_add_match_parent(self, parent)
+        self._record_match('parent', 'match_parent', parent)
+        return self
+
+    def _check_match(self, kind, method):
+        """
+        Check that a positive match of the given ``kind`` can be added with
+        ``method``.
+
+        libudev combines positive matches of the same kind with a logical OR.
+        Hence a match of a kind, which :meth:`where()` already added for a
+        predicate, would change the meaning of the predicate.  Raise
+        :exc:`~exceptions.ValueError` in this case.
+        """
+        if kind in self._predicate_kinds:
+            raise ValueError(
+                '{0}() after where() with a {1} match would widen the '
+                'predicate, call {0}() before where()'.format(method, kind))
+
+    def _record_match(self, kind, method, *args, **kwargs):
+        """
+        Record a match of the given ``kind`` added with ``method`` and the
+        given ``args`` for :meth:`explain()` and :meth:`scan_parallel()`.
+
+        Positive matches of the same kind are combined with a logical OR by
+        libudev.  :meth:`where()` uses the recorded kinds to avoid pushing
+        further positive matches of these kinds into libudev.
+        """
+        nomatch = bool(kwargs.get('nomatch'))
+        if nomatch:
+            args += (True,)
+        else:
+            self._match_kinds.add(kind)
+        self._matches.append((kind, nomatch, method, args))
+        self._explanation.append('libudev: {0}({1})'.format(
+            method, ', '.join(repr(a) for a in args)))
+
+    def where(self, predicate):
+        """
+        Include only devices matching the given ``predicate``.
+
+        ``predicate`` is a :class:`~pyudev.query.Predicate` expression, e.g.
+        ``(Subsystem() == 'block') & ~(Property('ID_BUS') == 'usb')``.
+
+        The predicate is planned (see :func:`pyudev.query.plan`):  Parts which
+        libudev can filter are added as matches to this enumerator, all other
+        parts are evaluated on each device during iteration.  Use
+        :meth:`explain()` to see, which parts are filtered by libudev.
+        Multiple predicates are combined with a logical AND.
+
+        Call the ``match_*()`` methods before this method.  Positive matches
+        of a kind, which libudev already filters for a predicate, raise
+        :exc:`~exceptions.ValueError` afterwards, because libudev would
+        combine them with the predicate with a logical OR.
+
+        Return the instance again.
+
+        .. versionadded:: 0.17
+        """
+        query_plan = plan(predicate, self._match_kinds)
+        match_kinds = set(self._match_kinds)
+        for method, args, _ in query_plan.pushed:
+            getattr(self, method)(*args)
+        self._predicate_kinds |= self._match_kinds - match_kinds
+        residual = query_plan.residual
+        if residual is not None:
+            self._explanation.append('python: {0!r}'.format(residual))
+            if self._residual is not None:
+                residual = And(self._residual, residual)
+            self._residual = residual
         return self
 
+    def explain(self):
+        """
+        Explain how matching devices are filtered.
+
+        Return a unicode string with one line per filter.  Lines starting with
+        ``libudev:`` name filters evaluated by libudev during the scan, lines
+        starting with ``python:`` predicates evaluated on each device (see
+        :meth:`where()`).
+
+        .. versionadded:: 0.17
+        """
+        return '\n'.join(self._explanation)
+
+    def with_attributes(self, attributes, workers=4):
+        """
+        Prefetch the given ``attributes`` for all yielded devices.
+
+        ``attributes`` is a sequence of attribute names as unicode or byte
+        strings.  ``workers`` is the number of threads which read attributes
+        in parallel.  Calling this method repeatedly adds to the attributes to
+        prefetch.
+
+        During iteration, the devices are created in batches, and the
+        attributes of each batch are read in a pool of ``workers`` threads,
+        because reading attributes from ``sysfs`` blocks.  The devices are
+        still yielded in the order of enumeration.  Prefetched
+        values are cached in the yielded :class:`Device` objects, and served
+        from this cache by :attr:`Device.attributes`:
+
+        >>> context = Context()
+        >>> devices = context.list_devices(subsystem='block')
+        >>> for device in devices.with_attributes(['size', 'queue/rotational']):
+        ...     print(device.attributes['size'])
+
+        The cache is a snapshot taken during iteration, which is kept for the
+        lifetime of the device.  Changes of prefetched attributes after
+        iteration are not visible through :attr:`Device.attributes`.
+
+        .. note::
+
+           libudev is not thread-safe, hence each device is only used by a
+           single worker thread, while the iterating thread waits for the
+           workers.  The devices are created in the iterating thread, and
+           belong to the :attr:`context` of this enumerator.
+
+        Return the instance again.
+
+        .. versionadded:: 0.17
+        """
+        if workers < 1:
+            raise ValueError('Invalid number of workers: {0!r}'.format(
+                workers))
+        self._prefetch_attributes += tuple(
+            ensure_unicode_string(a) for a in attributes)
+        self._prefetch_workers = workers
+        return self
+
+    def _prefetch_device(self, sys_path):
+        """
+        Create the device at ``sys_path`` and read all attributes given to
+        :meth:`with_attributes()` into its attribute cache.
+
+        Return the :class:`Device`.
+        """
+        device = Device.from_sys_path(self.context, sys_path)
+        self._read_attributes(device)
+        return device
+
+    def _read_attributes(self, device):
+        """
+        Read all attributes given to :meth:`with_attributes()` into the
+        attribute cache of ``device``.
+        """
+        get_attribute = device._libudev.udev_device_get_sysattr_value
+        cache = {}
+        for attribute in self._prefetch_attributes:
+            cache[attribute] = get_attribute(
+                device, ensure_byte_string(attribute))
+        device._attribute_cache = cache
+
+    def _scan(self):
+        """
+        Scan for matching devices.
+
+        Return an iterator over the sys path of each matching device as byte
+        string.  The list of devices is read completely before returning.
+        """
+        self._libudev.udev_enumerate_scan_devices(self)
+        entry = self._libudev.udev_enumerate_get_list_entry(self)
+        return iter(udev_list_names(self._libudev, entry))
+
+    def sys_paths(self):
+        """
+        Iterate over the sys paths of all matching devices.
+
+        Unlike iteration over this object, this method does not create
+        :class:`Device` objects, and is hence considerably cheaper, if only
+        the paths of the matching devices are needed.
+
+        Yield the :attr:`Device.sys_path` of each matching device as unicode
+        string.
+
+        .. note::
+
+           If a predicate given to :meth:`where()` needs to be evaluated in
+           Python, devices are created nonetheless.
+
+        .. versionadded:: 0.17
+        """
+        if self._residual is not None:
+            for device in self:
+                yield device.sys_path
+            return
+        for sys_path in self._scan():
+            yield ensure_unicode_string(sys_path)
+
+    def count(self):
+        """
+        Count all matching devices without creating :class:`Device` objects.
+
+        Return the number of matching devices as integer.
+
+        .. note::
+
+           If a predicate given to :meth:`where()` needs to be evaluated in
+           Python, devices are created nonetheless.
+
+        .. versionadded:: 0.17
+        """
+        if self._residual is not None:
+            return sum(1 for _ in self)
+        libudev = self._libudev
+        libudev.udev_enumerate_scan_devices(self)
+        entry = libudev.udev_enumerate_get_list_entry(self)
+        return udev_list_length(libudev, entry)
+
     def __iter__(self):
         """
         Iterate over all matching devices.
 
         Yield :class:`Device` objects.
+
+        .. versionchanged:: 0.17
+           Prefetch the attributes given to :meth:`with_attributes()`, and
+           filter by the predicates given to :meth:`where()`.
         """
-        self._libudev.udev_enumerate_scan_devices(self)
-        entry = self._libudev.udev_enumerate_get_list_entry(self)
-        for name, _ in udev_list_iterate(self._libudev, entry):
-            yield Device.from_sys_path(self.context, name)
+        residual = self._residual
+        for device in self._create_devices():
+            if residual is None or residual(device):
+                yield device
+
+    def _create_devices(self):
+        """
+        Create a :class:`Device` for each device found by libudev.
+        """
+        if not self._prefetch_attributes:
+            for sys_path in self._scan():
+                yield Device.from_sys_path(self.context, sys_path)
+            return
+        # import lazily to keep multiprocessing out of "import pyudev"
+        from multiprocessing.pool import ThreadPool
+        sys_paths = self._scan()
+        batch_size = 16 * self._prefetch_workers
+        pool = ThreadPool(self._prefetch_workers)
+        try:
+            while True:
+                batch = list(islice(sys_paths, batch_size))
+                if not batch:
+                    break
+                devices = [Device.from_sys_path(self.context, sys_path)
+                           for sys_path in batch]
+                # the workers only read attributes of distinct devices, and
+                # the iterating thread waits until they are done, so no
+                # device is used by two threads at once
+                pool.map(self._read_attributes, devices, chunksize=16)
+                for device in devices:
+                    yield device
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def chunks(self, size=256, close=False):
+        """
+        Iterate over all matching devices in chunks of ``size`` devices:
+
+        >>> context = Context()
+        >>> for chunk in context.list_devices(subsystem='block').chunks(100):
+        ...     process(chunk)
+
+        ``size`` is the maximum number of devices per chunk as integer.
+
+        Yield a new list of :class:`Device` objects for each chunk.  This
+        method holds no references to the devices of a chunk, once the
+        iteration continues with the next chunk.  Unless the caller keeps a
+        chunk, its devices and their libudev handles are released when they
+        are garbage collected.
+
+        If ``close`` is ``True``, the devices of each chunk are closed with
+        :meth:`Device.close()` before the next chunk is created, and when the
+        iteration stops.  Thus the number of live libudev handles stays
+        bounded by ``size``, regardless of the number of matching devices,
+        and of references the caller still holds, e.g. in the loop variable.
+
+        Raise :exc:`~exceptions.ValueError`, if ``size`` is less than 1.
+
+        .. versionadded:: 0.17
+        """
+        if size < 1:
+            raise ValueError('Invalid chunk size: {0!r}'.format(size))
+        chunk = []
+        for device in self:
+            chunk.append(device)
+            if len(chunk) >= size:
+                # drop our reference before creating the next chunk
+                full, chunk = chunk, []
+                try:
+                    yield full
+                finally:
+                    if close:
+                        _close_devices(full)
+                del full
+        if chunk:
+            try:
+                yield chunk
+            finally:
+                if close:
+                    _close_devices(chunk)
+
+    def visit(self, visitor, chunk_size=256):
+        """
+        Call ``visitor`` with each matching device.
+
+        ``visitor`` is a callable, which accepts a single :class:`Device`
+        object.  If it returns ``False``, the enumeration is stopped.  Devices
+        are created in chunks of ``chunk_size`` devices (see :meth:`chunks()`),
+        and each device is closed as soon as ``visitor`` returns, so
+        ``visitor`` must not keep the device for later use.
+
+        Return the number of visited devices as integer.
+
+        .. versionadded:: 0.17
+        """
+        visited = 0
+        chunks = self.chunks(chunk_size, close=True)
+        try:
+            for chunk in chunks:
+                for device in chunk:
+                    visited += 1
+                    try:
+                        stop = visitor(device) is False
+                    finally:
+                        device.close()
+                    if stop:
+                        return visited
+        finally:
+            # close the rest of the current chunk
+            chunks.close()
+        return visited
+
+    def records(self, attributes=()):
+        """
+        Iterate over picklable records of all matching devices.
+
+        ``attributes`` is a sequence of attribute names as unicode or byte
+        strings, whose values are included in the records.
+
+        Yield a :class:`~pyudev.records.DeviceRecord` for each matching
+        device.  Each device is released as soon as its record is created.
+
+        .. versionadded:: 0.17
+        """
+        # import lazily, pyudev.records imports this module
+        from pyudev.records import DeviceRecord
+        for device in self:
+            yield DeviceRecord.from_device(device, attributes)
+
+    def _subsystem_shards(self, count):
+        """
+        Split the subsystems to scan in parallel into at most ``count``
+        shards.
+
+        Return a list of ``('subsystem', names)`` tuples, where ``names`` is
+        a list of subsystems in ``sysfs`` matched by the positive subsystem
+        matches of this enumerator.
+        """
+        subsystems = set()
+        for directory in ('bus', 'class'):
+            try:
+                subsystems.update(os.listdir(
+                    os.path.join(self.context.sys_path, directory)))
+            except EnvironmentError:
+                continue
+        patterns = [ensure_unicode_string(args[0])
+                    for kind, nomatch, _, args in self._matches
+                    if kind == 'subsystem' and not nomatch]
+        if patterns:
+            subsystems = [s for s in subsystems
+                          if any(fnmatchcase(s, p) for p in patterns)]
+        return _split_shards(
+            'subsystem', [ensure_unicode_string(s) for s in sorted(subsystems)],
+            count)
+
+    def _shard_enumerator(self, context, kind):
+        """
+        Create an enumerator for a shard of the given ``kind`` in
+        ``context``, which inherits all matches of this enumerator, except
+        for the positive matches of ``kind``.
+        """
+        enumerator = Enumerator(context)
+        for match_kind, nomatch, method, args in self._matches:
+            if match_kind == kind and not nomatch:
+                # replaced by the matches of the shard
+                continue
+            if match_kind == 'parent':
+                args = (Device.from_sys_path(context, args[0].sys_path),)
+            getattr(enumerator, method)(*args)
+        enumerator._prefetch_attributes = self._prefetch_attributes
+        return enumerator
+
+    def _scan_shard(self, shard):
+        """
+        Scan a single ``shard`` with a new :class:`Context`.
+
+        ``shard`` is a tuple ``(kind, values)``, where ``kind`` is either
+        ``'subsystem'`` and ``values`` a list of subsystem names, or
+        ``'parent'`` and ``values`` a list of sys paths of parent devices.
+        All subsystems of a shard are scanned at once, because libudev
+        combines subsystem matches with a logical OR.  Parents are scanned
+        one after another, because libudev matches only a single parent.
+
+        Return a list of all matching :class:`Device` objects in the shard.
+        """
+        kind, values = shard
+        context = Context(self.context._backend)
+        if kind == 'subsystem':
+            enumerator = self._shard_enumerator(context, kind)
+            for subsystem in values:
+                enumerator.match_subsystem(subsystem)
+            enumerators = [enumerator]
+        else:
+            enumerators = []
+            for sys_path in values:
+                enumerator = self._shard_enumerator(context, kind)
+                enumerator.match_parent(Device.from_sys_path(context,
+                                                             sys_path))
+                enumerators.append(enumerator)
+        residual = self._residual
+        devices = []
+        for enumerator in enumerators:
+            for sys_path in enumerator._scan():
+                try:
+                    if enumerator._prefetch_attributes:
+                        device = enumerator._prefetch_device(sys_path)
+                    else:
+                        device = Device.from_sys_path(context, sys_path)
+                except DeviceNotFoundAtPathError:
+                    # the device vanished since scanning
+                    continue
+                if residual is None or residual(device):
+                    devices.append(device)
+        return devices
+
+    def scan_parallel(self, workers=4, parents=None):
+        """
+        Scan for all matching devices in parallel.
+
+        The scan is split into at most ``workers`` shards.  By default, the
+        subsystems in ``sysfs`` are distributed over the shards.  If
+        ``parents`` is given, it is a sequence of :class:`Device` objects,
+        which are distributed over the shards instead, and each parent
+        includes its subtree like :meth:`match_parent()`.  In this case the
+        result contains only devices below any of the ``parents``.
+
+        Each shard is scanned by its own thread with its own :class:`Context`,
+        and enumerators, which inherit all matches, predicates and prefetched
+        attributes of this enumerator.  libudev does not hold the GIL while
+        scanning ``sysfs``, so shards are scanned concurrently:
+
+        >>> context = Context()
+        >>> devices = context.list_devices(tag='seat').scan_parallel(8)
+
+        Return a list of :class:`Device` objects, sorted by
+        :attr:`~Device.sys_path`, so that the result does not depend on the
+        order in which shards complete.  This order differs from the order of
+        iteration over this enumerator, in which libudev moves some devices
+        (e.g. device mapper block devices) behind the devices they depend on.
+        Devices which are part of more than one shard are included once.  The
+        :attr:`~Device.context` of the returned devices is the context of
+        their shard, and not the :attr:`context` of this enumerator.
+
+        Raise :exc:`~exceptions.ValueError`, if ``workers`` is less than 1,
+        or if ``parents`` is given, but this enumerator already matches a
+        parent device.
+
+        .. versionadded:: 0.17
+        """
+        if workers < 1:
+            raise ValueError('Invalid number of workers: {0!r}'.format(
+                workers))
+        if parents is None:
+            shards = self._subsystem_shards(workers)
+        else:
+            if 'parent' in self._match_kinds:
+                raise ValueError('Enumerator already matches a parent')
+            shards = _split_shards('parent', [p.sys_path for p in parents],
+                                   workers)
+        if not shards:
+            return []
+        # import lazily to keep multiprocessing out of "import pyudev"
+        from multiprocessing.pool import ThreadPool
+        pool = ThreadPool(len(shards))
+        try:
+            results = pool.map(self._scan_shard, shards, chunksize=1)
+        finally:
+            pool.terminate()
+            pool.join()
+        devices = {}
+        for shard_devices in results:
+            for device in shard_devices:
+                devices.setdefault(device.sys_path, device)
+        return [devices[sys_path] for sys_path in sorted(devices)]
+
+    def to_columns(self, properties=(), attributes=(), dtypes=None):
+        """
+        Export the given ``properties`` and ``attributes`` of all matching
+        devices into typed columns:
+
+        >>> context = Context()
+        >>> columns = context.list_devices(subsystem='block').to_columns(
+        ...     properties=['DEVNAME', 'MAJOR'], attributes=['size'],
+        ...     dtypes={'MAJOR': 'i', 'size': 'q'})
+        >>> columns['size']
+        masked_array(data = [2097152 0 ...], ...)
+
+        ``properties`` and ``attributes`` are sequences of property and
+        attribute names respectively, as unicode or byte strings.  Each name
+        becomes a column.  ``dtypes`` is an optional dictionary mapping column
+        names to column types.  A type is either a type code of the
+        :mod:`array` module (e.g. ``'q'`` or ``'d'``), ``'?'`` for boolean
+        values, or – if numpy is available – anything :class:`numpy.dtype`
+        understands.  Columns without type contain unicode strings.
+
+        The devices are scanned once, the columns are preallocated for the
+        number of matching devices, and filled in a single pass.  A value is
+        masked, if the device lacks the property or attribute, if its value
+        cannot be decoded with the filesystem encoding, or if it cannot be
+        converted to the type of the column.
+
+        Return a dictionary mapping column names to columns.  If numpy is
+        available, columns are :class:`numpy.ma.MaskedArray` objects,
+        otherwise ``(data, mask)`` tuples of :class:`array.array` objects (or
+        a :func:`list` for string columns), where ``mask`` is ``1`` for
+        masked values.  Raise :exc:`~exceptions.ValueError`, if a name is used
+        both as property and as attribute name, or if a type is invalid.
+
+        .. versionadded:: 0.17
+        """
+        properties = [ensure_unicode_string(p) for p in properties]
+        attributes = [ensure_unicode_string(a) for a in attributes]
+        duplicates = set(properties) & set(attributes)
+        if duplicates:
+            raise ValueError('Ambiguous column names: {0!r}'.format(
+                sorted(duplicates)))
+        if self._residual is None:
+            sys_paths = list(self._scan())
+        else:
+            sys_paths = list(self.sys_paths())
+        builder = ColumnBuilder(len(sys_paths), properties + attributes,
+                                dtypes, numpy=load_numpy())
+        # encode the names once instead of once per device
+        property_keys = [(p, ensure_byte_string(p)) for p in properties]
+        attribute_keys = [(a, ensure_byte_string(a)) for a in attributes]
+        get_property = self._libudev.udev_device_get_property_value
+        get_attribute = self._libudev.udev_device_get_sysattr_value
+        for row, sys_path in enumerate(sys_paths):
+            try:
+                device = Device.from_sys_path(self.context, sys_path)
+            except DeviceNotFoundAtPathError:
+                # the device vanished since scanning, leave its row masked
+                continue
+            for keys, get_value in ((property_keys, get_property),
+                                    (attribute_keys, get_attribute)):
+                for name, key in keys:
+                    value = get_value(device, key)
+                    if value is not None:
+                        try:
+                            value = ensure_unicode_string(value)
+                        except UnicodeDecodeError:
+                            # leave values in foreign encodings masked
+                            continue
+                        builder.set(name, row, value)
+        return builder.finish()
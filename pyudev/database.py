@@ -0,0 +1,351 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 Sebastian Wiesner <lunaryorn@gmail.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+"""
+    pyudev.database
+    ===============
+
+    An in-memory index of the udev runtime database.
+
+    .. moduleauthor::  Sebastian Wiesner  <lunaryorn@gmail.com>
+"""
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+import os
+import errno
+import struct
+from threading import Lock
+
+from pyudev._util import ensure_byte_string
+
+
+__all__ = ['DatabaseIndex', 'parse_record']
+
+
+def parse_record(data):
+    """
+    Parse the udev database record ``data`` of a device, as byte string.
+
+    Return a dictionary with the keys ``links`` (a list of links relative to
+    the device directory), ``properties`` (a list of ``(name, value)``
+    tuples), ``tags`` (a list of tags) and ``initialized`` (the time of
+    initialization in microseconds as byte string, or ``None``), or an empty
+    dictionary, if ``data`` is ``None``.
+
+    .. versionadded:: 0.17
+    """
+    if data is None:
+        return {}
+    record = dict(links=[], properties=[], tags=[], initialized=None)
+    for line in data.splitlines():
+        key, value = line[:2], line[2:]
+        if key == b'S:':
+            record['links'].append(value)
+        elif key == b'E:':
+            name, sep, value = value.partition(b'=')
+            if sep:
+                record['properties'].append((name, value))
+        elif key == b'G:':
+            record['tags'].append(value)
+        elif key == b'I:':
+            record['initialized'] = value
+    return record
+
+
+def _scan_names(directory):
+    """
+    List the names of all regular files in ``directory``, except for hidden
+    files, which udev uses as temporary files.
+    """
+    scandir = getattr(os, 'scandir', None)
+    if scandir is None:
+        return [name for name in os.listdir(directory)
+                if not name.startswith(b'.')]
+    entries = scandir(directory)
+    try:
+        # is_file() is answered from the directory entry without stat()
+        return [entry.name for entry in entries
+                if not entry.name.startswith(b'.') and entry.is_file()]
+    finally:
+        # scandir iterators only have close() on Python 3.6 and newer
+        getattr(entries, 'close', lambda: None)()
+
+
+class _Inotify(object):
+    """
+    A minimal binding to the inotify API of Linux through :mod:`ctypes`.
+    """
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+
+    IN_NONBLOCK = os.O_NONBLOCK
+    IN_CLOEXEC = 0o2000000
+
+    _EVENT = struct.Struct(str('iIII'))
+
+    def __init__(self, directory, mask):
+        from ctypes import CDLL, get_errno
+        from ctypes.util import find_library
+        libc = CDLL(find_library('c'), use_errno=True)
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            error = get_errno()
+            raise EnvironmentError(error, os.strerror(error))
+        if libc.inotify_add_watch(self.fd, directory, mask) < 0:
+            error = get_errno()
+            os.close(self.fd)
+            raise EnvironmentError(error, os.strerror(error))
+
+    def read_events(self):
+        """
+        Read all pending events without blocking.
+
+        Return a list of ``(mask, name)`` tuples.
+        """
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except EnvironmentError as error:
+                if error.errno == errno.EAGAIN:
+                    return events
+                raise
+            offset = 0
+            while offset < len(data):
+                _, mask, _, length = self._EVENT.unpack_from(data, offset)
+                offset += self._EVENT.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+                events.append((mask, name))
+
+    def close(self):
+        os.close(self.fd)
+
+
+class DatabaseIndex(object):
+    """
+    An in-memory index of all records of the udev runtime database.
+
+    The index reads all records in a single pass over the database
+    directory, and afterwards serves lookups from memory:
+
+    >>> from pyudev.database import DatabaseIndex
+    >>> index = DatabaseIndex()
+    >>> index.get('b8:0')['tags']
+    [b'systemd']
+    >>> index.with_tag('systemd')
+    [b'b8:0', b'b8:1', b'n2']
+
+    Records are identified by the name of their file in the database, e.g.
+    ``b8:0`` for the block device 8:0, or ``n2`` for the network interface
+    with index 2.
+
+    If ``watch`` is ``True``, the index watches the database directory with
+    inotify, and :meth:`update()` re-reads only the records changed since the
+    last update.  :meth:`fileno()` allows to wait for changes with
+    :func:`select.select`.  Otherwise :meth:`update()` re-reads the whole
+    database.
+
+    Pass the index to :class:`~pyudev.sysfs.SysfsUdevLibrary` to serve the
+    properties, tags and links of all devices from the index.
+
+    ``run_path`` is the runtime directory of udev as unicode or byte string.
+    Raise :exc:`~exceptions.EnvironmentError`, if ``watch`` is ``True``, but
+    the database directory cannot be watched, e.g. because it does not exist.
+
+    .. versionadded:: 0.17
+    """
+
+    _WATCH_MASK = (_Inotify.IN_CLOSE_WRITE | _Inotify.IN_MOVED_TO |
+                   _Inotify.IN_MOVED_FROM | _Inotify.IN_DELETE |
+                   _Inotify.IN_DELETE_SELF)
+
+    def __init__(self, run_path='/run/udev', watch=True):
+        self.directory = os.path.join(ensure_byte_string(run_path), b'data')
+        self._lock = Lock()
+        self._buffer = bytearray(4096)
+        self._records = {}
+        self._tags = {}
+        self._links = {}
+        self._inotify = None
+        if watch:
+            # watch before reading, to not miss changes during the first read
+            self._inotify = _Inotify(self.directory, self._WATCH_MASK)
+        self.refresh()
+
+    def _read(self, name):
+        """
+        Read the record file ``name`` into the buffer of this index.
+
+        Return the contents as byte string, or ``None``, if the file does not
+        exist anymore.
+        """
+        try:
+            stream = open(os.path.join(self.directory, name), 'rb', 0)
+        except EnvironmentError:
+            return None
+        with stream:
+            buffer = self._buffer
+            size = stream.readinto(buffer)
+            while size == len(buffer):
+                # the record did not fit, grow the buffer and read the rest
+                buffer.extend(bytearray(len(buffer)))
+                view = memoryview(buffer)[size:]
+                size += stream.readinto(view)
+                # release the view, a viewed buffer cannot be resized
+                del view
+            self._buffer = buffer
+            return bytes(buffer[:size])
+
+    def _remove(self, name):
+        record = self._records.pop(name, None)
+        if record is None:
+            return
+        for tag in record['tags']:
+            names = self._tags.get(tag)
+            if names is not None:
+                names.discard(name)
+                if not names:
+                    del self._tags[tag]
+        for link in record['links']:
+            if self._links.get(link) == name:
+                del self._links[link]
+
+    def _load(self, name):
+        self._remove(name)
+        data = self._read(name)
+        if data is None:
+            return
+        record = parse_record(data)
+        self._records[name] = record
+        for tag in record['tags']:
+            self._tags.setdefault(tag, set()).add(name)
+        for link in record['links']:
+            self._links[link] = name
+
+    def refresh(self):
+        """
+        Read the whole database again.
+        """
+        with self._lock:
+            self._records.clear()
+            self._tags.clear()
+            self._links.clear()
+            try:
+                names = _scan_names(self.directory)
+            except EnvironmentError:
+                # no udev database at all
+                names = []
+            for name in names:
+                self._load(name)
+
+    def update(self):
+        """
+        Update the index with all changes to the database.
+
+        Return the number of records, which were read again or removed.
+        """
+        if self._inotify is None:
+            self.refresh()
+            return len(self._records)
+        with self._lock:
+            events = self._inotify.read_events()
+            changed = set()
+            for mask, name in events:
+                if mask & (_Inotify.IN_Q_OVERFLOW | _Inotify.IN_DELETE_SELF |
+                           _Inotify.IN_IGNORED):
+                    break
+                if name and not name.startswith(b'.'):
+                    changed.add(name)
+            else:
+                for name in changed:
+                    self._load(name)
+                return len(changed)
+        # some events were lost, or the directory itself changed
+        self.refresh()
+        return len(self._records)
+
+    @property
+    def watching(self):
+        """
+        ``True``, if this index watches the database for changes.
+        """
+        return self._inotify is not None
+
+    def fileno(self):
+        """
+        Get the file descriptor of the inotify watch, which becomes readable
+        when the database changed.  Raise :exc:`~exceptions.ValueError`, if
+        this index does not watch the database.
+        """
+        if self._inotify is None:
+            raise ValueError('Index does not watch the database')
+        return self._inotify.fd
+
+    def close(self):
+        """
+        Stop watching the database.
+        """
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def __len__(self):
+        return len(self._records)
+
+    def __iter__(self):
+        return iter(list(self._records))
+
+    def __contains__(self, name):
+        return ensure_byte_string(name) in self._records
+
+    def get(self, name):
+        """
+        Get the record with the given ``name``, as unicode or byte string.
+
+        Return the record as dictionary (see :func:`parse_record()`), or
+        ``None``, if there is no record with this name.
+        """
+        return self._records.get(ensure_byte_string(name))
+
+    def with_tag(self, tag):
+        """
+        Get the names of all records with the given ``tag``.
+
+        Return a sorted list of record names as byte strings.
+        """
+        return sorted(self._tags.get(ensure_byte_string(tag), ()))
+
+    def by_link(self, link):
+        """
+        Get the name of the record of the device with the given ``link``,
+        relative to the device directory, e.g. ``'disk/by-label/root'``.
+
+        Return the name as byte string, or ``None``, if no record has this
+        link.
+        """
+        return self._links.get(ensure_byte_string(link))
@@ -33,11 +33,12 @@
 from datetime import timedelta
 
 from pyudev._util import (ensure_byte_string, ensure_unicode_string,
-                          udev_list_iterate, string_to_bool,
-                          get_device_type)
+                          udev_list_names, udev_list_length,
+                          string_to_bool, get_device_type,
+                          acquire_handle, release_handle, ClosedLibrary)
 
 
-__all__ = ['Device', 'Attributes', 'Tags',
+__all__ = ['Device', 'Attributes', 'Tags', 'RawDevice',
            'DeviceNotFoundError', 'DeviceNotFoundAtPathError',
            'DeviceNotFoundByNameError', 'DeviceNotFoundByNumberError',
            'DeviceNotFoundInEnvironmentError']
@@ -168,6 +169,13 @@ class Device(Mapping):
 
     They can also be given directly as ``udev_device *`` to functions wrapped
     through :mod:`ctypes`.
+
+    A device releases its libudev object when garbage collected, or
+    explicitly with :meth:`close()`, e.g. at the end of a ``with``
+    statement.
+
+    .. versionchanged:: 0.17
+       Add :meth:`close()` and support for the ``with`` statement.
     """
 
     @classmethod
@@ -371,14 +379,47 @@ def from_environment(cls, context):
     def __init__(self, context, _device):
         self.context = context
         self._as_parameter_ = _device
+        acquire_handle('devices')
         self._libudev = context._libudev
+        # attribute values prefetched by Enumerator.with_attributes()
+        self._attribute_cache = None
 
     def __del__(self):
-        self._libudev.udev_device_unref(self)
+        if self._as_parameter_ is not None:
+            self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def __repr__(self):
+        if self._as_parameter_ is None:
+            return '<closed Device>'
         return 'Device({0.sys_path!r})'.format(self)
 
+    def close(self):
+        """
+        Release the libudev object of this device.
+
+        Afterwards any access to the data of this device raises
+        :exc:`~exceptions.ValueError`.  Parents and children of this device
+        are separate objects, and are not closed.  Closing a closed device
+        has no effect.
+
+        .. versionadded:: 0.17
+        """
+        handle = self._as_parameter_
+        if handle is None:
+            return
+        libudev = self._libudev
+        self._as_parameter_ = None
+        self._libudev = ClosedLibrary('Device')
+        self._attribute_cache = None
+        release_handle('devices')
+        libudev.udev_device_unref(handle)
+
     @property
     def parent(self):
         """
@@ -699,7 +740,7 @@ def device_links(self):
            device.device_path`` from any ``link`` in ``device.device_links``.
         """
         devlinks = self._libudev.udev_device_get_devlinks_list_entry(self)
-        for name, _ in udev_list_iterate(self._libudev, devlinks):
+        for name in udev_list_names(self._libudev, devlinks):
             yield ensure_unicode_string(name)
 
     @property
@@ -798,6 +839,17 @@ def tags(self):
         """
         return Tags(self)
 
+    @property
+    def raw(self):
+        """
+        A :class:`RawDevice` view of this device, which returns byte
+        strings straight from libudev, instead of unicode strings.
+
+        .. versionadded:: 0.17
+        """
+        # do *not* cache the created object, see attributes
+        return RawDevice(self)
+
     def __iter__(self):
         """
         Iterate over the names of all properties defined for this device.
@@ -806,7 +858,7 @@ def __iter__(self):
         device as unicode strings.
         """
         properties = self._libudev.udev_device_get_properties_list_entry(self)
-        for name, _ in udev_list_iterate(self._libudev, properties):
+        for name in udev_list_names(self._libudev, properties):
             yield ensure_unicode_string(name)
 
     def __len__(self):
@@ -814,7 +866,7 @@ def __len__(self):
         Return the amount of properties defined for this device as integer.
         """
         properties = self._libudev.udev_device_get_properties_list_entry(self)
-        return sum(1 for _ in udev_list_iterate(self._libudev, properties))
+        return udev_list_length(self._libudev, properties)
 
     def __getitem__(self, property):
         """
@@ -932,10 +984,145 @@ def __iter__(self):
         Yield each tag as unicode string.
         """
         tags = self._libudev.udev_device_get_tags_list_entry(self.device)
-        for tag, _ in udev_list_iterate(self._libudev, tags):
+        for tag in udev_list_names(self._libudev, tags):
             yield ensure_unicode_string(tag)
 
 
+class RawDevice(Mapping):
+    """
+    A view of a :class:`Device`, which returns names and values as byte
+    strings, exactly as returned by libudev.
+
+    Like :class:`Device`, this class subclasses the ``Mapping`` ABC,
+    providing a read-only dictionary mapping property names to the
+    corresponding values, but skips decoding into unicode strings.  This
+    view is meant for code which passes device data on as bytes anyway,
+    e.g. to a socket:
+
+    >>> from pyudev import Context, Device
+    >>> context = Context()
+    >>> device = Device.from_name(context, 'block', 'sda')
+    >>> device.raw[b'DEVNAME']
+    b'/dev/sda'
+    >>> b'\n'.join(name + b'=' + value for name, value in device.raw.items())
+    b'DEVLINKS=/dev/disk/by-id/ata-...'
+
+    Get the view with :attr:`Device.raw`.
+
+    .. versionadded:: 0.17
+    """
+
+    def __init__(self, device):
+        self.device = device
+
+    @property
+    def _libudev(self):
+        return self.device._libudev
+
+    @property
+    def sys_path(self):
+        """
+        The :attr:`~Device.sys_path` as byte string.
+        """
+        return self._libudev.udev_device_get_syspath(self.device)
+
+    @property
+    def device_path(self):
+        """
+        The :attr:`~Device.device_path` as byte string.
+        """
+        return self._libudev.udev_device_get_devpath(self.device)
+
+    @property
+    def subsystem(self):
+        """
+        The :attr:`~Device.subsystem` as byte string.
+        """
+        return self._libudev.udev_device_get_subsystem(self.device)
+
+    @property
+    def sys_name(self):
+        """
+        The :attr:`~Device.sys_name` as byte string.
+        """
+        return self._libudev.udev_device_get_sysname(self.device)
+
+    @property
+    def sys_number(self):
+        """
+        The :attr:`~Device.sys_number` as byte string, or ``None``.
+        """
+        return self._libudev.udev_device_get_sysnum(self.device)
+
+    @property
+    def device_type(self):
+        """
+        The :attr:`~Device.device_type` as byte string, or ``None``.
+        """
+        return self._libudev.udev_device_get_devtype(self.device)
+
+    @property
+    def driver(self):
+        """
+        The :attr:`~Device.driver` as byte string, or ``None``.
+        """
+        return self._libudev.udev_device_get_driver(self.device) or None
+
+    @property
+    def device_node(self):
+        """
+        The :attr:`~Device.device_node` as byte string, or ``None``.
+        """
+        return self._libudev.udev_device_get_devnode(self.device) or None
+
+    @property
+    def device_links(self):
+        """
+        The :attr:`~Device.device_links` as list of byte strings.
+        """
+        devlinks = self._libudev.udev_device_get_devlinks_list_entry(
+            self.device)
+        return udev_list_names(self._libudev, devlinks)
+
+    @property
+    def tags(self):
+        """
+        The :attr:`~Device.tags` as list of byte strings.
+        """
+        tags = self._libudev.udev_device_get_tags_list_entry(self.device)
+        return udev_list_names(self._libudev, tags)
+
+    def __iter__(self):
+        """
+        Iterate over the names of all properties as byte strings.
+        """
+        properties = self._libudev.udev_device_get_properties_list_entry(
+            self.device)
+        return iter(udev_list_names(self._libudev, properties))
+
+    def __len__(self):
+        """
+        Return the amount of properties defined for this device as integer.
+        """
+        properties = self._libudev.udev_device_get_properties_list_entry(
+            self.device)
+        return udev_list_length(self._libudev, properties)
+
+    def __getitem__(self, property):
+        """
+        Get the given ``property`` as byte string.
+
+        ``property`` is a unicode or byte string containing the name of the
+        property.  Raise a :exc:`~exceptions.KeyError`, if the given property
+        is not defined for this device.
+        """
+        value = self._libudev.udev_device_get_property_value(
+            self.device, ensure_byte_string(property))
+        if value is None:
+            raise KeyError(property)
+        return value
+
+
 def _is_attribute_file(filepath):
     """
     Check, if ``filepath`` points to a valid udev attribute filename.
@@ -968,13 +1155,16 @@ class Attributes(Mapping):
 
     def __init__(self, device):
         self.device = device
-        self._libudev = device._libudev
+
+    @property
+    def _libudev(self):
+        return self.device._libudev
 
     def _get_attributes(self):
         if hasattr(self._libudev, 'udev_device_get_sysattr_list_entry'):
             attrs = self._libudev.udev_device_get_sysattr_list_entry(
                 self.device)
-            for attribute, _ in udev_list_iterate(self._libudev, attrs):
+            for attribute in udev_list_names(self._libudev, attrs):
                 yield ensure_unicode_string(attribute)
         else:
             sys_path = self.device.sys_path
@@ -997,10 +1187,24 @@ def __iter__(self):
         """
         return self._get_attributes()
 
-    def __contains__(self, attribute):
-        value = self._libudev.udev_device_get_sysattr_value(
+    def _get_value(self, attribute):
+        """
+        Get the raw value of ``attribute`` as byte string, or ``None``, if the
+        attribute is not defined.
+
+        Values prefetched by :meth:`Enumerator.with_attributes()` are served
+        from the snapshot cached in the device.
+        """
+        cache = self.device._attribute_cache
+        if cache:
+            name = ensure_unicode_string(attribute)
+            if name in cache:
+                return cache[name]
+        return self._libudev.udev_device_get_sysattr_value(
             self.device, ensure_byte_string(attribute))
-        return value is not None
+
+    def __contains__(self, attribute):
+        return self._get_value(attribute) is not None
 
     def __getitem__(self, attribute):
         """
@@ -1013,8 +1217,7 @@ def __getitem__(self, attribute):
         :exc:`~exceptions.KeyError`, if the given attribute is not defined
         for this device.
         """
-        value = self._libudev.udev_device_get_sysattr_value(
-            self.device, ensure_byte_string(attribute))
+        value = self._get_value(attribute)
         if value is None:
             raise KeyError(attribute)
         return value
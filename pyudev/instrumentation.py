@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 Sebastian Wiesner <lunaryorn@gmail.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+"""
+    pyudev.instrumentation
+    ======================
+
+    Call counters and latency histograms for calls into libudev.
+
+    .. moduleauthor::  Sebastian Wiesner  <lunaryorn@gmail.com>
+"""
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+import time
+import json
+from bisect import bisect_left
+from threading import Lock
+from collections import namedtuple
+
+from pyudev import _libudev
+
+
+__all__ = ['Instrumentation', 'CallStatistics', 'HISTOGRAM_BOUNDS',
+           'enable', 'disable', 'current']
+
+
+#: A high resolution clock for measuring call durations
+_clock = getattr(time, 'perf_counter', time.time)
+
+
+#: The upper bounds of the buckets of latency histograms in seconds.  Bucket
+#: ``i`` counts calls which took at most ``HISTOGRAM_BOUNDS[i]`` seconds (and
+#: more than the bound of the previous bucket).  An additional last bucket
+#: counts all calls which took longer than the last bound.
+HISTOGRAM_BOUNDS = tuple(2 ** i / 1000000 for i in range(21))
+
+
+CallStatistics = namedtuple('CallStatistics', 'calls total_time histogram')
+CallStatistics.__doc__ = """
+Statistics of the calls to a single libudev function.
+
+``calls`` is the number of calls as integer, and ``total_time`` the
+cumulative time spent in these calls in seconds.  ``histogram`` is a tuple of
+call counts per latency bucket, with one element per bound in
+:data:`HISTOGRAM_BOUNDS`, plus one element for calls slower than the last
+bound.
+"""
+
+
+class InstrumentedLibrary(object):
+    """
+    A proxy for the libudev library object, which records every call to a
+    function declared in :data:`~pyudev._libudev.SIGNATURES` in an
+    :class:`Instrumentation`.
+    """
+
+    def __init__(self, libudev, instrumentation):
+        self._libudev = libudev
+        self._instrumentation = instrumentation
+
+    def __getattr__(self, name):
+        function = getattr(self._libudev, name)
+        if name not in _libudev.PROTOTYPES:
+            return function
+        record = self._instrumentation._record
+
+        def instrumented(*args):
+            start = _clock()
+            try:
+                return function(*args)
+            finally:
+                record(name, _clock() - start)
+        instrumented.__name__ = str(name)
+        # cache the wrapper, __getattr__ is only called for missing attributes
+        setattr(self, name, instrumented)
+        return instrumented
+
+
+class Instrumentation(object):
+    """
+    Statistics about calls into libudev.
+
+    Instrumentation is disabled by default, and must be enabled with
+    :func:`enable()` before creating the :class:`~pyudev.Context` to
+    observe:
+
+    >>> from pyudev import Context, instrumentation
+    >>> stats = instrumentation.enable()
+    >>> context = Context()
+    >>> devices = list(context.list_devices(subsystem='block'))
+    >>> stats.statistics()['udev_enumerate_scan_devices'].calls
+    1
+    >>> with open('/tmp/pyudev-calls.json', 'w') as stream:
+    ...     stats.dump(stream)
+
+    Only contexts created while instrumentation is enabled are observed,
+    together with all enumerators, devices and monitors created from them.
+    Contexts created while instrumentation is disabled call libudev directly,
+    without any overhead.
+
+    .. versionadded:: 0.17
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._calls = {}
+        self._libraries = {}
+
+    def _record(self, name, duration):
+        bucket = bisect_left(HISTOGRAM_BOUNDS, duration)
+        with self._lock:
+            calls = self._calls.get(name)
+            if calls is None:
+                calls = self._calls[name] = [0, 0.0,
+                                             [0] * (len(HISTOGRAM_BOUNDS) + 1)]
+            calls[0] += 1
+            calls[1] += duration
+            calls[2][bucket] += 1
+
+    def wrap(self, libudev):
+        """
+        Get an instrumented proxy for the library object ``libudev``, as
+        returned by :func:`~pyudev._libudev.load_udev_library()`.
+
+        Return the proxy, whose calls are recorded in this object.
+        """
+        with self._lock:
+            library = self._libraries.get(id(libudev))
+            if library is None:
+                library = InstrumentedLibrary(libudev, self)
+                self._libraries[id(libudev)] = library
+            return library
+
+    def statistics(self):
+        """
+        Get the statistics of all called functions.
+
+        Return a dictionary mapping the name of each libudev function called
+        at least once to its :class:`CallStatistics`.
+        """
+        with self._lock:
+            return dict(
+                (name, CallStatistics(calls, total_time, tuple(histogram)))
+                for name, (calls, total_time, histogram) in
+                self._calls.items())
+
+    def reset(self):
+        """
+        Discard all recorded calls.
+        """
+        with self._lock:
+            self._calls.clear()
+
+    def as_dict(self):
+        """
+        Get the statistics of all called functions as a dictionary of plain
+        data, suitable for serialization with :mod:`json`.
+
+        The dictionary contains the ``histogram_bounds`` (see
+        :data:`HISTOGRAM_BOUNDS`), and the statistics of every function in
+        ``functions``, mapping function names to dictionaries with the items
+        ``calls``, ``total_time``, ``mean_time`` and ``histogram``.
+        """
+        functions = {}
+        for name, stats in self.statistics().items():
+            functions[name] = dict(calls=stats.calls,
+                                   total_time=stats.total_time,
+                                   mean_time=stats.total_time / stats.calls,
+                                   histogram=list(stats.histogram))
+        return dict(histogram_bounds=list(HISTOGRAM_BOUNDS),
+                    functions=functions)
+
+    def dump(self, stream):
+        """
+        Write the statistics of all called functions as JSON to the
+        file-like object ``stream``.
+
+        The JSON document contains the dictionary returned by
+        :meth:`as_dict()`.
+        """
+        json.dump(self.as_dict(), stream, indent=2, sort_keys=True)
+
+
+def enable(instrumentation=None):
+    """
+    Enable instrumentation of calls into libudev.
+
+    ``instrumentation`` is the :class:`Instrumentation` to record calls in.
+    If ``None``, a new :class:`Instrumentation` is created.  Calls are
+    recorded for all contexts created after this function returned.
+
+    Return the enabled :class:`Instrumentation`.
+
+    .. versionadded:: 0.17
+    """
+    if instrumentation is None:
+        instrumentation = Instrumentation()
+    _libudev.instrumentation = instrumentation
+    return instrumentation
+
+
+def disable():
+    """
+    Disable instrumentation of calls into libudev.
+
+    Contexts created after this function returned call libudev directly
+    again.  Contexts created before continue to record their calls.
+
+    Return the previously enabled :class:`Instrumentation`, or ``None``.
+
+    .. versionadded:: 0.17
+    """
+    instrumentation = _libudev.instrumentation
+    _libudev.instrumentation = None
+    return instrumentation
+
+
+def current():
+    """
+    Get the currently enabled :class:`Instrumentation`, or ``None``, if
+    instrumentation is disabled.
+
+    .. versionadded:: 0.17
+    """
+    return _libudev.instrumentation
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 Sebastian Wiesner <lunaryorn@gmail.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+"""
+    pyudev.interning
+    ================
+
+    Shared strings for property names and common values.
+
+    .. moduleauthor::  Sebastian Wiesner  <lunaryorn@gmail.com>
+"""
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+import sys
+from collections import namedtuple
+
+
+__all__ = ['InternTable', 'InternStatistics', 'enable', 'disable',
+           'current']
+
+
+InternStatistics = namedtuple('InternStatistics',
+                              'entries hits misses saved_bytes')
+InternStatistics.__doc__ = """
+Statistics of an :class:`InternTable`.
+
+``entries`` is the number of strings in the table.  ``hits`` and ``misses``
+are the number of lookups answered from the table, and the number of
+strings converted from scratch.  ``saved_bytes`` is the memory of all
+strings, which were shared from the table, instead of being allocated
+again.
+"""
+
+
+class InternTable(object):
+    """
+    A table of shared unicode and byte strings.
+
+    If interning is enabled with :func:`enable()`, pyudev decodes all strings
+    it gets from libudev, e.g. the names and values of properties, and
+    encodes all names it passes to libudev through the current table (see
+    :func:`current()`).  The table returns the same
+    string object for equal strings, instead of decoding or encoding them
+    again.  Thus names like ``ID_SERIAL`` or values like ``disk`` exist only
+    once in memory, however many devices,
+    :class:`~pyudev.records.DeviceRecord` objects or
+    :class:`~pyudev.inventory.InventoryDevice` objects refer to them:
+
+    >>> from pyudev import Context, interning
+    >>> from pyudev.records import DeviceRecord
+    >>> interning.enable()
+    <pyudev.interning.InternTable object at 0x...>
+    >>> context = Context()
+    >>> records = [DeviceRecord.from_device(d) for d in context.list_devices()]
+    >>> interning.current().statistics()
+    InternStatistics(entries=1001, hits=1935, misses=1002, saved_bytes=113145)
+
+    Only strings of at most ``max_length`` characters are shared, and at
+    most ``max_entries`` strings are kept.  Once the table is full, strings
+    which are not yet in the table are converted without sharing.  Long
+    strings like device links are usually unique, and would only fill the
+    table.
+
+    Sharing costs a lookup for every string, so iteration over devices
+    becomes slightly slower.  Interning pays off for programs, which keep
+    many devices or records in memory.
+
+    Lookups are thread-safe, but the counters of :meth:`statistics()` are
+    updated without locking, and may miss some concurrent lookups.
+
+    .. versionadded:: 0.17
+    """
+
+    def __init__(self, max_length=64, max_entries=16384):
+        self.max_length = max_length
+        self.max_entries = max_entries
+        # the filesystem encoding cannot change at runtime, so look it up only
+        # once
+        self.encoding = sys.getfilesystemencoding()
+        self._decoded = {}
+        self._encoded = {}
+        self._shared = {}
+        self._hits = 0
+        self._misses = 0
+        self._saved_bytes = 0
+
+    def _share(self, value):
+        shared = self._shared.get(value)
+        if shared is not None:
+            self._hits += 1
+            self._saved_bytes += sys.getsizeof(shared)
+            return shared
+        self._misses += 1
+        if len(self._shared) < self.max_entries:
+            # setdefault, to share the value stored by a concurrent thread
+            value = self._shared.setdefault(value, value)
+        return value
+
+    def decode(self, value):
+        """
+        Decode the byte string ``value`` with the filesystem encoding.
+
+        Return the unicode string, shared with all equal strings in this
+        table.
+        """
+        if len(value) > self.max_length:
+            # long strings are never stored, so do not look them up
+            self._misses += 1
+            return value.decode(self.encoding)
+        decoded = self._decoded.get(value)
+        if decoded is not None:
+            self._hits += 1
+            self._saved_bytes += sys.getsizeof(decoded)
+            return decoded
+        decoded = self._share(value.decode(self.encoding))
+        if len(self._decoded) < self.max_entries:
+            self._decoded[value] = decoded
+        return decoded
+
+    def encode(self, value):
+        """
+        Encode the unicode string ``value`` with the filesystem encoding.
+
+        Return the byte string, shared with all equal strings in this table.
+        """
+        encoded = self._encoded.get(value)
+        if encoded is not None:
+            self._hits += 1
+            self._saved_bytes += sys.getsizeof(encoded)
+            return encoded
+        encoded = value.encode(self.encoding)
+        self._misses += 1
+        if (len(value) <= self.max_length and
+                len(self._encoded) < self.max_entries):
+            encoded = self._encoded.setdefault(value, encoded)
+        return encoded
+
+    def intern(self, value):
+        """
+        Share the unicode string ``value``, which was decoded by other
+        means.
+
+        Return an equal unicode string from this table, or ``value`` itself,
+        if it is too long or the table is full.
+        """
+        if len(value) > self.max_length:
+            return value
+        return self._share(value)
+
+    def statistics(self):
+        """
+        Get the statistics of this table.
+
+        Return an :class:`InternStatistics` object.
+        """
+        return InternStatistics(
+            len(self._shared) + len(self._encoded), self._hits,
+            self._misses, self._saved_bytes)
+
+    def clear(self):
+        """
+        Remove all strings from this table, and reset the statistics.
+        """
+        self._decoded.clear()
+        self._encoded.clear()
+        self._shared.clear()
+        self._hits = self._misses = self._saved_bytes = 0
+
+
+def enable(table=None):
+    """
+    Share decoded and encoded strings in ``table``.
+
+    ``table`` is the :class:`InternTable` to use.  If ``None``, a new
+    :class:`InternTable` is created.  Interning is disabled by default.
+
+    Return the enabled :class:`InternTable`.
+
+    .. versionadded:: 0.17
+    """
+    # import lazily, pyudev._util imports this module
+    from pyudev import _util
+    if table is None:
+        table = InternTable()
+    _util.interning = table
+    return table
+
+
+def disable():
+    """
+    Disable sharing of strings.  All strings are decoded and encoded from
+    scratch afterwards.
+
+    Return the previously enabled :class:`InternTable`, or ``None``.
+
+    .. versionadded:: 0.17
+    """
+    from pyudev import _util
+    table = _util.interning
+    _util.interning = None
+    return table
+
+
+def current():
+    """
+    Get the currently enabled :class:`InternTable`, or ``None``, if
+    interning is disabled.
+
+    .. versionadded:: 0.17
+    """
+    from pyudev import _util
+    return _util.interning
@@ -0,0 +1,478 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 Sebastian Wiesner <lunaryorn@gmail.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+"""
+    pyudev.inventory
+    ================
+
+    A compact binary file format for the properties of enumerated devices.
+
+    An inventory file consists of a header, a sequence of blocks holding the
+    properties of up to ``block_size`` devices each, and a trailer with the
+    names of all properties, the offsets of all blocks and the device paths
+    of all devices, followed by the offset of the trailer.  Blocks and
+    trailer are optionally compressed with :mod:`zlib`.
+
+    All integers are stored as unsigned LEB128 varints.  Strings are
+    interned in string tables, and referred to by their index in the table.
+    Property names share a single table in the trailer, property values have
+    a table in each block.  A string table is stored as varint length,
+    followed by all strings separated by NUL bytes, which never occur in
+    udev strings, so that a whole table is decoded with a single call.
+
+    .. moduleauthor::  Sebastian Wiesner  <lunaryorn@gmail.com>
+"""
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+import os
+import zlib
+import struct
+from threading import Lock
+from collections import Mapping
+
+from pyudev._util import (ensure_byte_string, ensure_unicode_string,
+                          intern_strings, string_to_bool, udev_list_entries)
+
+
+__all__ = ['Inventory', 'InventoryDevice', 'write_inventory']
+
+
+#: The magic bytes at the start and the end of each inventory file
+MAGIC = b'\x89PYUDEVI'
+
+#: The version of the file format written by :func:`write_inventory()`
+FORMAT_VERSION = 1
+
+_FOOTER = struct.Struct(str('<Q8s'))
+
+_COMPRESSED = 1
+
+
+def _write_varint(buffer, value):
+    while value > 0x7f:
+        buffer.append((value & 0x7f) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _write_table(buffer, strings):
+    table = b'\0'.join(strings)
+    _write_varint(buffer, len(table))
+    buffer.extend(table)
+
+
+def _decode_varints(data):
+    """
+    Decode all varints in the byte string ``data``.
+
+    Return a list of integers.
+    """
+    values = []
+    append = values.append
+    value = shift = 0
+    # iterating over a bytearray gives integers on Python 2, too
+    for byte in bytearray(data):
+        if byte < 0x80:
+            append(value | (byte << shift))
+            value = shift = 0
+        else:
+            value |= (byte & 0x7f) << shift
+            shift += 7
+    if shift:
+        raise ValueError('Truncated inventory data')
+    return values
+
+
+class _Reader(object):
+    """
+    Decodes a sequence of string tables, followed by varints.
+    """
+
+    __slots__ = ('data', 'offset')
+
+    def __init__(self, data):
+        self.data = data
+        self.offset = 0
+
+    def table(self):
+        """
+        Read a string table.
+
+        Return a list of unicode strings.
+        """
+        data = self.data
+        offset = self.offset
+        length = shift = 0
+        for byte in bytearray(data[offset:offset + 10]):
+            offset += 1
+            length |= (byte & 0x7f) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        end = offset + length
+        if end > len(data):
+            raise ValueError('Truncated inventory data')
+        self.offset = end
+        return ensure_unicode_string(data[offset:end]).split('\0')
+
+    def varints(self):
+        """
+        Read all remaining data as varints.
+
+        Return a list of integers.
+        """
+        return _decode_varints(self.data[self.offset:])
+
+
+class _BlockWriter(object):
+    """
+    Collects the properties of the devices of a single block.
+    """
+
+    def __init__(self):
+        self.values = {}
+        self.value_list = []
+        self.records = bytearray()
+        self.count = 0
+
+    def add(self, properties):
+        values = self.values
+        records = self.records
+        _write_varint(records, len(properties))
+        for name_id, value in properties:
+            value_id = values.get(value)
+            if value_id is None:
+                value_id = values[value] = len(self.value_list)
+                self.value_list.append(value)
+            _write_varint(records, name_id)
+            _write_varint(records, value_id)
+        self.count += 1
+
+    def encode(self):
+        buffer = bytearray()
+        _write_table(buffer, self.value_list)
+        _write_varint(buffer, self.count)
+        buffer.extend(self.records)
+        return bytes(buffer)
+
+
+def write_inventory(enumerator, filename, compress=True, block_size=64):
+    """
+    Write the properties of all devices matched by ``enumerator`` to the
+    inventory file ``filename``.
+
+    ``enumerator`` is an :class:`~pyudev.Enumerator`.  Devices are written
+    one block at a time, so only the device paths and the current block are
+    kept in memory.  If ``compress`` is ``True``, each block is compressed
+    with :mod:`zlib`.  ``block_size`` is the number of devices per block.
+    Larger blocks compress better, smaller blocks make random access
+    cheaper.
+
+    The inventory is written to a temporary file first, which then replaces
+    ``filename``, so that ``filename`` always contains a complete inventory.
+
+    Return the number of written devices.
+
+    .. versionadded:: 0.17
+    """
+    if block_size < 1:
+        raise ValueError('block_size must be positive: {0!r}'.format(
+            block_size))
+    libudev = enumerator._libudev
+    names = {}
+    device_paths = []
+    blocks = []
+    temporary = '{0}.tmp'.format(filename)
+    with open(temporary, 'wb') as stream:
+        header = bytearray(MAGIC)
+        _write_varint(header, FORMAT_VERSION)
+        _write_varint(header, _COMPRESSED if compress else 0)
+        stream.write(bytes(header))
+        offset = len(header)
+
+        def flush(block):
+            data = block.encode()
+            if compress:
+                data = zlib.compress(data)
+            stream.write(data)
+            blocks.append((offset, len(data)))
+            return offset + len(data)
+
+        block = _BlockWriter()
+        for device in enumerator:
+            entry = libudev.udev_device_get_properties_list_entry(device)
+            properties = []
+            for name, value in udev_list_entries(libudev, entry):
+                name_id = names.get(name)
+                if name_id is None:
+                    name_id = names[name] = len(names)
+                properties.append((name_id, value or b''))
+            device_paths.append(ensure_byte_string(device.device_path))
+            block.add(properties)
+            if block.count == block_size:
+                offset = flush(block)
+                block = _BlockWriter()
+        if block.count:
+            offset = flush(block)
+
+        trailer = bytearray()
+        _write_table(trailer,
+                     [ensure_byte_string(enumerator.context.sys_path)])
+        _write_table(trailer, sorted(names, key=names.get))
+        # compression takes care of the long common prefixes of device paths
+        _write_table(trailer, device_paths)
+        _write_varint(trailer, block_size)
+        _write_varint(trailer, len(blocks))
+        for block_offset, length in blocks:
+            _write_varint(trailer, block_offset)
+            _write_varint(trailer, length)
+        trailer = bytes(trailer)
+        if compress:
+            trailer = zlib.compress(trailer)
+        stream.write(trailer)
+        stream.write(_FOOTER.pack(offset, MAGIC))
+    os.rename(temporary, filename)
+    return len(device_paths)
+
+
+class InventoryDevice(Mapping):
+    """
+    A device read from an :class:`Inventory`.
+
+    Like :class:`~pyudev.Device`, this class subclasses the ``Mapping`` ABC,
+    providing read-only access to the device properties, with property names
+    and values as unicode strings.
+
+    .. versionadded:: 0.17
+    """
+
+    __slots__ = ('sys_path', 'device_path', '_properties')
+
+    def __init__(self, sys_path, device_path, properties):
+        #: The :attr:`~pyudev.Device.sys_path` as unicode string
+        self.sys_path = sys_path
+        #: The :attr:`~pyudev.Device.device_path` as unicode string
+        self.device_path = device_path
+        self._properties = properties
+
+    def __repr__(self):
+        return 'InventoryDevice({0.device_path!r})'.format(self)
+
+    @property
+    def subsystem(self):
+        """
+        The :attr:`~pyudev.Device.subsystem` as unicode string or ``None``.
+        """
+        return self.get('SUBSYSTEM')
+
+    @property
+    def device_type(self):
+        """
+        The :attr:`~pyudev.Device.device_type` as unicode string or
+        ``None``.
+        """
+        return self.get('DEVTYPE')
+
+    @property
+    def driver(self):
+        """
+        The :attr:`~pyudev.Device.driver` as unicode string or ``None``.
+        """
+        return self.get('DRIVER')
+
+    @property
+    def device_node(self):
+        """
+        The :attr:`~pyudev.Device.device_node` as unicode string or
+        ``None``.
+        """
+        return self.get('DEVNAME')
+
+    def __iter__(self):
+        return iter(self._properties)
+
+    def __len__(self):
+        return len(self._properties)
+
+    def __getitem__(self, property):
+        return self._properties[ensure_unicode_string(property)]
+
+    def asint(self, property):
+        """
+        Get the given ``property`` as integer, like
+        :meth:`pyudev.Device.asint()`.
+        """
+        return int(self[property])
+
+    def asbool(self, property):
+        """
+        Get the given ``property`` as boolean, like
+        :meth:`pyudev.Device.asbool()`.
+        """
+        return string_to_bool(self[property])
+
+
+class Inventory(Mapping):
+    """
+    An inventory file written by :func:`write_inventory()`.
+
+    An inventory maps the :attr:`~pyudev.Device.device_path` of every device
+    in the file to an :class:`InventoryDevice`:
+
+    >>> from pyudev import Context
+    >>> from pyudev.inventory import Inventory, write_inventory
+    >>> context = Context()
+    >>> write_inventory(context.list_devices(), '/var/lib/inventory/host42')
+    245
+    >>> with Inventory('/var/lib/inventory/host42') as inventory:
+    ...     inventory['/devices/virtual/block/loop0']['DEVNAME']
+    u'/dev/loop0'
+
+    Opening an inventory only reads the trailer of the file.  The properties
+    of a device are read when the device is accessed, by decoding the single
+    block which contains the device.  The most recently decoded block is
+    cached, so iterating over all devices decodes every block once.
+
+    ``filename`` is the name of the inventory file as unicode or byte
+    string.  Raise :exc:`~exceptions.ValueError`, if the file does not
+    contain an inventory, or an inventory in an unsupported format.
+
+    .. versionadded:: 0.17
+    """
+
+    def __init__(self, filename):
+        self._stream = open(filename, 'rb')
+        try:
+            self._read_trailer(filename)
+        except Exception:
+            self._stream.close()
+            raise
+        self._lock = Lock()
+        self._cached_block = None
+        self._cached_index = None
+
+    def _read_trailer(self, filename):
+        stream = self._stream
+        header = stream.read(len(MAGIC) + 2)
+        numbers = []
+        if header[:len(MAGIC)] == MAGIC:
+            numbers = _decode_varints(header[len(MAGIC):])
+        if len(numbers) != 2 or numbers[0] != FORMAT_VERSION:
+            raise ValueError('Unsupported inventory format in {0!r}'.format(
+                filename))
+        self._compressed = numbers[1] & _COMPRESSED
+        stream.seek(-_FOOTER.size, os.SEEK_END)
+        end = stream.tell()
+        offset, magic = _FOOTER.unpack(stream.read(_FOOTER.size))
+        if magic != MAGIC or offset > end:
+            raise ValueError('Truncated inventory in {0!r}'.format(filename))
+        stream.seek(offset)
+        trailer = _Reader(self._decompress(stream.read(end - offset)))
+        #: The :attr:`~pyudev.Context.sys_path` of the inventoried system as
+        #: unicode string
+        self.sys_path = trailer.table()[0]
+        # share names and values with other devices, see pyudev.interning
+        self._names = intern_strings(trailer.table())
+        device_paths = self._device_paths = trailer.table()
+        if device_paths == ['']:
+            device_paths[:] = []
+        numbers = trailer.varints()
+        self._block_size = numbers[0]
+        self._blocks = list(zip(numbers[2::2], numbers[3::2]))
+        self._positions = dict(
+            (device_path, position)
+            for position, device_path in enumerate(device_paths))
+
+    def _decompress(self, data):
+        if self._compressed:
+            try:
+                return zlib.decompress(data)
+            except zlib.error as error:
+                raise ValueError('Corrupt inventory data: {0}'.format(error))
+        return data
+
+    def _read_block(self, index):
+        """
+        Read and decode the block with the given ``index``.
+
+        Return a list of property dictionaries, one for each device in the
+        block.
+        """
+        with self._lock:
+            if self._cached_index == index:
+                return self._cached_block
+            offset, length = self._blocks[index]
+            self._stream.seek(offset)
+            reader = _Reader(self._decompress(self._stream.read(length)))
+            values = intern_strings(reader.table())
+            numbers = reader.varints()
+            names = self._names
+            block = []
+            position = 1
+            for _ in range(numbers[0]):
+                end = position + 1 + 2 * numbers[position]
+                block.append(dict(zip(
+                    [names[i] for i in numbers[position + 1:end:2]],
+                    [values[i] for i in numbers[position + 2:end:2]])))
+                position = end
+            self._cached_block = block
+            self._cached_index = index
+            return block
+
+    def close(self):
+        """
+        Close the inventory file.
+        """
+        self._stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return len(self._device_paths)
+
+    def __iter__(self):
+        """
+        Iterate over the device paths of all devices as unicode strings, in
+        the order in which they were written.
+        """
+        return iter(self._device_paths)
+
+    def __contains__(self, device_path):
+        return ensure_unicode_string(device_path) in self._positions
+
+    def __getitem__(self, device_path):
+        """
+        Get the device with the given ``device_path`` as unicode or byte
+        string.
+
+        Return an :class:`InventoryDevice`.  Raise
+        :exc:`~exceptions.KeyError`, if the inventory does not contain a
+        device with this path.
+        """
+        device_path = ensure_unicode_string(device_path)
+        position = self._positions[device_path]
+        block = self._read_block(position // self._block_size)
+        return InventoryDevice(self.sys_path + device_path, device_path,
+                               block[position % self._block_size])
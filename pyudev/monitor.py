@@ -31,10 +31,11 @@
 
 import os
 import select
-from threading import Thread
+from threading import Thread, current_thread
 from contextlib import closing
 
-from pyudev._util import ensure_byte_string
+from pyudev._util import (ensure_byte_string, acquire_handle,
+                          release_handle, ClosedLibrary)
 
 from pyudev.core import Device
 
@@ -77,19 +78,53 @@ class Monitor(object):
     Instances of this class can directly be given as ``udev_monitor *`` to
     functions wrapped through :mod:`ctypes`.
 
+    A monitor releases its libudev object and closes its socket when garbage
+    collected, or explicitly with :meth:`close()`, e.g. at the end of a
+    ``with`` statement.
+
     .. versionchanged:: 0.16
        Remove :meth:`from_socket()` which is deprecated, and even removed in
        recent udev versions.
+    .. versionchanged:: 0.17
+       Add :meth:`close()` and support for the ``with`` statement.
     """
 
     def __init__(self, context, monitor_p):
         self.context = context
         self._as_parameter_ = monitor_p
+        acquire_handle('monitors')
         self._libudev = context._libudev
         self._started = False
 
     def __del__(self):
-        self._libudev.udev_monitor_unref(self)
+        if self._as_parameter_ is not None:
+            self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Release the libudev object of this monitor, and close its socket.
+
+        Afterwards any use of this monitor raises
+        :exc:`~exceptions.ValueError`.  Stop any :class:`MonitorObserver` of
+        this monitor before.  Closing a closed monitor has no effect.
+
+        .. versionadded:: 0.17
+        """
+        handle = self._as_parameter_
+        if handle is None:
+            return
+        libudev = self._libudev
+        self._as_parameter_ = None
+        self._libudev = ClosedLibrary('Monitor')
+        self._started = False
+        release_handle('monitors')
+        libudev.udev_monitor_unref(handle)
 
     @classmethod
     def from_netlink(cls, context, source='udev'):
@@ -449,10 +484,20 @@ class MonitorObserver(Thread):
        :attr:`Device.sequence_number`
           The sequence number of this event.
 
+    An observer owns a pipe to send the stop signal to its thread.
+    :meth:`close()` stops the thread and closes the pipe.  Observers are
+    context managers, which close the observer on exit:
+
+    >>> with MonitorObserver(monitor, callback=print_device_event) as observer:
+    ...     observer.start()
+    ...     wait_for_shutdown()
+
     .. versionadded:: 0.14
 
     .. versionchanged:: 0.15
        :meth:`Monitor.start()` is implicitly called when the thread is started.
+    .. versionchanged:: 0.17
+       Add :meth:`close()` and support for the ``with`` statement.
     """
 
     def __init__(self, monitor, event_handler=None, callback=None, *args,
@@ -508,6 +553,7 @@ def run(self):
                         # in case of a stop event, close our pipe side, and
                         # return from the thread
                         os.close(self._stop_event_source)
+                        self._stop_event_source = None
                         return
                     else:
                         device = self.monitor.poll(timeout=0)
@@ -565,3 +611,35 @@ def stop(self):
             self.join()
         except RuntimeError:
             pass
+
+    def close(self):
+        """
+        Stop the background thread like :meth:`stop()`, if it is running,
+        and close the pipe of this observer.
+
+        If called from the observer thread, the thread closes its side of the
+        pipe itself, when it exits.  Closing a closed observer has no effect.
+
+        .. note::
+
+           The underlying :attr:`monitor` is *not* closed.
+
+        .. versionadded:: 0.17
+        """
+        if current_thread() is self:
+            self.send_stop()
+            return
+        if self.is_alive():
+            self.stop()
+        elif self._stop_event_sink is not None:
+            os.close(self._stop_event_sink)
+            self._stop_event_sink = None
+        if self._stop_event_source is not None:
+            os.close(self._stop_event_source)
+            self._stop_event_source = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,369 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 Sebastian Wiesner <lunaryorn@gmail.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+"""
+    pyudev.offline
+    ==============
+
+    Offline device databases loaded from ``udevadm info --export-db`` dumps.
+
+    .. moduleauthor::  Sebastian Wiesner  <lunaryorn@gmail.com>
+"""
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+import os
+from bisect import bisect_left
+from fnmatch import fnmatchcase
+
+from pyudev.core import Context
+from pyudev._util import ensure_byte_string, text_type
+from pyudev.sysfs import SysfsUdevLibrary
+
+
+__all__ = ['OfflineUdevLibrary', 'iter_export_db', 'load']
+
+
+def iter_export_db(stream):
+    """
+    Parse the output of ``udevadm info --export-db`` from ``stream``.
+
+    ``stream`` is a file-like object opened in binary mode, or any other
+    iterable over byte string lines.  The dump is parsed while reading, so
+    the whole dump never needs to be in memory.
+
+    Yield a dictionary for each device in the dump.  The dictionary maps the
+    record keys of ``udevadm`` (e.g. ``'P'`` for the device path, ``'N'`` for
+    the device node) to their values as byte strings.  The keys ``'S'``
+    (links) and ``'G'`` (tags) map to lists, and ``'E'`` to a list of
+    ``(name, value)`` tuples of all properties.
+
+    .. versionadded:: 0.17
+    """
+    record = properties = None
+    for line in stream:
+        line = line.rstrip(b'\r\n')
+        # "K: value", with a single blank after the colon.  Properties are
+        # by far the most frequent lines, so test for them first
+        prefix = line[:3]
+        if prefix == b'E: ':
+            if record is None:
+                record = {'S': [], 'G': [], 'E': []}
+                properties = record['E']
+            name, _, value = line[3:].partition(b'=')
+            properties.append((name, value))
+        elif not line:
+            if record is not None:
+                yield record
+                record = None
+        else:
+            if record is None:
+                record = {'S': [], 'G': [], 'E': []}
+                properties = record['E']
+            key = prefix[:1].decode('ascii')
+            if key == 'S' or key == 'G':
+                record[key].append(line[3:])
+            else:
+                record[key] = line[3:]
+    if record is not None:
+        yield record
+
+
+class _OfflineDevice(object):
+    """
+    A device of an offline database, providing the same interface as the
+    devices of :class:`~pyudev.sysfs.SysfsUdevLibrary`.
+    """
+
+    __slots__ = ('library', 'sys_path', 'device_path', 'sys_name',
+                 'uevent', 'properties', 'links', 'tags', '_parent',
+                 'initialized', 'action', 'seqnum', 'db')
+
+    def __init__(self, library, device_path, properties, links, tags,
+                 initialized=False):
+        self.library = library
+        self.device_path = device_path
+        self.sys_path = library.sys_path + device_path
+        self.sys_name = device_path.rpartition(b'/')[2].replace(b'!', b'/')
+        self.properties = properties
+        # the properties as dictionary, libudev takes DEVTYPE and IFINDEX
+        # from the uevent file, which contains the same values
+        self.uevent = dict(properties)
+        self.links = links
+        self.tags = tags
+        self.initialized = initialized or b'USEC_INITIALIZED' in self.uevent
+        self._parent = self
+        self.action = None
+        self.seqnum = 0
+        # the time of initialization in a dump is meaningless on other hosts
+        self.db = None
+
+    @property
+    def sys_number(self):
+        sys_name = self.sys_name
+        start = len(sys_name)
+        while start > 0 and sys_name[start - 1:start].isdigit():
+            start -= 1
+        return sys_name[start:] or None
+
+    @property
+    def subsystem(self):
+        return self.uevent.get(b'SUBSYSTEM')
+
+    @property
+    def driver(self):
+        return self.uevent.get(b'DRIVER')
+
+    @property
+    def device_number(self):
+        major = self.uevent.get(b'MAJOR')
+        minor = self.uevent.get(b'MINOR')
+        if major is None or minor is None:
+            return 0
+        return os.makedev(int(major), int(minor))
+
+    @property
+    def device_node(self):
+        name = self.uevent.get(b'DEVNAME')
+        if name is None or name.startswith(b'/'):
+            return name
+        return self.library.dev_path + b'/' + name
+
+    @property
+    def is_initialized(self):
+        return self.initialized
+
+    def property_value(self, name):
+        return self.uevent.get(name)
+
+    def attribute_value(self, attribute):
+        # dumps do not contain attributes
+        return None
+
+    def attribute_names(self):
+        return []
+
+    @property
+    def parent(self):
+        if self._parent is self:
+            parent = None
+            devices = self.library._devices
+            parts = self.device_path.lstrip(b'/').split(b'/')
+            for length in range(len(parts) - 1, 1, -1):
+                parent = devices.get(
+                    b'/' + b'/'.join(parts[:length]))
+                if parent is not None:
+                    break
+            self._parent = parent
+        return self._parent
+
+
+def _has_wildcards(pattern):
+    return any(c in pattern for c in (b'*', b'?', b'['))
+
+
+class OfflineUdevLibrary(SysfsUdevLibrary):
+    """
+    A device database loaded from the output of ``udevadm info
+    --export-db``, which provides the libudev interface of
+    :class:`~pyudev.sysfs.SysfsUdevLibrary`.
+
+    Pass it to :class:`~pyudev.Context` to query a dump with the API of
+    pyudev, or use :func:`load()`:
+
+    >>> from pyudev import Context
+    >>> from pyudev.offline import OfflineUdevLibrary
+    >>> with open('host42.udevdb', 'rb') as stream:
+    ...     context = Context(OfflineUdevLibrary(stream))
+    >>> [d.device_node for d in context.list_devices(subsystem='block',
+    ...                                               DEVTYPE='disk')]
+    [u'/dev/sda', u'/dev/sdb']
+
+    ``stream`` is the dump as file-like object in binary mode, or as any
+    iterable over byte string lines.  ``sys_path`` and ``dev_path`` are the
+    mount point of ``sysfs`` and the device directory on the host of the
+    dump.
+
+    Devices are indexed by subsystem, name, tag and path while loading, and
+    by the values of a property on the first enumeration matching this
+    property.  Enumerations with matches use these indexes instead of
+    testing every device.  Attributes are not part of a dump, hence all
+    attributes of offline devices are missing.
+
+    .. versionadded:: 0.17
+    """
+
+    def __init__(self, stream, sys_path='/sys', dev_path='/dev'):
+        SysfsUdevLibrary.__init__(self, sys_path=sys_path, dev_path=dev_path)
+        dev_prefix = self.dev_path + b'/'
+        # share the byte strings of property names between all devices
+        names = {}
+        devices = self._devices = {}
+        by_subsystem = self._by_subsystem = {}
+        by_sys_name = self._by_sys_name = {}
+        by_tag = self._by_tag = {}
+        by_number = self._by_number = {}
+        for record in iter_export_db(stream):
+            device_path = record.get('P')
+            if not device_path:
+                continue
+            intern = names.setdefault
+            properties = tuple([(intern(name, name), value)
+                                for name, value in record['E']])
+            links = [dev_prefix + link for link in record['S']]
+            tags = record['G']
+            # newer versions of udev export the time of initialization
+            device = _OfflineDevice(self, device_path, properties, links,
+                                    tags, initialized='I' in record)
+            if not tags:
+                # older versions of udev only export the TAGS property
+                tags_property = device.uevent.get(b'TAGS')
+                if tags_property:
+                    device.tags = [t for t in tags_property.split(b':') if t]
+            sys_path = device.sys_path
+            devices[device_path] = device
+            by_subsystem.setdefault(device.subsystem, set()).add(sys_path)
+            by_sys_name.setdefault(device.sys_name, set()).add(sys_path)
+            for tag in device.tags:
+                by_tag.setdefault(tag, set()).add(sys_path)
+            number = device.device_number
+            if number:
+                kind = b'b' if device.subsystem == b'block' else b'c'
+                by_number[kind, number] = device
+        self._sys_paths = sorted(d.sys_path for d in devices.values())
+        self._by_property = {}
+
+    def __len__(self):
+        return len(self._devices)
+
+    def _new_device(self, udev, sys_path):
+        if not sys_path.startswith(self.sys_path + b'/'):
+            return None
+        return self._devices.get(sys_path[len(self.sys_path):])
+
+    def _property_index(self, name):
+        index = self._by_property.get(name)
+        if index is None:
+            index = {}
+            for device in self._devices.values():
+                value = device.uevent.get(name)
+                if value is not None:
+                    index.setdefault(value, set()).add(device.sys_path)
+            self._by_property[name] = index
+        return index
+
+    def _subtree(self, sys_path):
+        """
+        Get the sys paths of the device at ``sys_path`` and all devices below
+        it.
+        """
+        paths = self._sys_paths
+        subtree = set()
+        prefix = sys_path + b'/'
+        for index in range(bisect_left(paths, sys_path), len(paths)):
+            path = paths[index]
+            if not path.startswith(sys_path):
+                # all paths starting with sys_path are sorted together
+                break
+            if path == sys_path or path.startswith(prefix):
+                subtree.add(path)
+        return subtree
+
+    def _candidates(self, enumerate):
+        """
+        Find the sys paths of all devices, which may match ``enumerate``,
+        by intersecting the indexes of all positive matches.
+        """
+        candidates = []
+        if enumerate.subsystems:
+            candidates.append(_lookup(self._by_subsystem,
+                                      enumerate.subsystems))
+        if enumerate.sysnames:
+            candidates.append(_lookup(self._by_sys_name, enumerate.sysnames))
+        for tag in enumerate.tags:
+            candidates.append(self._by_tag.get(tag, set()))
+        if enumerate.properties:
+            # any property may match
+            matching = set()
+            for name, pattern in enumerate.properties:
+                matching.update(_lookup(self._property_index(name),
+                                        [pattern]))
+            candidates.append(matching)
+        if enumerate.parent is not None:
+            candidates.append(self._subtree(enumerate.parent.sys_path))
+        if not candidates:
+            return list(self._sys_paths)
+        candidates.sort(key=len)
+        result = set(candidates[0])
+        for other in candidates[1:]:
+            result.intersection_update(other)
+        return result
+
+    def udev_device_new_from_subsystem_sysname(self, udev, subsystem,
+                                               sys_name):
+        for sys_path in self._by_sys_name.get(sys_name, ()):
+            device = self._new_device(udev, sys_path)
+            if device.subsystem == subsystem:
+                return device
+        return None
+
+    def udev_device_new_from_devnum(self, udev, type, number):
+        return self._by_number.get((type, number))
+
+
+def _lookup(index, patterns):
+    """
+    Get the union of the entries of ``index`` for all keys matching any of
+    the given ``patterns``.
+    """
+    result = set()
+    for pattern in patterns:
+        if _has_wildcards(pattern):
+            for key, values in index.items():
+                if key is not None and fnmatchcase(key, pattern):
+                    result.update(values)
+        else:
+            result.update(index.get(pattern, ()))
+    return result
+
+
+def load(source, sys_path='/sys', dev_path='/dev'):
+    """
+    Load a dump of ``udevadm info --export-db`` into a new
+    :class:`~pyudev.Context`.
+
+    ``source`` is the name of the dump file as unicode or byte string, which
+    may be compressed with gzip if its name ends with ``.gz``, or a
+    file-like object in binary mode.  ``sys_path`` and ``dev_path`` are
+    passed to :class:`OfflineUdevLibrary`.
+
+    Return a :class:`~pyudev.Context` for the devices of the dump.
+
+    .. versionadded:: 0.17
+    """
+    if not isinstance(source, (text_type, bytes)):
+        return Context(OfflineUdevLibrary(source, sys_path, dev_path))
+    if ensure_byte_string(source).endswith(b'.gz'):
+        import gzip
+        opener = gzip.open
+    else:
+        opener = open
+    with opener(source, 'rb') as stream:
+        return Context(OfflineUdevLibrary(stream, sys_path, dev_path))
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 Sebastian Wiesner <lunaryorn@gmail.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+"""
+    pyudev.pool
+    ===========
+
+    Per-thread :class:`~pyudev.Context` objects for multithreaded programs.
+
+    .. moduleauthor::  Sebastian Wiesner  <lunaryorn@gmail.com>
+"""
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+import os
+import threading
+from weakref import WeakSet
+from collections import namedtuple
+
+try:
+    from thread import get_ident
+except ImportError:
+    from threading import get_ident
+
+from pyudev.core import Context
+
+
+__all__ = ['ContextPool', 'PoolStatistics', 'ForeignThreadError',
+           'thread_context']
+
+
+class ForeignThreadError(RuntimeError):
+    """
+    A :class:`~pyudev.Context` or :class:`~pyudev.Device` of a
+    :class:`ContextPool` was used by another thread than the thread it
+    belongs to.
+
+    .. versionadded:: 0.17
+    """
+
+
+PoolStatistics = namedtuple('PoolStatistics', 'created reused live')
+PoolStatistics.__doc__ = """
+Statistics of a :class:`ContextPool`.
+
+``created`` is the number of contexts created by the pool, ``reused`` the
+number of requests served by an existing context, and ``live`` the number of
+contexts, which are still alive.  All values are integers.
+"""
+
+
+class ThreadCheckedLibrary(object):
+    """
+    A proxy for the libudev library object, whose functions may only be
+    called by the thread with the identifier ``owner``.
+
+    Functions which release libudev objects are not checked, because objects
+    may be garbage collected in any thread.
+    """
+
+    def __init__(self, libudev, owner):
+        self._libudev = libudev
+        self._owner = owner
+
+    def __getattr__(self, name):
+        function = getattr(self._libudev, name)
+        if name.endswith('_unref'):
+            return function
+        owner = self._owner
+
+        def checked(*args):
+            if get_ident() != owner:
+                raise ForeignThreadError(
+                    '{0}() called in thread {1}, but the object belongs to '
+                    'thread {2}'.format(name, get_ident(), owner))
+            return function(*args)
+        checked.__name__ = str(name)
+        # cache the wrapper, __getattr__ is only called for missing attributes
+        setattr(self, name, checked)
+        return checked
+
+
+class ContextPool(object):
+    """
+    A pool of :class:`~pyudev.Context` objects, with one context per thread.
+
+    libudev objects are not thread-safe, so every thread needs its own
+    context.  Instead of creating a new context for each unit of work, get
+    the context of the current thread from a pool:
+
+    >>> from pyudev.pool import ContextPool
+    >>> pool = ContextPool()
+    >>> def handle_request(request):
+    ...     context = pool.get()
+    ...     return list(context.list_devices(subsystem='block'))
+
+    The context of a thread is created on first use, and released with the
+    thread.  After :func:`os.fork` the child process gets new contexts.
+
+    If ``check_threads`` is ``True``, the contexts of the pool and all
+    enumerators, devices and monitors created from them raise
+    :exc:`ForeignThreadError` when they are used in any other thread than the
+    thread which got the context from the pool.  These checks add a small
+    overhead to every call into libudev, and are intended for testing.
+
+    .. versionadded:: 0.17
+    """
+
+    def __init__(self, check_threads=False):
+        self.check_threads = check_threads
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._live = WeakSet()
+        self._created = 0
+        self._reused = 0
+
+    def get(self):
+        """
+        Get the :class:`~pyudev.Context` of the current thread.
+
+        Return a :class:`~pyudev.Context`.
+        """
+        local = self._local
+        context = getattr(local, 'context', None)
+        pid = os.getpid()
+        if context is not None and local.pid == pid:
+            with self._lock:
+                self._reused += 1
+            return context
+        context = Context()
+        if self.check_threads:
+            # enumerators, devices and monitors use the library object of
+            # their context
+            context._libudev = ThreadCheckedLibrary(context._libudev,
+                                                    get_ident())
+        local.context = context
+        local.pid = pid
+        with self._lock:
+            self._created += 1
+            self._live.add(context)
+        return context
+
+    @property
+    def statistics(self):
+        """
+        The current :class:`PoolStatistics` of this pool.
+        """
+        with self._lock:
+            return PoolStatistics(self._created, self._reused,
+                                  len(self._live))
+
+
+_default_pool = ContextPool()
+
+
+def thread_context():
+    """
+    Get the :class:`~pyudev.Context` of the current thread from a global
+    :class:`ContextPool`.
+
+    .. versionadded:: 0.17
+    """
+    return _default_pool.get()
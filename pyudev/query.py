@@ -0,0 +1,548 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 Sebastian Wiesner <lunaryorn@gmail.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+"""
+    pyudev.query
+    ============
+
+    Predicate expressions for device enumeration.
+
+    Predicates are built from fields and combined with ``&`` (and), ``|``
+    (or) and ``~`` (not):
+
+    >>> from pyudev import Context
+    >>> from pyudev.query import Subsystem, Property, Attribute, HasTag
+    >>> context = Context()
+    >>> disks = context.list_devices(
+    ...     (Subsystem() == 'block') & (Property('DEVTYPE') == 'disk') &
+    ...     ~(Property('ID_BUS') == 'usb') & (Attribute('size') > 0))
+    >>> print(disks.explain())
+    libudev: match_subsystem('block')
+    libudev: match_property('DEVTYPE', 'disk')
+    python: (Property('ID_BUS') != 'usb' & Attribute('size') > 0)
+
+    :meth:`pyudev.Enumerator.where()` plans each predicate:  All parts, which
+    libudev can filter, are pushed into the enumeration.  The remaining parts
+    are evaluated in Python on each enumerated device, cheap tests (e.g. on
+    properties) before expensive ones (e.g. on attributes, which are read from
+    ``sysfs``).
+
+    .. moduleauthor::  Sebastian Wiesner  <lunaryorn@gmail.com>
+"""
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+import re
+from numbers import Real
+
+from pyudev._util import ensure_unicode_string, text_type
+
+
+__all__ = ['Subsystem', 'SysName', 'Property', 'Attribute', 'HasTag',
+           'Predicate', 'And', 'Or', 'Not', 'plan']
+
+
+_GLOB_CHARACTERS = frozenset('*?[')
+
+
+def _is_glob(value):
+    return any(c in _GLOB_CHARACTERS for c in value)
+
+
+def _to_number(value):
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+class Predicate(object):
+    """
+    Base class for all predicates.
+
+    Predicates support ``&``, ``|`` and ``~`` to combine them with other
+    predicates.
+    """
+
+    #: The relative cost of evaluating this predicate in Python.
+    cost = 1
+
+    def __call__(self, device):
+        """
+        Evaluate this predicate on the given :class:`~pyudev.Device`.
+
+        Return ``True``, if the device matches, ``False`` otherwise.
+        """
+        raise NotImplementedError()
+
+    def __and__(self, other):
+        return And(self, other)
+
+    def __or__(self, other):
+        return Or(self, other)
+
+    def __invert__(self):
+        return Not(self)
+
+
+class _Composite(Predicate):
+
+    def __init__(self, *operands):
+        flattened = []
+        for operand in operands:
+            if isinstance(operand, type(self)):
+                flattened.extend(operand.operands)
+            else:
+                flattened.append(operand)
+        # evaluate cheap operands first to short-circuit expensive ones
+        self.operands = tuple(sorted(flattened, key=lambda p: p.cost))
+
+    @property
+    def cost(self):
+        return sum(p.cost for p in self.operands)
+
+    def __eq__(self, other):
+        return (type(self) is type(other) and
+                set(self.operands) == set(other.operands))
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((type(self), frozenset(self.operands)))
+
+    def __repr__(self):
+        separator = ' {0} '.format(self.operator)
+        return '({0})'.format(separator.join(repr(p) for p in self.operands))
+
+
+class And(_Composite):
+    """
+    Match devices, which match all operands.
+    """
+
+    operator = '&'
+
+    def __call__(self, device):
+        return all(p(device) for p in self.operands)
+
+
+class Or(_Composite):
+    """
+    Match devices, which match any operand.
+    """
+
+    operator = '|'
+
+    def __call__(self, device):
+        return any(p(device) for p in self.operands)
+
+
+class Not(Predicate):
+    """
+    Match devices, which do not match the operand.
+    """
+
+    def __init__(self, operand):
+        self.operand = operand
+
+    @property
+    def cost(self):
+        return self.operand.cost
+
+    def __call__(self, device):
+        return not self.operand(device)
+
+    def __invert__(self):
+        return self.operand
+
+    def __eq__(self, other):
+        return isinstance(other, Not) and self.operand == other.operand
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((Not, self.operand))
+
+    def __repr__(self):
+        return '~{0!r}'.format(self.operand)
+
+
+class HasTag(Predicate):
+    """
+    Match devices with the given ``tag``.
+    """
+
+    def __init__(self, tag):
+        self.tag = ensure_unicode_string(tag)
+
+    def __call__(self, device):
+        return self.tag in device.tags
+
+    def __eq__(self, other):
+        return isinstance(other, HasTag) and self.tag == other.tag
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((HasTag, self.tag))
+
+    def __repr__(self):
+        return 'HasTag({0!r})'.format(self.tag)
+
+
+class Comparison(Predicate):
+    """
+    Compare the value of a ``field`` with an ``operand``.
+
+    ``operator`` is one of ``'=='``, ``'!='``, ``'<'``, ``'<='``, ``'>'``,
+    ``'>='``, ``'glob'``, ``'startswith'``, ``'matches'`` or ``'exists'``.
+
+    Devices which lack the field never match, except for ``'!='``.  The
+    operand of ``'<'``, ``'<='``, ``'>'`` and ``'>='`` must be a number,
+    otherwise :exc:`~exceptions.TypeError` is raised.
+    """
+
+    def __init__(self, field, operator, operand=None):
+        if operator in ('<', '<=', '>', '>=') and not isinstance(operand,
+                                                                 Real):
+            raise TypeError('{0!r} {1} {2!r}: operand is not a number'.format(
+                field, operator, operand))
+        self.field = field
+        self.operator = operator
+        self.operand = operand
+        if operator == 'matches':
+            self._pattern = re.compile(operand)
+
+    @property
+    def cost(self):
+        return self.field.cost
+
+    def __call__(self, device):
+        value = self.field.value(device)
+        operator = self.operator
+        if operator == '!=':
+            return value != self.operand
+        if value is None:
+            return False
+        if operator == '==':
+            return value == self.operand
+        elif operator == 'exists':
+            return True
+        elif operator == 'glob':
+            from fnmatch import fnmatchcase
+            return fnmatchcase(value, self.operand)
+        elif operator == 'startswith':
+            return value.startswith(self.operand)
+        elif operator == 'matches':
+            return self._pattern.search(value) is not None
+        try:
+            value = _to_number(value)
+        except ValueError:
+            return False
+        if operator == '<':
+            return value < self.operand
+        elif operator == '<=':
+            return value <= self.operand
+        elif operator == '>':
+            return value > self.operand
+        else:
+            return value >= self.operand
+
+    def __invert__(self):
+        if self.operator == '==':
+            return Comparison(self.field, '!=', self.operand)
+        elif self.operator == '!=':
+            return Comparison(self.field, '==', self.operand)
+        return Not(self)
+
+    def _key(self):
+        return (self.field.kind, self.field.name, self.operator, self.operand)
+
+    def __eq__(self, other):
+        return isinstance(other, Comparison) and self._key() == other._key()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __repr__(self):
+        if self.operator == 'exists':
+            return '{0!r}.exists()'.format(self.field)
+        elif self.operator in ('glob', 'startswith', 'matches'):
+            return '{0!r}.{1}({2!r})'.format(self.field, self.operator,
+                                            self.operand)
+        return '{0!r} {1} {2!r}'.format(self.field, self.operator,
+                                        self.operand)
+
+
+class _Field(object):
+    """
+    A field of a device, which creates :class:`Comparison` predicates.
+
+    ``==`` and ``!=`` compare with unicode strings.  ``<``, ``<=``, ``>`` and
+    ``>=`` compare numerically.
+    """
+
+    kind = None
+    cost = 1
+
+    def __init__(self, name=None):
+        self.name = None if name is None else ensure_unicode_string(name)
+
+    def value(self, device):
+        """
+        Return the value of this field for the given ``device`` as unicode
+        string, or ``None``, if the device lacks this field.
+        """
+        raise NotImplementedError()
+
+    def _compare(self, operator, operand):
+        if isinstance(operand, bytes):
+            operand = ensure_unicode_string(operand)
+        elif isinstance(operand, bool):
+            operand = '1' if operand else '0'
+        elif operator in ('==', '!=') and not isinstance(operand, text_type):
+            operand = text_type(operand)
+        return Comparison(self, operator, operand)
+
+    def __eq__(self, other):
+        return self._compare('==', other)
+
+    def __ne__(self, other):
+        return self._compare('!=', other)
+
+    def __lt__(self, other):
+        return Comparison(self, '<', other)
+
+    def __le__(self, other):
+        return Comparison(self, '<=', other)
+
+    def __gt__(self, other):
+        return Comparison(self, '>', other)
+
+    def __ge__(self, other):
+        return Comparison(self, '>=', other)
+
+    __hash__ = None
+
+    def glob(self, pattern):
+        """
+        Match the value against the shell-style ``pattern`` (as in
+        :mod:`fnmatch`).
+        """
+        return Comparison(self, 'glob', ensure_unicode_string(pattern))
+
+    def startswith(self, prefix):
+        """
+        Match values starting with ``prefix``.
+        """
+        return Comparison(self, 'startswith', ensure_unicode_string(prefix))
+
+    def matches(self, regex):
+        """
+        Match values, in which the regular expression ``regex`` is found (as
+        in :func:`re.search`).
+        """
+        return Comparison(self, 'matches', regex)
+
+    def exists(self):
+        """
+        Match devices, which have this field at all.
+        """
+        return Comparison(self, 'exists')
+
+    def __repr__(self):
+        if self.name is None:
+            return '{0}()'.format(type(self).__name__)
+        return '{0}({1!r})'.format(type(self).__name__, self.name)
+
+
+class Subsystem(_Field):
+    """
+    The :attr:`~pyudev.Device.subsystem` of a device.
+    """
+
+    kind = 'subsystem'
+
+    def value(self, device):
+        return device.subsystem
+
+
+class SysName(_Field):
+    """
+    The :attr:`~pyudev.Device.sys_name` of a device.
+    """
+
+    kind = 'sys_name'
+
+    def value(self, device):
+        return device.sys_name
+
+
+class Property(_Field):
+    """
+    The property ``name`` of a device.
+    """
+
+    kind = 'property'
+    cost = 2
+
+    def value(self, device):
+        return device.get(self.name)
+
+
+class Attribute(_Field):
+    """
+    The attribute ``name`` of a device.
+
+    Attribute values are decoded into unicode strings.  Attributes which
+    cannot be decoded are treated as missing.
+    """
+
+    kind = 'attribute'
+    # attributes are read from sysfs
+    cost = 10
+
+    def value(self, device):
+        value = device.attributes.get(self.name)
+        if value is None:
+            return None
+        try:
+            return ensure_unicode_string(value)
+        except UnicodeDecodeError:
+            return None
+
+
+class Plan(object):
+    """
+    The plan of a predicate.
+
+    ``pushed`` is a list of ``(method, args, description)`` tuples, naming
+    the :class:`~pyudev.Enumerator` methods to call with the given args.
+    ``residual`` is the :class:`Predicate` to evaluate in Python, or ``None``
+    if libudev filters everything.
+    """
+
+    def __init__(self, pushed, residual):
+        self.pushed = pushed
+        self.residual = residual
+
+
+# positive matches of these kinds are combined with a logical OR by libudev
+_OR_KINDS = frozenset(['subsystem', 'sys_name', 'property'])
+
+
+def _push_down(comparison):
+    """
+    Translate a single ``comparison`` into an :class:`~pyudev.Enumerator`
+    method call.
+
+    Return ``(method, args, positive)`` or ``None``, if libudev cannot
+    evaluate the comparison exactly.
+    """
+    if not isinstance(comparison, Comparison):
+        if isinstance(comparison, HasTag):
+            return ('match_tag', (comparison.tag,), True)
+        return None
+    field = comparison.field
+    operator = comparison.operator
+    operand = comparison.operand
+    if operator not in ('==', '!=', 'glob'):
+        return None
+    # libudev matches all values as shell-style patterns
+    if operator != 'glob' and _is_glob(operand):
+        return None
+    if operator == '!=':
+        if field.kind == 'subsystem':
+            return ('match_subsystem', (operand, True), False)
+        elif field.kind == 'attribute':
+            return ('match_attribute', (field.name, operand, True), False)
+        return None
+    if field.kind == 'subsystem':
+        return ('match_subsystem', (operand,), True)
+    elif field.kind == 'sys_name':
+        return ('match_sys_name', (operand,), True)
+    elif field.kind == 'property':
+        return ('match_property', (field.name, operand), True)
+    elif field.kind == 'attribute' and operator == '==':
+        return ('match_attribute', (field.name, operand), True)
+    return None
+
+
+def _describe(method, args):
+    return '{0}({1})'.format(method, ', '.join(repr(a) for a in args))
+
+
+def plan(predicate, pushed_kinds=()):
+    """
+    Plan the evaluation of the given ``predicate``.
+
+    ``pushed_kinds`` is a collection of the kinds of positive matches (e.g.
+    ``'subsystem'``), which were already pushed into the enumeration, and
+    must thus not be pushed again, because libudev combines some matches of
+    the same kind with a logical OR.
+
+    Return a :class:`Plan`.
+    """
+    pushed_kinds = set(pushed_kinds)
+    conjuncts = predicate.operands if isinstance(predicate, And) else (
+        predicate,)
+    pushed = []
+    residual = []
+    for conjunct in conjuncts:
+        if isinstance(conjunct, Not):
+            conjunct = ~conjunct.operand
+        if isinstance(conjunct, Or):
+            calls = [_push_down(p) for p in conjunct.operands]
+            kinds = set(getattr(p, 'field', None) and p.field.kind
+                        for p in conjunct.operands)
+            if (all(c is not None and c[2] for c in calls) and
+                    len(kinds) == 1 and kinds <= _OR_KINDS and
+                    not kinds & pushed_kinds):
+                pushed_kinds |= kinds
+                pushed.extend((m, a, _describe(m, a)) for m, a, _ in calls)
+            else:
+                residual.append(conjunct)
+            continue
+        call = _push_down(conjunct)
+        if call is None:
+            residual.append(conjunct)
+            continue
+        method, args, positive = call
+        kind = getattr(conjunct, 'field', None)
+        kind = 'tag' if kind is None else kind.kind
+        if positive:
+            if kind in pushed_kinds:
+                residual.append(conjunct)
+                continue
+            pushed_kinds.add(kind)
+        pushed.append((method, args, _describe(method, args)))
+    if not residual:
+        residual = None
+    elif len(residual) == 1:
+        residual = residual[0]
+    else:
+        residual = And(*residual)
+    return Plan(pushed, residual)
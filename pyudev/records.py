@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 Sebastian Wiesner <lunaryorn@gmail.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+"""
+    pyudev.records
+    ==============
+
+    Picklable device records, to pass enumerated devices to other processes.
+
+    .. moduleauthor::  Sebastian Wiesner  <lunaryorn@gmail.com>
+"""
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+import os
+from threading import Lock
+
+from pyudev.core import Context
+from pyudev.device import Device
+from pyudev._util import (ensure_unicode_string, ensure_byte_string,
+                          udev_list_entries)
+
+
+__all__ = ['DeviceRecord', 'process_context']
+
+
+_process_context = None
+_process_context_pid = None
+_process_context_lock = Lock()
+
+
+def process_context():
+    """
+    Get the :class:`~pyudev.Context` of the current process.
+
+    The context is created on first use, and created again, if the current
+    process is a child forked from the process which created the context,
+    because native libudev objects must not be shared across ``fork()``.
+
+    Return a :class:`~pyudev.Context`.
+
+    .. versionadded:: 0.17
+    """
+    global _process_context, _process_context_pid
+    pid = os.getpid()
+    with _process_context_lock:
+        if _process_context is None or _process_context_pid != pid:
+            _process_context = Context()
+            _process_context_pid = pid
+        return _process_context
+
+
+class DeviceRecord(object):
+    """
+    A picklable record of a :class:`~pyudev.Device`.
+
+    A record holds plain copies of the most important data of a device,
+    without any native libudev object, and can thus be pickled and passed to
+    other processes, e.g. the workers of a
+    :class:`concurrent.futures.ProcessPoolExecutor`:
+
+    >>> from pyudev import Context
+    >>> context = Context()
+    >>> records = list(context.list_devices(subsystem='block').records())
+    >>> with ProcessPoolExecutor() as executor:
+    ...     results = list(executor.map(inspect_device, records))
+
+    A worker can get the real :class:`~pyudev.Device` with :meth:`device()`,
+    if the data of the record is not sufficient.
+
+    .. versionadded:: 0.17
+    """
+
+    __slots__ = ('sys_path', 'device_path', 'subsystem', 'sys_name',
+                 'device_type', 'driver', 'device_node', 'properties',
+                 'attributes', '_device', '_device_pid')
+
+    def __init__(self, sys_path, device_path, subsystem=None, sys_name=None,
+                 device_type=None, driver=None, device_node=None,
+                 properties=None, attributes=None):
+        """
+        Create a new record.
+
+        All arguments correspond to the attributes of the same name.  Use
+        :meth:`from_device()` to create a record of a device.
+        """
+        #: The :attr:`~pyudev.Device.sys_path` as unicode string
+        self.sys_path = sys_path
+        #: The :attr:`~pyudev.Device.device_path` as unicode string
+        self.device_path = device_path
+        #: The :attr:`~pyudev.Device.subsystem` as unicode string or ``None``
+        self.subsystem = subsystem
+        #: The :attr:`~pyudev.Device.sys_name` as unicode string
+        self.sys_name = sys_name
+        #: The :attr:`~pyudev.Device.device_type` as unicode string or
+        #: ``None``
+        self.device_type = device_type
+        #: The :attr:`~pyudev.Device.driver` as unicode string or ``None``
+        self.driver = driver
+        #: The :attr:`~pyudev.Device.device_node` as unicode string or
+        #: ``None``
+        self.device_node = device_node
+        #: A dictionary mapping property names to property values, both as
+        #: unicode strings
+        self.properties = properties or {}
+        #: A dictionary mapping the names of recorded attributes to their
+        #: values as byte strings, or ``None`` for missing attributes
+        self.attributes = attributes or {}
+        self._device = None
+        self._device_pid = None
+
+    @classmethod
+    def from_device(cls, device, attributes=()):
+        """
+        Create a record of the given ``device``.
+
+        ``device`` is a :class:`~pyudev.Device`.  ``attributes`` is a
+        sequence of attribute names as unicode or byte strings, whose values
+        are stored in the record.
+
+        Return a new :class:`DeviceRecord`.
+        """
+        libudev = device._libudev
+        entry = libudev.udev_device_get_properties_list_entry(device)
+        properties = dict(
+            (ensure_unicode_string(name), ensure_unicode_string(value or b''))
+            for name, value in udev_list_entries(libudev, entry))
+        get_attribute = libudev.udev_device_get_sysattr_value
+        recorded_attributes = dict(
+            (ensure_unicode_string(a),
+             get_attribute(device, ensure_byte_string(a)))
+            for a in attributes)
+        return cls(device.sys_path, device.device_path, device.subsystem,
+                   device.sys_name, device.device_type, device.driver,
+                   device.device_node, properties, recorded_attributes)
+
+    def __reduce__(self):
+        return (DeviceRecord, (self.sys_path, self.device_path, self.subsystem,
+                               self.sys_name, self.device_type, self.driver,
+                               self.device_node, self.properties,
+                               self.attributes))
+
+    def __repr__(self):
+        return 'DeviceRecord({0.sys_path!r})'.format(self)
+
+    def __eq__(self, other):
+        if not isinstance(other, DeviceRecord):
+            return NotImplemented
+        return self.__reduce__()[1] == other.__reduce__()[1]
+
+    def __ne__(self, other):
+        if not isinstance(other, DeviceRecord):
+            return NotImplemented
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.sys_path)
+
+    def get(self, property, default=None):
+        """
+        Get the value of the given ``property``, or ``default`` if the
+        device does not have this property.
+        """
+        return self.properties.get(property, default)
+
+    def device(self, context=None):
+        """
+        Get the :class:`~pyudev.Device` of this record.
+
+        ``context`` is the :class:`~pyudev.Context` to create the device in.
+        If ``None``, the context of the current process is used (see
+        :func:`process_context()`).  The device is created on first call and
+        cached for later calls in the same process.
+
+        Return a :class:`~pyudev.Device`.  Raise
+        :exc:`~pyudev.DeviceNotFoundAtPathError`, if the device does not
+        exist anymore.
+        """
+        pid = os.getpid()
+        device = self._device
+        if (device is None or self._device_pid != pid or
+                (context is not None and device.context is not context)):
+            device = Device.from_sys_path(context or process_context(),
+                                          self.sys_path)
+            self._device = device
+            self._device_pid = pid
+        return device
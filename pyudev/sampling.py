@@ -0,0 +1,616 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 Sebastian Wiesner <lunaryorn@gmail.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+"""
+    pyudev.sampling
+    ===============
+
+    Repeated sampling of ``sysfs`` counters and attributes.
+
+    .. moduleauthor::  Sebastian Wiesner  <lunaryorn@gmail.com>
+"""
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+import os
+import io
+import select
+from array import array
+from threading import Lock
+from collections import namedtuple
+
+from pyudev._arrays import load_numpy
+from pyudev._util import ensure_unicode_string, monotonic
+
+
+__all__ = ['Sample', 'SampleDelta', 'BlockStatsSampler',
+           'NetworkCounterSampler', 'AttributeChange', 'AttributeWatcher',
+           'delta']
+
+
+Sample = namedtuple('Sample', 'timestamp device_paths values')
+Sample.__doc__ = """
+A single sample taken by a sampler.
+
+``timestamp`` is the time at which the sample was taken in seconds, as
+returned by :func:`time.monotonic` (or :func:`time.time` on Python versions
+without monotonic clock).  ``device_paths`` is a tuple with the
+:attr:`~pyudev.Device.device_path` of each sampled device.  ``values`` is a
+two-dimensional array of integers with one row per device (in the order of
+``device_paths``) and one column per field of the sampler.  With numpy,
+``values`` is a :class:`numpy.ndarray`, otherwise a list of
+:class:`array.array` rows.
+"""
+
+
+SampleDelta = namedtuple('SampleDelta', 'interval device_paths deltas rates')
+SampleDelta.__doc__ = """
+The difference between two :class:`Sample` objects.
+
+``interval`` is the time between both samples in seconds.  ``device_paths``
+is a tuple of the devices present in both samples.  ``deltas`` contains the
+increase of each counter, and ``rates`` the increase per second, both laid
+out like :attr:`Sample.values`.
+"""
+
+
+def delta(previous, current):
+    """
+    Compute the per-interval difference between the ``previous`` and the
+    ``current`` :class:`Sample`.
+
+    Only devices present in both samples are included in the result.  A
+    counter which decreased (e.g. because the device was re-added in between)
+    is considered reset, and its current value is used as difference.
+
+    Return a :class:`SampleDelta`.
+    """
+    interval = current.timestamp - previous.timestamp
+    previous_rows = dict((p, i) for i, p in enumerate(previous.device_paths))
+    common = [(previous_rows[p], i, p) for i, p in
+              enumerate(current.device_paths) if p in previous_rows]
+    device_paths = tuple(p for _, _, p in common)
+    numpy = load_numpy()
+    if numpy is not None and isinstance(current.values, numpy.ndarray):
+        old = previous.values[[i for i, _, _ in common]]
+        new = current.values[[j for _, j, _ in common]]
+        deltas = numpy.where(new >= old, new - old, new)
+        if interval > 0:
+            rates = deltas / interval
+        else:
+            rates = numpy.zeros(deltas.shape)
+        return SampleDelta(interval, device_paths, deltas, rates)
+    deltas = []
+    rates = []
+    for i, j, _ in common:
+        row = array(str('Q'), (n - o if n >= o else n for o, n in
+                               zip(previous.values[i], current.values[j])))
+        deltas.append(row)
+        rates.append(array(str('d'), (d / interval if interval > 0 else 0.0
+                                      for d in row)))
+    return SampleDelta(interval, device_paths, deltas, rates)
+
+
+def _read_into(f, buffer):
+    """
+    Read the whole content of the file object ``f`` from the beginning into
+    the preallocated ``buffer`` (a :func:`bytearray`).
+
+    Return the content as byte string, which is copied once from the buffer.
+    """
+    if hasattr(os, 'preadv'):
+        size = os.preadv(f.fileno(), [buffer], 0)
+    else:
+        f.seek(0)
+        size = f.readinto(buffer)
+    return bytes(memoryview(buffer)[:size])
+
+
+class _OpenDevice(object):
+    """
+    The open counter files of a single device.
+    """
+
+    def __init__(self, device_path, files):
+        self.device_path = device_path
+        self.files = files
+
+    def close(self):
+        for f in self.files:
+            f.close()
+        self.files = []
+
+
+class _Sampler(object):
+    """
+    Base class for samplers, which keep ``sysfs`` attribute files of a set of
+    devices open, and read all of them in a single sweep.
+
+    Subclasses set :attr:`fields` and :attr:`subsystem`, and implement
+    :meth:`_attribute_files()`.  Each file contains one or more whitespace
+    separated integers, which are stored into consecutive columns of the row
+    of the device.
+    """
+
+    #: The names of the columns of :attr:`Sample.values`.
+    fields = ()
+
+    #: The subsystem of the sampled devices.
+    subsystem = None
+
+    #: The size of the buffer into which files are read.
+    buffer_size = 4096
+
+    def __init__(self, context, devices=None):
+        self.context = context
+        self._lock = Lock()
+        self._devices = []
+        self._buffer = bytearray(self.buffer_size)
+        self._numpy = load_numpy()
+        if devices is None:
+            devices = context.list_devices(subsystem=self.subsystem)
+        for device in devices:
+            self.add_device(device)
+
+    def _attribute_files(self, device):
+        """
+        Return a list of the absolute paths of all files to sample for the
+        given ``device``.
+        """
+        raise NotImplementedError()
+
+    def _accepts(self, device):
+        """
+        Return ``True``, if the given ``device`` is to be sampled.
+        """
+        return device.subsystem == self.subsystem
+
+    @property
+    def device_paths(self):
+        """
+        A tuple with the :attr:`~pyudev.Device.device_path` of all sampled
+        devices in the order of the rows of :attr:`Sample.values`.
+        """
+        with self._lock:
+            return tuple(d.device_path for d in self._devices)
+
+    def add_device(self, device):
+        """
+        Start sampling the given ``device``.
+
+        Devices which are already sampled, or which are not accepted by this
+        sampler are ignored.
+
+        Return ``True``, if the device was added, ``False`` otherwise.
+        """
+        if not self._accepts(device):
+            return False
+        files = []
+        try:
+            for filename in self._attribute_files(device):
+                files.append(io.FileIO(filename, 'r'))
+        except EnvironmentError:
+            for f in files:
+                f.close()
+            return False
+        with self._lock:
+            device_path = device.device_path
+            if any(d.device_path == device_path for d in self._devices):
+                for f in files:
+                    f.close()
+                return False
+            self._devices.append(_OpenDevice(device_path, files))
+        return True
+
+    def remove_device(self, device_path):
+        """
+        Stop sampling the device with the given ``device_path``.
+
+        Return ``True``, if the device was removed, ``False`` if it was not
+        sampled.
+        """
+        with self._lock:
+            for index, open_device in enumerate(self._devices):
+                if open_device.device_path == device_path:
+                    del self._devices[index]
+                    open_device.close()
+                    return True
+        return False
+
+    def handle_event(self, device):
+        """
+        Update the sampled devices according to the event of the given
+        ``device``, as received from a :class:`~pyudev.Monitor`.
+
+        ``add`` events add the device, ``remove`` events remove it, and
+        ``move`` events replace the old device path with the new one.  Hence
+        this method can directly be used as callback of a
+        :class:`~pyudev.MonitorObserver`:
+
+        >>> monitor = Monitor.from_netlink(context)
+        >>> monitor.filter_by(sampler.subsystem)
+        >>> observer = MonitorObserver(monitor, callback=sampler.handle_event)
+        >>> observer.start()
+        """
+        action = device.action
+        if action == 'add':
+            self.add_device(device)
+        elif action == 'remove':
+            self.remove_device(device.device_path)
+        elif action == 'move':
+            old_path = device.get('DEVPATH_OLD')
+            if old_path:
+                self.remove_device(old_path)
+            self.add_device(device)
+
+    def sample(self):
+        """
+        Read the counters of all sampled devices.
+
+        Devices whose files cannot be read anymore, e.g. because the device
+        vanished before its ``remove`` event arrived, are no longer sampled,
+        and are missing from the returned sample.
+
+        Return a :class:`Sample`.
+        """
+        width = len(self.fields)
+        with self._lock:
+            timestamp = monotonic()
+            rows = []
+            for open_device in list(self._devices):
+                fields = []
+                try:
+                    for f in open_device.files:
+                        fields.extend(_read_into(f, self._buffer).split())
+                except EnvironmentError:
+                    self._devices.remove(open_device)
+                    open_device.close()
+                    continue
+                rows.append((open_device.device_path, fields[:width]))
+        numpy = self._numpy
+        if numpy is not None:
+            values = numpy.zeros((len(rows), width), dtype=numpy.uint64)
+        else:
+            values = [array(str('Q'), [0]) * width for _ in rows]
+        for row, (_, fields) in enumerate(rows):
+            fields = array(str('Q'), (int(f) for f in fields))
+            values[row][:len(fields)] = fields
+        return Sample(timestamp, tuple(p for p, _ in rows), values)
+
+    def close(self):
+        """
+        Close all open files of this sampler.
+        """
+        with self._lock:
+            for open_device in self._devices:
+                open_device.close()
+            self._devices = []
+
+
+class BlockStatsSampler(_Sampler):
+    """
+    Sample the I/O statistics of block devices.
+
+    This sampler reads the ``stat`` attribute of block devices.  The
+    attribute files of all devices are kept open, and read into a
+    preallocated buffer on each call to :meth:`sample()`, which avoids
+    re-opening files on every sample:
+
+    >>> from pyudev import Context
+    >>> from pyudev.sampling import BlockStatsSampler, delta
+    >>> sampler = BlockStatsSampler(Context(), device_type='disk')
+    >>> previous = sampler.sample()
+    >>> time.sleep(0.1)
+    >>> current = sampler.sample()
+    >>> delta(previous, current).rates
+    array([[ 0., 0., ...]])
+
+    The columns of :attr:`Sample.values` are given by :attr:`fields`.  Fields
+    not provided by the running kernel are zero.
+
+    .. versionadded:: 0.17
+    """
+
+    fields = ('read_ios', 'read_merges', 'read_sectors', 'read_ticks',
+              'write_ios', 'write_merges', 'write_sectors', 'write_ticks',
+              'in_flight', 'io_ticks', 'time_in_queue',
+              'discard_ios', 'discard_merges', 'discard_sectors',
+              'discard_ticks', 'flush_ios', 'flush_ticks')
+
+    subsystem = 'block'
+
+    def __init__(self, context, devices=None, device_type=None):
+        """
+        Create a new sampler.
+
+        ``context`` is the :class:`~pyudev.Context`.  ``devices`` is an
+        iterable of block :class:`~pyudev.Device` objects to sample initially.
+        If omitted, all block devices are sampled.  ``device_type`` restricts
+        the sampled devices to the given device type (e.g. ``'disk'`` to
+        exclude partitions).
+        """
+        self.device_type = device_type
+        _Sampler.__init__(self, context, devices)
+
+    def _accepts(self, device):
+        return (_Sampler._accepts(self, device) and
+                (self.device_type is None or
+                 device.device_type == self.device_type))
+
+    def _attribute_files(self, device):
+        return [os.path.join(device.sys_path, 'stat')]
+
+
+class NetworkCounterSampler(_Sampler):
+    """
+    Sample the traffic counters of network interfaces.
+
+    This sampler reads the given counter attributes from the ``statistics``
+    directory of network interfaces (e.g. ``statistics/rx_bytes``).  All
+    counter files are kept open, and read in one sweep on each call to
+    :meth:`sample()`:
+
+    >>> from pyudev import Context
+    >>> from pyudev.sampling import NetworkCounterSampler, delta
+    >>> sampler = NetworkCounterSampler(Context(),
+    ...                                 counters=['rx_bytes', 'tx_bytes'])
+    >>> previous = sampler.sample()
+    >>> time.sleep(1)
+    >>> delta(previous, sampler.sample()).deltas
+    array([[1514, 0], ...])
+
+    Renamed interfaces are followed through ``move`` events given to
+    :meth:`handle_event()`.
+
+    .. versionadded:: 0.17
+    """
+
+    #: The counters sampled by default.
+    default_counters = ('rx_bytes', 'rx_packets', 'rx_errors', 'rx_dropped',
+                        'tx_bytes', 'tx_packets', 'tx_errors', 'tx_dropped')
+
+    subsystem = 'net'
+
+    def __init__(self, context, devices=None, counters=None):
+        """
+        Create a new sampler.
+
+        ``context`` is the :class:`~pyudev.Context`.  ``devices`` is an
+        iterable of network :class:`~pyudev.Device` objects to sample
+        initially.  If omitted, all network interfaces are sampled.
+        ``counters`` is a sequence of counter names, which become the
+        :attr:`fields` of this sampler.  If omitted, :attr:`default_counters`
+        are sampled.
+        """
+        self.fields = tuple(counters or self.default_counters)
+        _Sampler.__init__(self, context, devices)
+
+    def _attribute_files(self, device):
+        return [os.path.join(device.sys_path, 'statistics', counter)
+                for counter in self.fields]
+
+
+AttributeChange = namedtuple('AttributeChange', 'device_path attribute value')
+AttributeChange.__doc__ = """
+A new value of an attribute watched by an :class:`AttributeWatcher`.
+
+``device_path`` is the :attr:`~pyudev.Device.device_path` of the device,
+``attribute`` the name of the attribute as unicode string, and ``value`` the
+new value of the attribute, as returned by the converter of the attribute.
+"""
+
+
+class _WatchedAttribute(object):
+    """
+    An open attribute file watched by an :class:`AttributeWatcher`.
+    """
+
+    def __init__(self, device_path, attribute, f, converter, interval):
+        self.device_path = device_path
+        self.attribute = attribute
+        self.file = f
+        self.converter = converter
+        self.interval = interval
+        self.value = None
+        self.due = None
+
+
+class AttributeWatcher(object):
+    """
+    Watch attributes of devices for changes.
+
+    Some ``sysfs`` attributes notify pollers about changes (through
+    ``sysfs_notify()`` in the kernel), for instance many attributes of
+    ``hwmon`` and ``power_supply`` devices.  This class registers all watched
+    attributes in a single :func:`~select.epoll` set, and only re-reads an
+    attribute after such a notification.  Attributes which do not notify can
+    be given a polling interval, after which they are re-read anyway:
+
+    >>> from pyudev import Context, Device
+    >>> from pyudev.sampling import AttributeWatcher
+    >>> context = Context()
+    >>> battery = Device.from_name(context, 'power_supply', 'BAT0')
+    >>> watcher = AttributeWatcher()
+    >>> watcher.watch(battery, 'status')
+    b'Discharging'
+    >>> watcher.watch(battery, 'capacity', converter=int, interval=60)
+    87
+    >>> watcher.poll()
+    [AttributeChange(device_path=u'/devices/.../BAT0', attribute=u'status', value=b'Charging')]
+
+    The watcher provides a :func:`selectable <select.select>` file descriptor
+    by :meth:`fileno()`, which becomes readable on notifications, to
+    integrate into other event loops.  Attributes with polling interval still
+    require regular calls to :meth:`poll()` though.
+
+    .. versionadded:: 0.17
+    """
+
+    #: The size of the buffer into which attributes are read.
+    buffer_size = 4096
+
+    def __init__(self):
+        self._epoll = select.epoll()
+        self._buffer = bytearray(self.buffer_size)
+        self._by_fd = {}
+        self._by_key = {}
+
+    def fileno(self):
+        """
+        Return the file descriptor of the underlying :func:`~select.epoll`
+        set as integer.
+        """
+        return self._epoll.fileno()
+
+    @property
+    def watched(self):
+        """
+        A list of ``(device_path, attribute)`` tuples of all watched
+        attributes.
+        """
+        return list(self._by_key)
+
+    def _read(self, watched):
+        value = _read_into(watched.file, self._buffer).rstrip(b'\n')
+        if watched.converter is not None:
+            value = watched.converter(value)
+        return value
+
+    def watch(self, device, attribute, converter=None, interval=None):
+        """
+        Watch the given ``attribute`` of the given ``device``.
+
+        ``device`` is a :class:`~pyudev.Device`, and ``attribute`` the name
+        of one of its attributes as unicode or byte string.  ``converter`` is
+        a callable, which receives the raw value of the attribute as byte
+        string without trailing newline, and returns the typed value (e.g.
+        :func:`int`).  If ``converter`` is omitted, values are byte strings.
+        ``interval`` is the number of seconds after which the attribute is
+        re-read even without notification.  If omitted, the attribute is only
+        re-read on notification.
+
+        Watching an attribute again replaces its converter and interval.
+
+        Return the current value of the attribute.  Raise
+        :exc:`~exceptions.EnvironmentError`, if the attribute could not be
+        opened.
+        """
+        attribute = ensure_unicode_string(attribute)
+        device_path = device.device_path
+        self.unwatch(device_path, attribute)
+        f = io.FileIO(os.path.join(device.sys_path, attribute), 'r')
+        watched = _WatchedAttribute(device_path, attribute, f, converter,
+                                    interval)
+        try:
+            # reading the attribute arms the notification
+            watched.value = self._read(watched)
+            self._epoll.register(f.fileno(), select.EPOLLPRI | select.EPOLLERR)
+        except:
+            f.close()
+            raise
+        if interval is not None:
+            watched.due = monotonic() + interval
+        self._by_fd[f.fileno()] = watched
+        self._by_key[(device_path, attribute)] = watched
+        return watched.value
+
+    def unwatch(self, device_path, attribute):
+        """
+        Stop watching the given ``attribute`` of the device with the given
+        ``device_path``.
+
+        Return ``True``, if the attribute was watched, ``False`` otherwise.
+        """
+        key = (device_path, ensure_unicode_string(attribute))
+        watched = self._by_key.pop(key, None)
+        if watched is None:
+            return False
+        fd = watched.file.fileno()
+        del self._by_fd[fd]
+        self._epoll.unregister(fd)
+        watched.file.close()
+        return True
+
+    def _next_wakeup(self, deadline):
+        wakeups = [w.due for w in self._by_key.values() if w.due is not None]
+        if deadline is not None:
+            wakeups.append(deadline)
+        return min(wakeups) if wakeups else None
+
+    def _update(self, watched, now, changes, always):
+        try:
+            value = self._read(watched)
+        except EnvironmentError:
+            # the device is gone
+            self.unwatch(watched.device_path, watched.attribute)
+            return
+        if watched.interval is not None:
+            watched.due = now + watched.interval
+        if always or value != watched.value:
+            changes.append(AttributeChange(
+                watched.device_path, watched.attribute, value))
+        watched.value = value
+
+    def poll(self, timeout=None):
+        """
+        Wait for changes of watched attributes.
+
+        Attributes are re-read if the kernel notified about a change, or if
+        their polling interval elapsed.  Notified attributes are always
+        reported, attributes re-read after their interval only if their value
+        changed.  Attributes which cannot be read anymore (e.g. because their
+        device was removed) are no longer watched.
+
+        ``timeout`` is a floating point number that specifies a time-out in
+        seconds.  If omitted or ``None``, this method blocks until a change is
+        available.  If ``0``, this method never blocks.
+
+        Return a list of :class:`AttributeChange` objects, with all changes
+        found in one wakeup, or an empty list if a timeout occurred.
+        """
+        now = monotonic()
+        deadline = None if timeout is None else now + timeout
+        while True:
+            wakeup = self._next_wakeup(deadline)
+            wait = -1 if wakeup is None else max(wakeup - now, 0)
+            events = self._epoll.poll(wait)
+            now = monotonic()
+            changes = []
+            notified = set()
+            for fd, _ in events:
+                watched = self._by_fd.get(fd)
+                if watched is not None:
+                    notified.add(fd)
+                    self._update(watched, now, changes, always=True)
+            for fd, watched in list(self._by_fd.items()):
+                if (fd not in notified and watched.due is not None and
+                        watched.due <= now):
+                    self._update(watched, now, changes, always=False)
+            if changes or (deadline is not None and now >= deadline):
+                return changes
+
+    def close(self):
+        """
+        Stop watching all attributes, and close the underlying
+        :func:`~select.epoll` set.
+        """
+        for device_path, attribute in self.watched:
+            self.unwatch(device_path, attribute)
+        self._epoll.close()
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 Sebastian Wiesner <lunaryorn@gmail.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+"""
+    pyudev.snapshot
+    ===============
+
+    Compact snapshots of enumerations, and differences between them.
+
+    .. moduleauthor::  Sebastian Wiesner  <lunaryorn@gmail.com>
+"""
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+import os
+import json
+import hashlib
+from zlib import crc32
+from collections import namedtuple
+
+from pyudev._util import ensure_unicode_string, udev_list_entries
+
+
+__all__ = ['Snapshot', 'SnapshotDiff', 'diff']
+
+
+#: The version of the file format written by :meth:`Snapshot.save()`.
+#: Version 1 used MD5 digests, which cannot be compared to the current ones.
+FORMAT_VERSION = 2
+
+
+SnapshotDiff = namedtuple('SnapshotDiff', 'added removed changed')
+SnapshotDiff.__doc__ = """
+The differences between two :class:`Snapshot` objects, as returned by
+:func:`diff()`.
+
+``added`` and ``removed`` are sorted lists of the
+:attr:`~pyudev.Device.device_path` of all added and removed devices
+respectively.  ``changed`` is a dictionary mapping the device path of each
+changed device to a sorted list of the names of all properties, which were
+added, removed or changed.
+"""
+
+
+def _property_hashes(libudev, device):
+    """
+    Hash the properties of ``device``.
+
+    Return a tuple ``(digest, hashes)``, where ``digest`` is a hexadecimal
+    digest of all properties as unicode string, and ``hashes`` a sorted tuple
+    of ``(name, hash)`` pairs with a CRC32 checksum of the value of each
+    property.
+    """
+    properties = sorted(udev_list_entries(
+        libudev, libudev.udev_device_get_properties_list_entry(device)))
+    # not MD5, which is unavailable on FIPS-enabled systems
+    digest = hashlib.sha1()
+    hashes = []
+    for name, value in properties:
+        value = value or b''
+        digest.update(name)
+        digest.update(b'=')
+        digest.update(value)
+        digest.update(b'\0')
+        hashes.append((ensure_unicode_string(name), crc32(value) & 0xffffffff))
+    return ensure_unicode_string(digest.hexdigest()), tuple(hashes)
+
+
+class Snapshot(object):
+    """
+    A compact snapshot of an enumeration.
+
+    A snapshot maps the :attr:`~pyudev.Device.device_path` of every
+    enumerated device to a digest of its properties, and keeps a checksum of
+    each property value to tell which properties changed, but does not keep
+    :class:`~pyudev.Device` objects or property values:
+
+    >>> from pyudev import Context
+    >>> from pyudev.snapshot import Snapshot, diff
+    >>> context = Context()
+    >>> old = Snapshot.take(context.list_devices(subsystem='block'))
+    >>> old.save('/var/lib/myservice/block.json')
+    >>> # ... later, possibly after a restart
+    >>> old = Snapshot.load('/var/lib/myservice/block.json')
+    >>> new = Snapshot.take(context.list_devices(subsystem='block'))
+    >>> diff(old, new)
+    SnapshotDiff(added=[], removed=[u'/devices/virtual/block/loop0'], changed={})
+
+    Iterating over a snapshot yields the device paths of all devices.
+
+    .. versionadded:: 0.17
+    """
+
+    def __init__(self, entries=None):
+        """
+        Create a new snapshot from the given ``entries``.
+
+        ``entries`` is a dictionary mapping device paths to tuples ``(digest,
+        hashes)`` as described in :meth:`entry()`.  Use :meth:`take()` to
+        create a snapshot of an enumeration.
+        """
+        self._entries = dict(entries or {})
+
+    @classmethod
+    def take(cls, enumerator):
+        """
+        Take a snapshot of all devices matched by ``enumerator``.
+
+        ``enumerator`` is an :class:`~pyudev.Enumerator`.  Devices are
+        created one at a time, and released right after they were hashed.
+
+        Return a new :class:`Snapshot`.
+        """
+        libudev = enumerator._libudev
+        entries = {}
+        for device in enumerator:
+            entries[device.device_path] = _property_hashes(libudev, device)
+        return cls(entries)
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Load a snapshot saved with :meth:`save()` from ``filename``.
+
+        Return a new :class:`Snapshot`.  Raise
+        :exc:`~exceptions.ValueError`, if the file does not contain a
+        snapshot, or a snapshot in an unsupported format.
+        """
+        with open(filename, 'r') as stream:
+            data = json.load(stream)
+        if not isinstance(data, dict) or data.get('version') != FORMAT_VERSION:
+            raise ValueError('Unsupported snapshot format in {0!r}'.format(
+                filename))
+        entries = dict(
+            (device_path, (digest, tuple((name, value) for name, value in
+                                         hashes)))
+            for device_path, (digest, hashes) in data['devices'].items())
+        return cls(entries)
+
+    def save(self, filename):
+        """
+        Save this snapshot to ``filename``.
+
+        The snapshot is written to a temporary file first, which then replaces
+        ``filename``, so that ``filename`` always contains a complete
+        snapshot.
+        """
+        data = {'version': FORMAT_VERSION,
+                'devices': dict(
+                    (device_path, [digest, [list(h) for h in hashes]])
+                    for device_path, (digest, hashes) in self._entries.items())}
+        temporary = '{0}.tmp'.format(filename)
+        with open(temporary, 'w') as stream:
+            json.dump(data, stream, separators=(',', ':'), sort_keys=True)
+        os.rename(temporary, filename)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __contains__(self, device_path):
+        return device_path in self._entries
+
+    def __eq__(self, other):
+        if not isinstance(other, Snapshot):
+            return NotImplemented
+        return self._entries == other._entries
+
+    def __ne__(self, other):
+        if not isinstance(other, Snapshot):
+            return NotImplemented
+        return self._entries != other._entries
+
+    def entry(self, device_path):
+        """
+        Get the entry of the device with the given ``device_path``.
+
+        Return a tuple ``(digest, hashes)``.  ``digest`` is a hexadecimal
+        digest of all properties of the device as unicode string.  ``hashes``
+        is a tuple of ``(name, checksum)`` pairs, sorted by name, with a
+        checksum of the value of each property.  Raise
+        :exc:`~exceptions.KeyError`, if the device is not part of this
+        snapshot.
+        """
+        return self._entries[device_path]
+
+
+def _changed_properties(old_hashes, new_hashes):
+    old_hashes = dict(old_hashes)
+    new_hashes = dict(new_hashes)
+    changed = set(old_hashes) ^ set(new_hashes)
+    changed.update(name for name, value in old_hashes.items()
+                   if name in new_hashes and new_hashes[name] != value)
+    return sorted(changed)
+
+
+def diff(old, new):
+    """
+    Compare the :class:`Snapshot` ``old`` to the :class:`Snapshot` ``new``.
+
+    Devices are compared by the digests of their properties first, so only
+    the properties of devices with different digests are compared.
+
+    Return a :class:`SnapshotDiff`.
+
+    .. versionadded:: 0.17
+    """
+    old_entries = old._entries
+    new_entries = new._entries
+    added = sorted(p for p in new_entries if p not in old_entries)
+    removed = sorted(p for p in old_entries if p not in new_entries)
+    changed = {}
+    for device_path, (digest, hashes) in new_entries.items():
+        old_entry = old_entries.get(device_path)
+        if old_entry is not None and old_entry[0] != digest:
+            changed[device_path] = _changed_properties(old_entry[1], hashes)
+    return SnapshotDiff(added, removed, changed)
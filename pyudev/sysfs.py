@@ -0,0 +1,798 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 Sebastian Wiesner <lunaryorn@gmail.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+"""
+    pyudev.sysfs
+    ============
+
+    A pure Python implementation of libudev, which reads ``sysfs`` and the
+    udev database directly.
+
+    .. moduleauthor::  Sebastian Wiesner  <lunaryorn@gmail.com>
+"""
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+import os
+import time
+import stat
+from fnmatch import fnmatchcase
+
+from pyudev._util import ensure_byte_string
+from pyudev.database import parse_record
+
+
+__all__ = ['SysfsUdevLibrary']
+
+
+#: Attributes, whose value is the name of the target of a symbolic link
+_LINK_ATTRIBUTES = frozenset([b'driver', b'subsystem', b'module'])
+
+_monotonic = getattr(time, 'monotonic', None)
+
+
+def _handle(obj):
+    """
+    Get the native handle of a pyudev object, which passes the handle in
+    ``_as_parameter_`` like a ctypes pointer.
+    """
+    return getattr(obj, '_as_parameter_', obj)
+
+
+def _read(filename):
+    """
+    Read the contents of ``filename`` as byte string, or return ``None``, if
+    the file could not be read.
+    """
+    try:
+        with open(filename, 'rb') as stream:
+            return stream.read()
+    except EnvironmentError:
+        return None
+
+
+def _link_name(filename):
+    """
+    Get the base name of the target of the symbolic link ``filename``, or
+    ``None``, if ``filename`` is no symbolic link.
+    """
+    try:
+        return os.path.basename(os.readlink(filename))
+    except EnvironmentError:
+        return None
+
+
+def _listdir(directory):
+    try:
+        return os.listdir(directory)
+    except EnvironmentError:
+        return []
+
+
+def _parse_assignments(data):
+    """
+    Parse ``NAME=VALUE`` lines from the byte string ``data``.
+
+    Return a list of ``(name, value)`` tuples.
+    """
+    assignments = []
+    for line in data.splitlines():
+        name, sep, value = line.partition(b'=')
+        if sep:
+            assignments.append((name, value))
+    return assignments
+
+
+class _ListEntry(object):
+    """
+    An entry of a linked list, standing in for ``struct udev_list_entry``.
+    """
+
+    __slots__ = ('name', 'value', 'next')
+
+    def __init__(self, name, value, next=None):
+        self.name = name
+        self.value = value
+        self.next = next
+
+
+def _make_list(items):
+    """
+    Create a linked list from ``items``, a sequence of ``(name, value)``
+    tuples.
+
+    Return the first :class:`_ListEntry`, or ``None``, if ``items`` is empty.
+    """
+    first = None
+    for name, value in reversed(items):
+        first = _ListEntry(name, value, first)
+    return first
+
+
+class _Udev(object):
+    """
+    Stands in for ``struct udev``.
+    """
+
+    __slots__ = ('library', 'log_priority')
+
+    def __init__(self, library):
+        self.library = library
+        self.log_priority = 3
+
+
+class _Enumerate(object):
+    """
+    Stands in for ``struct udev_enumerate``.
+    """
+
+    def __init__(self, udev):
+        self.udev = udev
+        self.subsystems = []
+        self.nomatch_subsystems = []
+        self.sysnames = []
+        self.properties = []
+        self.sysattrs = []
+        self.nomatch_sysattrs = []
+        self.tags = []
+        self.parent = None
+        self.is_initialized = False
+        self.entries = None
+
+
+class _Device(object):
+    """
+    Stands in for ``struct udev_device``.
+
+    All data is read from ``sysfs`` and the udev database on first access,
+    and then cached for the lifetime of the device, like libudev does.
+    """
+
+    def __init__(self, udev, sys_path, uevent=None):
+        self.udev = udev
+        self.sys_path = sys_path
+        self.device_path = sys_path[len(udev.library.sys_path):]
+        self.action = None
+        self.seqnum = 0
+        self._uevent = uevent
+        self._db = None
+        self._properties = None
+        self._property_values = None
+        self._attributes = {}
+        self._parent = self
+
+    @property
+    def sys_name(self):
+        return os.path.basename(self.sys_path).replace(b'!', b'/')
+
+    @property
+    def sys_number(self):
+        sys_name = self.sys_name
+        end = len(sys_name)
+        start = end
+        while start > 0 and sys_name[start - 1:start].isdigit():
+            start -= 1
+        return sys_name[start:end] or None
+
+    @property
+    def uevent(self):
+        """
+        The contents of the ``uevent`` file as dictionary.
+        """
+        if self._uevent is None:
+            data = _read(os.path.join(self.sys_path, b'uevent')) or b''
+            self._uevent = dict(_parse_assignments(data))
+        return self._uevent
+
+    @property
+    def subsystem(self):
+        try:
+            return self._subsystem
+        except AttributeError:
+            pass
+        subsystem = self.uevent.get(b'SUBSYSTEM')
+        if subsystem is None:
+            subsystem = _link_name(os.path.join(self.sys_path, b'subsystem'))
+        if subsystem is None:
+            device_path = self.device_path
+            if device_path.startswith(b'/module/'):
+                subsystem = b'module'
+            elif b'/drivers/' in device_path:
+                subsystem = b'drivers'
+            elif device_path.startswith((b'/subsystem/', b'/class/',
+                                         b'/bus/')):
+                subsystem = b'subsystem'
+        self._subsystem = subsystem
+        return subsystem
+
+    @property
+    def driver(self):
+        try:
+            return self._driver
+        except AttributeError:
+            self._driver = (self.uevent.get(b'DRIVER') or
+                            _link_name(os.path.join(self.sys_path, b'driver')))
+            return self._driver
+
+    @property
+    def device_number(self):
+        uevent = self.uevent
+        major = uevent.get(b'MAJOR')
+        minor = uevent.get(b'MINOR')
+        if major is None or minor is None:
+            return 0
+        return os.makedev(int(major), int(minor))
+
+    @property
+    def device_node(self):
+        name = self.uevent.get(b'DEVNAME')
+        if name is None:
+            return None
+        if name.startswith(b'/'):
+            return name
+        return os.path.join(self.udev.library.dev_path, name)
+
+    @property
+    def device_id(self):
+        """
+        The name of the file of this device in the udev database.
+        """
+        number = self.device_number
+        if number:
+            kind = 'b' if self.subsystem == b'block' else 'c'
+            return '{0}{1}:{2}'.format(kind, os.major(number),
+                                       os.minor(number)).encode('ascii')
+        ifindex = self.uevent.get(b'IFINDEX')
+        if ifindex:
+            return b'n' + ifindex
+        return (b'+' + (self.subsystem or b'') + b':' +
+                os.path.basename(self.sys_path))
+
+    @property
+    def db(self):
+        """
+        The udev database record of this device as dictionary with the keys
+        ``links``, ``properties``, ``tags`` and ``initialized``, or ``None``,
+        if the device has no record.
+        """
+        if self._db is None:
+            library = self.udev.library
+            if library.database is not None:
+                self._db = library.database.get(self.device_id) or {}
+            else:
+                filename = os.path.join(library.run_path, b'data',
+                                        self.device_id)
+                self._db = library.parse_db(_read(filename))
+        return self._db or None
+
+    @property
+    def is_initialized(self):
+        return self.db is not None
+
+    @property
+    def links(self):
+        db = self.db
+        if db is None:
+            return []
+        dev_path = self.udev.library.dev_path
+        return [os.path.join(dev_path, link) for link in db['links']]
+
+    @property
+    def tags(self):
+        db = self.db
+        return db['tags'] if db is not None else []
+
+    @property
+    def properties(self):
+        """
+        All properties as list of ``(name, value)`` tuples.
+        """
+        if self._properties is None:
+            properties = [(b'DEVPATH', self.device_path)]
+            subsystem = self.subsystem
+            if subsystem is not None:
+                properties.append((b'SUBSYSTEM', subsystem))
+            for name, value in sorted(self.uevent.items()):
+                if name in (b'DEVPATH', b'SUBSYSTEM'):
+                    continue
+                if name == b'DEVNAME':
+                    value = self.device_node
+                properties.append((name, value))
+            db = self.db
+            if db is not None:
+                properties.extend(db['properties'])
+                links = self.links
+                if links:
+                    properties.append((b'DEVLINKS', b' '.join(links)))
+                if db['tags']:
+                    properties.append(
+                        (b'TAGS', b':' + b':'.join(db['tags']) + b':'))
+                if db['initialized']:
+                    properties.append((b'USEC_INITIALIZED',
+                                       db['initialized']))
+            self._properties = properties
+        return self._properties
+
+    def property_value(self, name):
+        if self._property_values is None:
+            self._property_values = dict(self.properties)
+        return self._property_values.get(name)
+
+    def attribute_value(self, attribute):
+        try:
+            return self._attributes[attribute]
+        except KeyError:
+            pass
+        filename = os.path.join(self.sys_path, attribute)
+        value = None
+        try:
+            mode = os.lstat(filename).st_mode
+        except EnvironmentError:
+            mode = None
+        if mode is None:
+            pass
+        elif stat.S_ISLNK(mode):
+            if attribute in _LINK_ATTRIBUTES:
+                value = _link_name(filename)
+        elif stat.S_ISREG(mode) and mode & stat.S_IRUSR:
+            value = _read(filename)
+            if value is not None:
+                # libudev returns a C string, which ends at the first NUL
+                value = value.split(b'\0', 1)[0].rstrip(b'\n')
+        self._attributes[attribute] = value
+        return value
+
+    def attribute_names(self, directory=b''):
+        # like libudev, list links and accessible files, and the attributes in
+        # direct subdirectories like "power", which are not devices themselves
+        names = []
+        path = os.path.join(self.sys_path, directory)
+        for name in sorted(_listdir(path)):
+            filename = os.path.join(path, name)
+            try:
+                mode = os.lstat(filename).st_mode
+            except EnvironmentError:
+                continue
+            attribute = os.path.join(directory, name)
+            if stat.S_ISDIR(mode):
+                if (not directory and not
+                        os.path.exists(os.path.join(filename, b'uevent'))):
+                    names.extend(self.attribute_names(attribute))
+            elif stat.S_ISLNK(mode) or (
+                    stat.S_ISREG(mode) and
+                    mode & (stat.S_IRUSR | stat.S_IWUSR)):
+                names.append(attribute)
+        return names
+
+    @property
+    def parent(self):
+        if self._parent is self:
+            parent = None
+            library = self.udev.library
+            parts = self.device_path.lstrip(b'/').split(b'/')
+            # like libudev, stop below the top-level directories of sysfs
+            for length in range(len(parts) - 1, 1, -1):
+                parent = library.new_device(
+                    self.udev, os.path.join(library.sys_path,
+                                            *parts[:length]))
+                if parent is not None:
+                    break
+            self._parent = parent
+        return self._parent
+
+
+class SysfsUdevLibrary(object):
+    """
+    A pure Python implementation of the libudev functions used by pyudev.
+
+    This library object reads device data from ``sysfs`` and the udev
+    database directly, and works without libudev, e.g. in containers, which
+    only have ``/sys`` and ``/run/udev`` bind-mounted.  Pass it to
+    :class:`~pyudev.Context` to use it:
+
+    >>> from pyudev import Context
+    >>> from pyudev.sysfs import SysfsUdevLibrary
+    >>> context = Context(SysfsUdevLibrary())
+    >>> [d.sys_name for d in context.list_devices(subsystem='block')]
+    [u'sda', u'sda1', u'sda2', u'loop0']
+
+    Alternatively, use ``Context('sysfs')`` for the default directories.
+
+    ``sys_path`` is the mount point of ``sysfs``, ``dev_path`` the device
+    directory, and ``run_path`` the runtime directory of udev, which contains
+    the udev database.  All paths are unicode or byte strings.  They can
+    point to a fixture tree, e.g. for tests.
+
+    All data of a device is read on first access, and then cached for the
+    lifetime of the :class:`~pyudev.Device`.
+
+    ``database`` is a :class:`~pyudev.database.DatabaseIndex` of the udev
+    database in ``run_path``.  If given, the database records of all devices
+    are served from this index, which is updated before each scan.  If the
+    index watches the database, it is also updated before creating each
+    device, otherwise devices see the database as of the last scan or
+    :meth:`~pyudev.database.DatabaseIndex.update()`.  Without an index
+    each device reads its record from the database on first access.
+
+    Unlike libudev, this library does not process udev rules, and cannot
+    monitor events:  :meth:`pyudev.Monitor.from_netlink` raises
+    :exc:`~exceptions.EnvironmentError`.
+
+    .. versionadded:: 0.17
+    """
+
+    def __init__(self, sys_path='/sys', dev_path='/dev', run_path='/run/udev',
+                 database=None):
+        self.sys_path = ensure_byte_string(sys_path).rstrip(b'/')
+        self.dev_path = ensure_byte_string(dev_path).rstrip(b'/')
+        self.run_path = ensure_byte_string(run_path).rstrip(b'/')
+        self.database = database
+        self._real_sys_path = os.path.realpath(self.sys_path)
+
+    def parse_db(self, data):
+        """
+        Parse the udev database record ``data`` of a device, as byte string.
+
+        Return a dictionary as described in
+        :func:`~pyudev.database.parse_record()`.
+        """
+        return parse_record(data)
+
+    def new_device(self, udev, sys_path):
+        """
+        Create a device from the absolute ``sys_path`` as byte string, like
+        ``udev_device_new_from_syspath()``.
+
+        Return the device or ``None``, if there is no device at ``sys_path``.
+        """
+        # only a watching index updates cheaply, otherwise update() reads the
+        # whole database again
+        if self.database is not None and self.database.watching:
+            self.database.update()
+        return self._new_device(udev, sys_path)
+
+    def _new_device(self, udev, sys_path):
+        real_path = os.path.realpath(sys_path)
+        root = self._real_sys_path
+        if not real_path.startswith(root + b'/'):
+            return None
+        sys_path = self.sys_path + real_path[len(root):]
+        if real_path.startswith(root + b'/devices/'):
+            if not os.path.exists(os.path.join(real_path, b'uevent')):
+                return None
+        elif not os.path.isdir(real_path):
+            return None
+        return _Device(udev, sys_path)
+
+    # context
+
+    def udev_new(self):
+        return _Udev(self)
+
+    def udev_ref(self, udev):
+        return udev
+
+    def udev_unref(self, udev):
+        pass
+
+    def udev_get_sys_path(self, udev):
+        return self.sys_path
+
+    def udev_get_dev_path(self, udev):
+        return self.dev_path
+
+    def udev_get_run_path(self, udev):
+        return self.run_path
+
+    def udev_get_log_priority(self, udev):
+        return _handle(udev).log_priority
+
+    def udev_set_log_priority(self, udev, priority):
+        _handle(udev).log_priority = priority
+
+    # enumeration
+
+    def udev_enumerate_new(self, udev):
+        return _Enumerate(_handle(udev))
+
+    def udev_enumerate_ref(self, enumerate):
+        return enumerate
+
+    def udev_enumerate_unref(self, enumerate):
+        pass
+
+    def udev_enumerate_add_match_subsystem(self, enumerate, subsystem):
+        _handle(enumerate).subsystems.append(subsystem)
+        return 0
+
+    def udev_enumerate_add_nomatch_subsystem(self, enumerate, subsystem):
+        _handle(enumerate).nomatch_subsystems.append(subsystem)
+        return 0
+
+    def udev_enumerate_add_match_property(self, enumerate, name, value):
+        _handle(enumerate).properties.append((name, value))
+        return 0
+
+    def udev_enumerate_add_match_sysattr(self, enumerate, name, value):
+        _handle(enumerate).sysattrs.append((name, value))
+        return 0
+
+    def udev_enumerate_add_nomatch_sysattr(self, enumerate, name, value):
+        _handle(enumerate).nomatch_sysattrs.append((name, value))
+        return 0
+
+    def udev_enumerate_add_match_tag(self, enumerate, tag):
+        _handle(enumerate).tags.append(tag)
+        return 0
+
+    def udev_enumerate_add_match_sysname(self, enumerate, sysname):
+        _handle(enumerate).sysnames.append(sysname)
+        return 0
+
+    def udev_enumerate_add_match_parent(self, enumerate, parent):
+        if parent is None:
+            raise ValueError()
+        _handle(enumerate).parent = _handle(parent)
+        return 0
+
+    def udev_enumerate_add_match_is_initialized(self, enumerate):
+        _handle(enumerate).is_initialized = True
+        return 0
+
+    def _candidates(self, enumerate):
+        """
+        Find the sys paths of all devices, which may match ``enumerate``.
+        """
+        if enumerate.parent is not None:
+            for directory, _, filenames in os.walk(enumerate.parent.sys_path):
+                if b'uevent' in filenames:
+                    yield directory
+            return
+        for directory, entries in ((b'bus', b'devices'), (b'class', None)):
+            base = os.path.join(self.sys_path, directory)
+            for subsystem in _listdir(base):
+                if not _matches_subsystem(enumerate, subsystem):
+                    continue
+                if entries is None:
+                    path = os.path.join(base, subsystem)
+                else:
+                    path = os.path.join(base, subsystem, entries)
+                for name in _listdir(path):
+                    if (enumerate.sysnames and not any(
+                            fnmatchcase(name, p) for p in enumerate.sysnames)):
+                        continue
+                    yield os.path.join(path, name)
+
+    def udev_enumerate_scan_devices(self, enumerate):
+        enumerate = _handle(enumerate)
+        udev = enumerate.udev
+        # update the index once, and not for every device of the scan
+        if self.database is not None:
+            self.database.update()
+        devices = {}
+        for sys_path in self._candidates(enumerate):
+            device = self._new_device(udev, sys_path)
+            if (device is not None and device.sys_path not in devices and
+                    _matches(enumerate, device)):
+                devices[device.sys_path] = device
+        enumerate.entries = _make_list(
+            [(sys_path, None) for sys_path in sorted(devices)])
+        return 0
+
+    def udev_enumerate_get_list_entry(self, enumerate):
+        return _handle(enumerate).entries
+
+    # list entries
+
+    def udev_list_entry_get_next(self, entry):
+        return entry.next
+
+    def udev_list_entry_get_name(self, entry):
+        return entry.name
+
+    def udev_list_entry_get_value(self, entry):
+        return entry.value
+
+    # devices
+
+    def udev_device_ref(self, device):
+        return device
+
+    def udev_device_unref(self, device):
+        pass
+
+    def udev_device_new_from_syspath(self, udev, sys_path):
+        return self.new_device(_handle(udev), sys_path)
+
+    def udev_device_new_from_subsystem_sysname(self, udev, subsystem,
+                                               sys_name):
+        sys_name = sys_name.replace(b'/', b'!')
+        if subsystem == b'subsystem':
+            candidates = [(b'subsystem', sys_name), (b'bus', sys_name),
+                          (b'class', sys_name)]
+        elif subsystem == b'module':
+            candidates = [(b'module', sys_name)]
+        elif subsystem == b'drivers':
+            driver_subsystem, _, driver = sys_name.partition(b':')
+            candidates = [(b'bus', driver_subsystem, b'drivers', driver)]
+        else:
+            candidates = [(b'subsystem', subsystem, b'devices', sys_name),
+                          (b'bus', subsystem, b'devices', sys_name),
+                          (b'class', subsystem, sys_name)]
+        for candidate in candidates:
+            path = os.path.join(self.sys_path, *candidate)
+            if os.path.exists(path):
+                return self.new_device(_handle(udev), path)
+        return None
+
+    def udev_device_new_from_devnum(self, udev, type, number):
+        kind = b'block' if type == b'b' else b'char'
+        path = os.path.join(self.sys_path, b'dev', kind, '{0}:{1}'.format(
+            os.major(number), os.minor(number)).encode('ascii'))
+        return self.new_device(_handle(udev), path)
+
+    def udev_device_new_from_environment(self, udev):
+        environ = dict((ensure_byte_string(k), ensure_byte_string(v))
+                       for k, v in os.environ.items())
+        device_path = environ.get(b'DEVPATH')
+        if not device_path or not environ.get(b'SUBSYSTEM'):
+            return None
+        device = _Device(_handle(udev), self.sys_path + device_path,
+                         uevent=environ)
+        device._db = {}
+        device.action = environ.get(b'ACTION')
+        device.seqnum = int(environ.get(b'SEQNUM', 0))
+        return device
+
+    def udev_device_get_parent(self, device):
+        return _handle(device).parent
+
+    def udev_device_get_parent_with_subsystem_devtype(self, device,
+                                                      subsystem, device_type):
+        parent = _handle(device).parent
+        while parent is not None:
+            if parent.subsystem == subsystem and (
+                    device_type is None or
+                    parent.uevent.get(b'DEVTYPE') == device_type):
+                return parent
+            parent = parent.parent
+        return None
+
+    def udev_device_get_devpath(self, device):
+        return _handle(device).device_path
+
+    def udev_device_get_subsystem(self, device):
+        return _handle(device).subsystem
+
+    def udev_device_get_syspath(self, device):
+        return _handle(device).sys_path
+
+    def udev_device_get_sysnum(self, device):
+        return _handle(device).sys_number
+
+    def udev_device_get_sysname(self, device):
+        return _handle(device).sys_name
+
+    def udev_device_get_driver(self, device):
+        return _handle(device).driver
+
+    def udev_device_get_devtype(self, device):
+        return _handle(device).uevent.get(b'DEVTYPE')
+
+    def udev_device_get_devnode(self, device):
+        return _handle(device).device_node
+
+    def udev_device_get_property_value(self, device, name):
+        return _handle(device).property_value(name)
+
+    def udev_device_get_sysattr_value(self, device, attribute):
+        return _handle(device).attribute_value(attribute)
+
+    def udev_device_get_devnum(self, device):
+        return _handle(device).device_number
+
+    def udev_device_get_action(self, device):
+        return _handle(device).action
+
+    def udev_device_get_seqnum(self, device):
+        return _handle(device).seqnum
+
+    def udev_device_get_is_initialized(self, device):
+        return int(_handle(device).is_initialized)
+
+    def udev_device_get_usec_since_initialized(self, device):
+        db = _handle(device).db
+        if db is None or not db['initialized'] or _monotonic is None:
+            return 0
+        now = int(_monotonic() * 1000000)
+        return max(now - int(db['initialized']), 0)
+
+    def udev_device_get_devlinks_list_entry(self, device):
+        return _make_list([(link, None) for link in _handle(device).links])
+
+    def udev_device_get_tags_list_entry(self, device):
+        return _make_list([(tag, None) for tag in _handle(device).tags])
+
+    def udev_device_get_properties_list_entry(self, device):
+        return _make_list(_handle(device).properties)
+
+    def udev_device_get_sysattr_list_entry(self, device):
+        return _make_list(
+            [(name, None) for name in _handle(device).attribute_names()])
+
+    def udev_device_has_tag(self, device, tag):
+        return int(tag in _handle(device).tags)
+
+    # monitoring
+
+    def udev_monitor_new_from_netlink(self, udev, name):
+        # there is no udev daemon to receive events from
+        return None
+
+
+def _matches_subsystem(enumerate, subsystem):
+    if subsystem is None:
+        return False
+    if any(fnmatchcase(subsystem, p) for p in enumerate.nomatch_subsystems):
+        return False
+    if enumerate.subsystems:
+        return any(fnmatchcase(subsystem, p) for p in enumerate.subsystems)
+    return True
+
+
+def _matches_sysattr(device, name, pattern):
+    value = device.attribute_value(name)
+    if value is None:
+        return False
+    return pattern is None or fnmatchcase(value, pattern)
+
+
+def _matches(enumerate, device):
+    """
+    Check, if ``device`` matches all filters of ``enumerate``, with the
+    semantics of libudev.
+    """
+    if not _matches_subsystem(enumerate, device.subsystem):
+        return False
+    if enumerate.sysnames and not any(
+            fnmatchcase(device.sys_name, p) for p in enumerate.sysnames):
+        return False
+    # all tags must match
+    tags = device.tags
+    if not all(tag in tags for tag in enumerate.tags):
+        return False
+    # any property may match
+    if enumerate.properties and not any(
+            value is not None and fnmatchcase(value, pattern)
+            for value, pattern in ((device.property_value(name), pattern)
+                                   for name, pattern in enumerate.properties)):
+        return False
+    if not all(_matches_sysattr(device, name, pattern)
+               for name, pattern in enumerate.sysattrs):
+        return False
+    if any(_matches_sysattr(device, name, pattern)
+           for name, pattern in enumerate.nomatch_sysattrs):
+        return False
+    # like libudev, only require initialization of devices with device node
+    # or network interface
+    if (enumerate.is_initialized and not device.is_initialized and
+            (device.device_number or device.uevent.get(b'IFINDEX'))):
+        return False
+    return True
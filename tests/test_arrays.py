@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 Sebastian Wiesner <lunaryorn@gmail.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+from array import array
+
+import pytest
+
+from pyudev._arrays import ColumnBuilder, MaskedColumn, load_numpy
+
+
+def test_column_builder_fallback():
+    builder = ColumnBuilder(3, ['name', 'size', 'ro'],
+                            {'size': 'q', 'ro': '?'})
+    builder.set('name', 0, 'sda')
+    builder.set('size', 0, '42')
+    builder.set('size', 1, 'invalid')
+    builder.set('ro', 2, '1')
+    columns = builder.finish()
+    assert columns['name'] == MaskedColumn(['sda', None, None],
+                                           array(str('b'), [0, 1, 1]))
+    assert columns['size'] == MaskedColumn(array(str('q'), [42, 0, 0]),
+                                           array(str('b'), [0, 1, 1]))
+    assert columns['ro'] == MaskedColumn(array(str('b'), [0, 0, 1]),
+                                         array(str('b'), [1, 1, 0]))
+
+
+def test_column_builder_invalid_typecode():
+    with pytest.raises(ValueError):
+        ColumnBuilder(1, ['size'], {'size': 'x'})
+
+
+def test_column_builder_numpy():
+    numpy = load_numpy()
+    if numpy is None:
+        pytest.skip('numpy not available')
+    builder = ColumnBuilder(2, ['size'], {'size': 'int64'}, numpy=numpy)
+    builder.set('size', 1, '42')
+    column = builder.finish()['size']
+    assert isinstance(column, numpy.ma.MaskedArray)
+    assert column.mask.tolist() == [True, False]
+    assert column[1] == 42
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 Sebastian Wiesner <lunaryorn@gmail.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+import pytest
+import mock
+
+from pyudev.cache import EnumerationCache, MatchKey
+
+
+def pytest_funcarg__cache(request):
+    context = request.getfuncargvalue('context')
+    return EnumerationCache(context, ttl=None, maxsize=2)
+
+
+def make_event(device_path, subsystem, sys_name='spam', properties=None,
+               tags=()):
+    properties = properties or {}
+    return mock.Mock(device_path=device_path, subsystem=subsystem,
+                     sys_name=sys_name, tags=list(tags),
+                     get=properties.get)
+
+
+def test_make_key():
+    key = EnumerationCache.make_key(subsystem='block', ID_BUS='usb',
+                                    ID_CDROM=True)
+    assert key == MatchKey('block', None, None, None, (), False,
+                           (('ID_BUS', b'usb'), ('ID_CDROM', b'1')))
+    assert key == EnumerationCache.make_key(ID_CDROM='1', ID_BUS=b'usb',
+                                            subsystem=b'block')
+
+
+def test_invalid_maxsize(context):
+    with pytest.raises(ValueError):
+        EnumerationCache(context, maxsize=0)
+
+
+class TestEnumerationCache(object):
+
+    def test_list_devices(self, context, cache):
+        devices = cache.list_devices(subsystem='block')
+        assert devices == tuple(context.list_devices(subsystem='block'))
+        assert cache.list_devices(subsystem=b'block') is devices
+        assert len(cache) == 1
+
+    def test_ttl(self, context):
+        cache = EnumerationCache(context, ttl=0)
+        devices = cache.list_devices(subsystem='block')
+        assert cache.list_devices(subsystem='block') is not devices
+
+    def test_lru(self, cache):
+        block = cache.list_devices(subsystem='block')
+        cache.list_devices(subsystem='net')
+        assert cache.list_devices(subsystem='block') is block
+        cache.list_devices(subsystem='input')
+        assert len(cache) == 2
+        assert cache.list_devices(subsystem='block') is block
+
+    def test_invalidate_all(self, cache):
+        cache.list_devices(subsystem='block')
+        cache.list_devices(subsystem='net')
+        assert cache.invalidate() == 2
+        assert not len(cache)
+
+    def test_invalidate_by_subsystem(self, cache):
+        cache.list_devices(subsystem='block')
+        net = cache.list_devices(subsystem='net')
+        event = make_event('/devices/virtual/block/spam', 'block')
+        assert cache.invalidate(event) == 1
+        assert cache.list_devices(subsystem='net') is net
+
+    def test_invalidate_by_property(self, cache):
+        cache.list_devices(ID_BUS='usb')
+        assert cache.invalidate(make_event(
+            '/devices/spam', 'block', properties={'ID_BUS': 'ata'})) == 0
+        assert cache.invalidate(make_event(
+            '/devices/spam', 'block', properties={'ID_BUS': 'usb'})) == 1
+
+    def test_invalidate_contained_device(self, cache):
+        devices = cache.list_devices(subsystem='block')
+        if not devices:
+            pytest.skip('no block devices')
+        # the device no longer matches, but was part of the result
+        event = make_event(devices[0].device_path, 'spam')
+        assert cache.invalidate(event) == 1
+
+    def test_handle_event(self, cache):
+        with mock.patch.object(cache, 'invalidate') as invalidate:
+            cache.handle_event(mock.sentinel.device)
+            invalidate.assert_called_once_with(mock.sentinel.device)
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 Sebastian Wiesner <lunaryorn@gmail.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+import errno
+from ctypes import c_char_p, c_int
+
+import pytest
+import mock
+
+pytest.importorskip('cffi')
+
+from pyudev import _libudev, _util
+from pyudev._cffi_libudev import ffi, _wrap_function, CffiUdevLibrary
+
+
+def pytest_funcarg__libudev(request):
+    try:
+        return _libudev.load_udev_library('cffi')
+    except ImportError:
+        pytest.skip('udev not available')
+
+
+def test_declarations(libudev):
+    for name, (argtypes, restype) in _libudev.PROTOTYPES.items():
+        function = getattr(libudev._library, name, None)
+        if function is None:
+            # not provided by this version of libudev
+            continue
+        function_type = ffi.typeof(function)
+        assert len(function_type.args) == len(argtypes)
+        assert (function_type.result.kind == 'void') == (restype is None)
+
+
+def test_wrap_pointer_arguments():
+    function = mock.Mock(return_value=0)
+    wrapper = _wrap_function('udev_device_get_is_initialized', function,
+                             [_libudev.udev_device_p], c_int, None)
+    device = mock.Mock(_as_parameter_=mock.sentinel.pointer)
+    assert wrapper(device) == 0
+    function.assert_called_with(mock.sentinel.pointer)
+    pointer = ffi.new('int *')
+    wrapper(pointer)
+    function.assert_called_with(pointer)
+    wrapper(None)
+    function.assert_called_with(ffi.NULL)
+
+
+def test_wrap_string_arguments():
+    function = mock.Mock(return_value=ffi.NULL)
+    wrapper = _wrap_function('udev_device_get_property_value', function,
+                             [_libudev.udev_device_p, c_char_p], c_char_p,
+                             None)
+    assert wrapper(mock.sentinel.device, None) is None
+    function.assert_called_with(mock.sentinel.device, ffi.NULL)
+
+
+def test_wrap_string_result():
+    value = ffi.new('char[]', b'spam')
+    function = mock.Mock(return_value=value)
+    wrapper = _wrap_function('udev_device_get_sysname', function,
+                             [_libudev.udev_device_p], c_char_p, None)
+    assert wrapper(mock.sentinel.device) == b'spam'
+
+
+def test_wrap_error_checker():
+    function = mock.Mock(return_value=-errno.ENOMEM)
+    wrapper = _wrap_function('udev_enumerate_add_match_tag', function,
+                             [_libudev.udev_enumerate_p, c_char_p], c_int,
+                             _libudev.check_negative_errorcode)
+    with pytest.raises(MemoryError):
+        wrapper(mock.sentinel.enumerate, b'spam')
+
+
+def test_library(libudev):
+    assert isinstance(libudev, CffiUdevLibrary)
+    udev = libudev.udev_new()
+    try:
+        assert udev
+        device = libudev.udev_device_new_from_syspath(
+            udev, b'/sys/devices/virtual/mem/null')
+        assert libudev.udev_device_get_sysname(device) == b'null'
+        assert libudev.udev_device_get_property_value(
+            device, b'NON_EXISTING_PROPERTY') is None
+        libudev.udev_device_unref(device)
+    finally:
+        libudev.udev_unref(udev)
+
+
+def test_library_undeclared_function(libudev):
+    assert not hasattr(libudev, 'udev_non_existing_function')
+
+
+def test_list_walk(libudev):
+    udev = libudev.udev_new()
+    try:
+        device = libudev.udev_device_new_from_syspath(
+            udev, b'/sys/devices/virtual/mem/null')
+        entry = libudev.udev_device_get_properties_list_entry(device)
+        items = []
+        walking = entry
+        while walking:
+            items.append((libudev.udev_list_entry_get_name(walking),
+                          libudev.udev_list_entry_get_value(walking)))
+            walking = libudev.udev_list_entry_get_next(walking)
+        assert items
+        assert libudev.list_entries(entry) == items
+        assert libudev.list_names(entry) == [n for n, _ in items]
+        assert libudev.list_length(entry) == len(items)
+        assert _util.udev_list_entries(libudev, entry) == items
+        libudev.udev_device_unref(device)
+    finally:
+        libudev.udev_unref(udev)
+
+
+def test_list_walk_mocked_list(libudev):
+    with pytest.libudev_list(libudev, 'udev_enumerate_get_list_entry',
+                             [(b'spam', b'eggs')]):
+        entry = libudev.udev_enumerate_get_list_entry()
+        assert libudev.list_entries(entry) is None
+        # the generic walk takes over
+        assert _util.udev_list_entries(libudev, entry) == [(b'spam', b'eggs')]
@@ -19,13 +19,14 @@
 from __future__ import (print_function, division, unicode_literals,
                         absolute_import)
 
+import gc
 import random
 import syslog
 
 import pytest
 import mock
 
-from pyudev import udev_version
+from pyudev import Context, Device, udev_version, live_handles, HandleCounts
 
 
 def test_udev_version():
@@ -85,3 +86,51 @@ def test_log_priority_roundtrip(self, context):
             assert context.log_priority == new_priority
         finally:
             context.log_priority = old_priority
+
+
+def test_live_handles(context):
+    handles = live_handles()
+    assert isinstance(handles, HandleCounts)
+    assert handles.contexts >= 1
+    assert all(isinstance(count, int) for count in handles)
+
+
+class TestContextClose(object):
+
+    def test_close(self):
+        context = Context()
+        # collect garbage first, to not count handles released by it
+        gc.collect()
+        with mock.patch('pyudev.core.release_handle') as release_handle:
+            context.close()
+            assert context._as_parameter_ is None
+            release_handle.assert_called_once_with('contexts')
+            # closing again has no effect
+            context.close()
+            release_handle.assert_called_once_with('contexts')
+
+    def test_closed(self):
+        context = Context()
+        context.close()
+        with pytest.raises(ValueError):
+            context.log_priority
+        with pytest.raises(ValueError):
+            Device.from_path(context, '/devices/platform')
+
+    def test_with(self):
+        gc.collect()
+        with mock.patch('pyudev.core.release_handle') as release_handle:
+            with Context() as context:
+                assert context._as_parameter_ is not None
+                assert not release_handle.called
+            assert context._as_parameter_ is None
+            release_handle.assert_called_once_with('contexts')
+
+    def test_close_mock(self):
+        context = Context()
+        libudev = context._libudev
+        handle = context._as_parameter_
+        with mock.patch.object(libudev, 'udev_unref') as func:
+            context.close()
+            context.close()
+            func.assert_called_once_with(handle)
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 Sebastian Wiesner <lunaryorn@gmail.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+import select
+
+import pytest
+
+from pyudev.database import DatabaseIndex, parse_record
+
+
+RECORD = b'S:disk/by-id/spam\nE:ID_SPAM=eggs\nG:systemd\nI:1000\nV:1\n'
+
+
+def pytest_funcarg__run_path(request):
+    run_path = request.getfuncargvalue('tmpdir')
+    data = run_path.join('data').ensure(dir=True)
+    data.join('b7:0').write(RECORD, mode='wb')
+    data.join('n1').write(b'E:ID_NET_NAME=lo\n', mode='wb')
+    # temporary file of udev
+    data.join('.#b7:1').write(b'E:ID_SPAM=ham\n', mode='wb')
+    return run_path
+
+
+def replace_record(run_path, name, data):
+    temporary = run_path.join('data', '.#' + name)
+    temporary.write(data, mode='wb')
+    temporary.rename(run_path.join('data', name))
+
+
+def test_parse_record():
+    assert parse_record(RECORD) == {
+        'links': [b'disk/by-id/spam'], 'properties': [(b'ID_SPAM', b'eggs')],
+        'tags': [b'systemd'], 'initialized': b'1000'}
+    assert parse_record(None) == {}
+
+
+def test_index(run_path):
+    index = DatabaseIndex(str(run_path))
+    try:
+        assert len(index) == 2
+        assert sorted(index) == [b'b7:0', b'n1']
+        assert 'b7:0' in index
+        assert '.#b7:1' not in index
+        assert index.get('b7:0') == parse_record(RECORD)
+        assert index.get(b'n1')['properties'] == [(b'ID_NET_NAME', b'lo')]
+        assert index.get('b7:1') is None
+        assert index.with_tag('systemd') == [b'b7:0']
+        assert index.with_tag('spam') == []
+        assert index.by_link('disk/by-id/spam') == b'b7:0'
+        assert index.by_link('disk/by-id/eggs') is None
+    finally:
+        index.close()
+
+
+def test_index_large_record(run_path):
+    record = b''.join('E:ID_{0}={1}\n'.format(i, 'x' * 100).encode('ascii')
+                      for i in range(200))
+    run_path.join('data', 'c1:3').write(record, mode='wb')
+    index = DatabaseIndex(str(run_path), watch=False)
+    assert len(index.get('c1:3')['properties']) == 200
+
+
+def test_update_watched(run_path):
+    index = DatabaseIndex(str(run_path))
+    try:
+        assert index.watching
+        assert index.update() == 0
+        replace_record(run_path, 'b7:0', b'E:ID_SPAM=ham\nG:uaccess\n')
+        replace_record(run_path, 'c1:3', b'S:null\n')
+        run_path.join('data', 'n1').remove()
+        readable, _, _ = select.select([index], [], [], 1)
+        assert readable == [index]
+        assert index.update() == 3
+        assert sorted(index) == [b'b7:0', b'c1:3']
+        assert index.get('b7:0')['properties'] == [(b'ID_SPAM', b'ham')]
+        assert index.with_tag('systemd') == []
+        assert index.with_tag('uaccess') == [b'b7:0']
+        assert index.by_link('disk/by-id/spam') is None
+        assert index.by_link('null') == b'c1:3'
+    finally:
+        index.close()
+
+
+def test_update_not_watched(run_path):
+    index = DatabaseIndex(str(run_path), watch=False)
+    assert not index.watching
+    with pytest.raises(ValueError):
+        index.fileno()
+    run_path.join('data', 'n1').remove()
+    index.update()
+    assert sorted(index) == [b'b7:0']
+
+
+def test_watch_missing_directory(tmpdir):
+    with pytest.raises(EnvironmentError):
+        DatabaseIndex(str(tmpdir))
+    assert len(DatabaseIndex(str(tmpdir), watch=False)) == 0
@@ -632,6 +632,133 @@ def test_contains_mock(self, device):
             func.assert_called_once_with(device, b'foo')
 
 
+class TestRawDevice(object):
+
+    @with_devices
+    def test_device(self, device):
+        assert device.raw.device is device
+
+    @with_device_data
+    def test_paths(self, device, device_data):
+        raw = device.raw
+        assert raw.sys_path == device_data.sys_path.encode(
+            sys.getfilesystemencoding())
+        assert raw.device_path == device.device_path.encode(
+            sys.getfilesystemencoding())
+        assert raw.sys_name == device.sys_name.encode(
+            sys.getfilesystemencoding())
+        for name in ('sys_path', 'device_path', 'sys_name'):
+            assert isinstance(getattr(raw, name), bytes)
+
+    @with_devices
+    def test_optional_values(self, device):
+        raw = device.raw
+        for name in ('subsystem', 'sys_number', 'device_type', 'driver',
+                     'device_node'):
+            value = getattr(device, name)
+            if value is None:
+                assert getattr(raw, name) is None
+            else:
+                assert getattr(raw, name) == value.encode(
+                    sys.getfilesystemencoding())
+
+    @with_device_data
+    def test_iteration(self, device, device_data):
+        names = list(device.raw)
+        assert all(isinstance(name, bytes) for name in names)
+        assert set(n.decode(sys.getfilesystemencoding()) for n in names) == \
+            set(device_data.properties)
+
+    @with_device_data
+    def test_length(self, device, device_data):
+        assert len(device.raw) == len(device_data.properties)
+
+    @with_device_data
+    def test_getitem(self, device, device_data):
+        for name, value in device_data.properties.items():
+            raw_value = value.encode(sys.getfilesystemencoding())
+            assert device.raw[name] == raw_value
+            assert device.raw[name.encode('ascii')] == raw_value
+
+    @with_devices
+    def test_getitem_nonexisting(self, device):
+        with pytest.raises(KeyError) as excinfo:
+            device.raw['a non-existing property']
+        assert str(excinfo.value) == repr('a non-existing property')
+
+    @with_devices
+    def test_items(self, device):
+        assert dict((name.decode(sys.getfilesystemencoding()),
+                     value.decode(sys.getfilesystemencoding()))
+                    for name, value in device.raw.items()) == dict(device)
+
+    @with_device_data
+    def test_links(self, device, device_data):
+        assert sorted(device.raw.device_links) == sorted(
+            link.encode(sys.getfilesystemencoding())
+            for link in device_data.device_links)
+
+    @with_devices
+    def test_tags_mock(self, device):
+        funcname = 'udev_device_get_tags_list_entry'
+        with pytest.libudev_list(device._libudev, funcname,
+                                 [b'spam', b'eggs']):
+            assert device.raw.tags == [b'spam', b'eggs']
+
+
+class TestDeviceClose(object):
+
+    def test_close(self, context):
+        device = Device.from_path(context, '/devices/platform')
+        # collect garbage first, to not count handles released by it
+        gc.collect()
+        with mock.patch('pyudev.device.release_handle') as release_handle:
+            device.close()
+            assert device._as_parameter_ is None
+            release_handle.assert_called_once_with('devices')
+            device.close()
+            release_handle.assert_called_once_with('devices')
+
+    def test_closed(self, context):
+        device = Device.from_path(context, '/devices/platform')
+        device.close()
+        assert repr(device) == '<closed Device>'
+        with pytest.raises(ValueError):
+            device.sys_path
+        with pytest.raises(ValueError):
+            device['DEVPATH']
+
+    def test_closed_views(self, context):
+        device = Device.from_path(context, '/devices/platform')
+        raw = device.raw
+        attributes = device.attributes
+        tags = device.tags
+        device.close()
+        with pytest.raises(ValueError):
+            raw.sys_path
+        with pytest.raises(ValueError):
+            attributes.get('uevent')
+        with pytest.raises(ValueError):
+            list(attributes)
+        with pytest.raises(ValueError):
+            list(tags)
+
+    def test_with(self, context):
+        gc.collect()
+        with mock.patch('pyudev.device.release_handle') as release_handle:
+            with Device.from_path(context, '/devices/platform') as device:
+                assert device._as_parameter_ is not None
+                assert not release_handle.called
+            assert device._as_parameter_ is None
+            release_handle.assert_called_once_with('devices')
+
+    def test_parent_not_closed(self, context):
+        device = Device.from_path(context, '/devices/platform/serial8250')
+        parent = device.parent
+        device.close()
+        assert parent.sys_name == 'platform'
+
+
 def test_garbage():
     """
     Make sure that all the device tests create no uncollectable objects.
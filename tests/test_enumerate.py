@@ -19,10 +19,14 @@
 from __future__ import (print_function, division, unicode_literals,
                         absolute_import)
 
+import gc
+import weakref
+
 import pytest
 import mock
 
 from pyudev import Enumerator, Device
+from pyudev.query import Subsystem, Property, Attribute
 
 
 def pytest_funcarg__enumerator(request):
@@ -213,6 +217,187 @@ def test_match_passthrough_property(self, enumerator):
             assert ('spam', mock.sentinel.spam) in posargs
             assert ('eggs', mock.sentinel.eggs) in posargs
 
+    def test_sys_paths(self, context):
+        devices = list(context.list_devices(subsystem='block'))
+        sys_paths = list(context.list_devices(subsystem='block').sys_paths())
+        assert sys_paths == [d.sys_path for d in devices]
+        for sys_path in sys_paths:
+            assert pytest.is_unicode_string(sys_path)
+
+    def test_sys_paths_no_devices(self, enumerator):
+        with mock.patch.object(Device, 'from_sys_path') as from_sys_path:
+            list(enumerator.sys_paths())
+            assert not from_sys_path.called
+
+    def test_count(self, context):
+        devices = list(context.list_devices(subsystem='block'))
+        assert context.list_devices(subsystem='block').count() == len(devices)
+
+    def test_count_mock(self, enumerator):
+        with pytest.libudev_list(enumerator._libudev,
+                                 'udev_enumerate_get_list_entry',
+                                 ['spam', 'eggs']):
+            with mock.patch.object(enumerator._libudev,
+                                   'udev_enumerate_scan_devices'):
+                assert enumerator.count() == 2
+
+    def test_chunks(self, context):
+        devices = list(context.list_devices())
+        chunks = []
+        for chunk in context.list_devices().chunks(7):
+            assert 0 < len(chunk) <= 7
+            chunks.append(list(chunk))
+        assert [d for c in chunks for d in c] == devices
+        assert all(len(c) == 7 for c in chunks[:-1])
+
+    def test_chunks_kept(self, context):
+        devices = list(context.list_devices())
+        chunks = list(context.list_devices().chunks(10))
+        assert [d for c in chunks for d in c] == devices
+
+    def test_chunks_released(self, context):
+        chunks = context.list_devices().chunks(2)
+        first = next(chunks)
+        assert len(first) == 2
+        device = weakref.ref(first[0])
+        del first
+        next(chunks)
+        gc.collect()
+        # the enumerator holds no references to the devices of past chunks
+        assert device() is None
+
+    def test_chunks_closed(self, context):
+        chunks = context.list_devices().chunks(2, close=True)
+        first = next(chunks)
+        second = next(chunks)
+        assert all(device._as_parameter_ is None for device in first)
+        assert all(device._as_parameter_ is not None for device in second)
+        chunks.close()
+        assert all(device._as_parameter_ is None for device in second)
+
+    def test_chunks_invalid_size(self, enumerator):
+        with pytest.raises(ValueError):
+            next(enumerator.chunks(0))
+
+    def test_visit(self, context):
+        devices = list(context.list_devices())
+        visited = []
+
+        def visitor(device):
+            visited.append(device)
+            assert device._as_parameter_ is not None
+        assert context.list_devices().visit(visitor, 5) == len(devices)
+        assert len(visited) == len(devices)
+        # each device is closed after it was visited
+        assert all(device._as_parameter_ is None for device in visited)
+
+    def test_visit_stop(self, context):
+        visited = []
+
+        def visitor(device):
+            visited.append(device)
+            return len(visited) < 3
+        closed = set()
+        close = Device.close
+
+        def close_device(device):
+            closed.add(id(device))
+            close(device)
+        with mock.patch.object(Device, 'close', close_device):
+            assert context.list_devices().visit(visitor, 2) == 3
+        assert len(visited) == 3
+        # the unvisited rest of the last chunk is closed, too
+        assert len(closed) == 4
+
+    def test_scan_parallel(self, context):
+        devices = context.list_devices().scan_parallel(workers=3)
+        expected = sorted(context.list_devices(), key=lambda d: d.sys_path)
+        assert devices == expected
+
+    def test_scan_parallel_matches(self, context):
+        devices = context.list_devices(subsystem='b*').scan_parallel()
+        expected = sorted(context.list_devices(subsystem='b*'),
+                          key=lambda d: d.sys_path)
+        assert devices == expected
+
+    def test_scan_parallel_parents(self, context):
+        parents = list(context.list_devices(subsystem='pci'))[:2]
+        if not parents:
+            pytest.skip('no pci devices')
+        devices = context.list_devices().scan_parallel(parents=parents)
+        for device in devices:
+            assert any(device.sys_path == p.sys_path or
+                       device.sys_path.startswith(p.sys_path + '/')
+                       for p in parents)
+        assert [d.sys_path for d in devices] == sorted(
+            set(d.sys_path for d in devices))
+
+    def test_scan_parallel_parents_already_matched(self, context):
+        parent = next(iter(context.list_devices()))
+        enumerator = context.list_devices(parent=parent)
+        with pytest.raises(ValueError):
+            enumerator.scan_parallel(parents=[parent])
+
+    def test_scan_parallel_shards(self, context):
+        enumerator = context.list_devices()
+        with mock.patch.object(enumerator, '_scan_shard') as scan_shard:
+            scan_shard.return_value = []
+            enumerator.scan_parallel(workers=3)
+        shards = [args[0] for args, _ in scan_shard.call_args_list]
+        assert 0 < len(shards) <= 3
+        subsystems = [s for _, names in shards for s in names]
+        assert len(subsystems) == len(set(subsystems))
+        assert all(kind == 'subsystem' for kind, _ in shards)
+
+    def test_scan_parallel_joins_pool(self, context):
+        from multiprocessing.pool import ThreadPool
+        with mock.patch.object(ThreadPool, 'join', autospec=True,
+                               side_effect=ThreadPool.join) as join:
+            context.list_devices().scan_parallel(workers=2)
+        assert join.called
+
+    def test_scan_parallel_invalid_workers(self, enumerator):
+        with pytest.raises(ValueError):
+            enumerator.scan_parallel(0)
+
+    def test_where(self, context):
+        devices = context.list_devices(subsystem='block').where(
+            ~(Property('DEVTYPE') == 'partition') & (Attribute('size') >= 0))
+        expected = [d for d in context.list_devices(subsystem='block')
+                    if d.get('DEVTYPE') != 'partition' and
+                    'size' in d.attributes]
+        assert list(devices) == expected
+        assert devices.count() == len(expected)
+        assert list(devices.sys_paths()) == [d.sys_path for d in expected]
+
+    def test_where_push_down(self, enumerator):
+        with mock.patch.object(enumerator, 'match_subsystem') as match:
+            enumerator.where(Subsystem() == 'block')
+            match.assert_called_with('block')
+        assert enumerator._residual is None
+
+    def test_match_after_where(self, enumerator):
+        enumerator.where(Subsystem() == 'block')
+        with pytest.raises(ValueError):
+            enumerator.match_subsystem('net')
+        # other kinds and negative matches do not widen the predicate
+        enumerator.match_subsystem('net', nomatch=True)
+        enumerator.match_sys_name('sda')
+
+    def test_match_before_where(self, context):
+        devices = context.list_devices(subsystem='block').where(
+            Subsystem() == 'net')
+        devices.match_sys_name('sda')
+        assert not list(devices)
+
+    def test_explain(self, context):
+        devices = context.list_devices(subsystem='block').where(
+            (Subsystem() == 'net') & (Attribute('size') > 0))
+        assert devices.explain().splitlines() == [
+            "libudev: match_subsystem({0!r})".format('block'),
+            "python: ({0!r} & {1!r})".format(Subsystem() == 'net',
+                                             Attribute('size') > 0)]
+        assert not list(devices)
 
 class TestContext(object):
 
@@ -241,3 +426,146 @@ def test_list_devices_passthrough(self, context):
                 parent=mock.sentinel.parent,
                 prop1=mock.sentinel.prop1,
                 prop2=mock.sentinel.prop2)
+
+    def test_list_devices_predicates(self, context):
+        with mock.patch.object(Enumerator, 'where') as where:
+            where.return_value = mock.sentinel.enumerator
+            context.list_devices(mock.sentinel.predicate1,
+                                 mock.sentinel.predicate2)
+            assert where.call_args_list == [
+                ((mock.sentinel.predicate1,), {}),
+                ((mock.sentinel.predicate2,), {})]
+
+
+def column_values(column):
+    """
+    Return ``(data, mask)`` of a column returned by
+    :meth:`pyudev.Enumerator.to_columns()`.
+    """
+    if isinstance(column, tuple):
+        return column
+    return column.data, column.mask
+
+
+class TestEnumeratorClose(object):
+
+    def test_close(self, context):
+        enumerator = context.list_devices(subsystem='block')
+        # collect garbage first, to not count handles released by it
+        gc.collect()
+        with mock.patch('pyudev.core.release_handle') as release_handle:
+            enumerator.close()
+            assert enumerator._as_parameter_ is None
+            release_handle.assert_called_once_with('enumerators')
+            enumerator.close()
+            release_handle.assert_called_once_with('enumerators')
+        with pytest.raises(ValueError):
+            list(enumerator)
+
+    def test_with(self, context):
+        gc.collect()
+        with mock.patch('pyudev.core.release_handle') as release_handle:
+            with context.list_devices(subsystem='block') as enumerator:
+                devices = list(enumerator)
+                assert not release_handle.called
+            assert enumerator._as_parameter_ is None
+            release_handle.assert_called_once_with('enumerators')
+        # devices outlive their enumerator
+        for device in devices:
+            assert device.subsystem == 'block'
+
+
+class TestEnumeratorColumns(object):
+
+    def test_to_columns_strings(self, context):
+        devices = list(context.list_devices(subsystem='block'))
+        columns = context.list_devices(subsystem='block').to_columns(
+            properties=['DEVNAME'])
+        assert list(columns) == ['DEVNAME']
+        data, mask = column_values(columns['DEVNAME'])
+        assert len(data) == len(devices)
+        for device, value, masked in zip(devices, data, mask):
+            if masked:
+                assert 'DEVNAME' not in device
+            else:
+                assert value == device['DEVNAME']
+
+    def test_to_columns_typed_attribute(self, context):
+        devices = list(context.list_devices(subsystem='block'))
+        columns = context.list_devices(subsystem='block').to_columns(
+            attributes=['size'], dtypes={'size': 'q'})
+        data, mask = column_values(columns['size'])
+        for device, value, masked in zip(devices, data, mask):
+            assert bool(masked) == ('size' not in device.attributes)
+            if not masked:
+                assert value == device.attributes.asint('size')
+
+    def test_to_columns_undecodable_property(self, context):
+        enumerator = context.list_devices(subsystem='block')
+        funcname = 'udev_device_get_property_value'
+        spec = lambda d, n: None
+        with mock.patch.object(context._libudev, funcname,
+                               autospec=spec) as func:
+            func.return_value = b'\xff\xfe'
+            columns = enumerator.to_columns(properties=['DEVNAME'])
+        data, mask = column_values(columns['DEVNAME'])
+        assert all(mask)
+
+    def test_to_columns_ambiguous(self, enumerator):
+        with pytest.raises(ValueError):
+            enumerator.to_columns(properties=['size'], attributes=['size'])
+
+
+class TestEnumeratorPrefetch(object):
+
+    def test_with_attributes_returns_self(self, enumerator):
+        assert enumerator.with_attributes(['size']) is enumerator
+
+    def test_with_attributes_invalid_workers(self, enumerator):
+        with pytest.raises(ValueError):
+            enumerator.with_attributes(['size'], workers=0)
+
+    def test_with_attributes(self, context):
+        expected = list(context.list_devices(subsystem='block'))
+        devices = list(context.list_devices(subsystem='block').with_attributes(
+            ['size', 'queue/rotational'], workers=2))
+        assert devices == expected
+        for device in devices:
+            assert set(device._attribute_cache) == set(
+                ['size', 'queue/rotational'])
+            assert device.attributes.get('size') == \
+                device._attribute_cache['size']
+
+    def test_with_attributes_cached(self, context):
+        devices = context.list_devices(subsystem='block').with_attributes(
+            ['size'])
+        for device in devices:
+            with mock.patch.object(device._libudev,
+                                   'udev_device_get_sysattr_value') as func:
+                'size' in device.attributes
+                assert not func.called
+
+    def test_with_attributes_snapshot(self, context):
+        devices = context.list_devices(subsystem='block').with_attributes(
+            ['size'])
+        for device in devices:
+            size = device.attributes.get('size')
+            with mock.patch.object(device._libudev,
+                                   'udev_device_get_sysattr_value') as func:
+                func.return_value = b'42'
+                # the snapshot is kept for the lifetime of the device
+                assert 'size' in device.attributes
+                assert device.attributes['size'] == size
+                assert not func.called
+
+    def test_with_attributes_creates_devices_once(self, context):
+        count = context.list_devices(subsystem='block').count()
+        devices = context.list_devices(subsystem='block').with_attributes(
+            ['size'], workers=2)
+        new_device = context._libudev.udev_device_new_from_syspath
+        with mock.patch.object(context._libudev,
+                               'udev_device_new_from_syspath',
+                               side_effect=new_device) as func:
+            devices = list(devices)
+        assert len(devices) == count
+        assert func.call_count == count
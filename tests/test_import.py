@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 Sebastian Wiesner <lunaryorn@gmail.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+import os
+import sys
+import json
+import subprocess
+
+import pytest
+
+import pyudev
+
+
+requires_lazy_import = pytest.mark.skipif(
+    str('sys.version_info < (3, 7)'))
+
+
+# modules, which "import pyudev" must not import
+EXPENSIVE_MODULES = ['pyudev.core', 'pyudev.device', 'pyudev.monitor',
+                     'pyudev._libudev', 'ctypes', 'subprocess', 'threading',
+                     'select']
+
+
+def imported_modules(statement):
+    """
+    Run ``statement`` in a new interpreter.
+
+    Return the list of all modules imported by ``statement``.
+    """
+    script = ('import sys; before = set(sys.modules); {0}; '
+              'import json; print(json.dumps(sorted('
+              'set(sys.modules) - before)))'.format(statement))
+    package_directory = os.path.dirname(os.path.dirname(pyudev.__file__))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [package_directory] + [p for p in [env.get('PYTHONPATH')] if p])
+    output = subprocess.check_output([sys.executable, '-c', script], env=env)
+    return json.loads(output.decode('utf-8'))
+
+
+@requires_lazy_import
+def test_import_is_lazy():
+    modules = imported_modules('import pyudev')
+    for module in EXPENSIVE_MODULES:
+        assert module not in modules
+
+
+@requires_lazy_import
+def test_import_name():
+    modules = imported_modules('from pyudev import Device')
+    assert 'pyudev.device' in modules
+    assert 'pyudev.monitor' not in modules
+
+
+@requires_lazy_import
+def test_import_does_not_load_library():
+    modules = imported_modules('from pyudev import Context')
+    assert 'pyudev.core' in modules
+    assert 'ctypes.util' not in modules
+
+
+def test_public_names():
+    for name in ['Context', 'Enumerator', 'Device', 'Attributes', 'Tags',
+                 'Monitor', 'MonitorObserver', 'udev_version',
+                 'DeviceNotFoundError', 'DeviceNotFoundAtPathError',
+                 'DeviceNotFoundByNameError', 'DeviceNotFoundByNumberError',
+                 'DeviceNotFoundInEnvironmentError']:
+        assert name in dir(pyudev)
+        assert getattr(pyudev, name).__name__ == name
+
+
+def test_submodules():
+    modules = imported_modules(
+        'import pyudev; pyudev.core, pyudev.device, pyudev.monitor')
+    for module in ['pyudev.core', 'pyudev.device', 'pyudev.monitor']:
+        assert module in modules
+    for name in ['core', 'device', 'monitor']:
+        assert name in dir(pyudev)
+        assert getattr(pyudev, name).__name__ == 'pyudev.' + name
+
+
+def test_missing_name():
+    with pytest.raises(AttributeError):
+        pyudev.NonExistingName
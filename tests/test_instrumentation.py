@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 Sebastian Wiesner <lunaryorn@gmail.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+import json
+from io import StringIO
+
+import pytest
+
+from pyudev import Context, _libudev, instrumentation
+from pyudev.instrumentation import (Instrumentation, CallStatistics,
+                                    HISTOGRAM_BOUNDS)
+
+
+def make_context(stats):
+    instrumentation.enable(stats)
+    try:
+        return Context()
+    except ImportError:
+        pytest.skip('udev not available')
+    finally:
+        instrumentation.disable()
+
+
+def test_disabled_by_default():
+    assert instrumentation.current() is None
+    try:
+        context = Context()
+    except ImportError:
+        pytest.skip('udev not available')
+    assert context._libudev is _libudev.load_udev_library()
+
+
+def test_enable_disable():
+    stats = instrumentation.enable()
+    try:
+        assert isinstance(stats, Instrumentation)
+        assert instrumentation.current() is stats
+    finally:
+        assert instrumentation.disable() is stats
+    assert instrumentation.current() is None
+    assert instrumentation.disable() is None
+
+
+def test_enable_given_instrumentation():
+    stats = Instrumentation()
+    try:
+        assert instrumentation.enable(stats) is stats
+    finally:
+        instrumentation.disable()
+
+
+def test_record_calls():
+    stats = Instrumentation()
+    context = make_context(stats)
+    assert list(stats.statistics()) == ['udev_new']
+    context.log_priority
+    context.log_priority
+    call_stats = stats.statistics()['udev_get_log_priority']
+    assert isinstance(call_stats, CallStatistics)
+    assert call_stats.calls == 2
+    assert call_stats.total_time > 0
+    assert len(call_stats.histogram) == len(HISTOGRAM_BOUNDS) + 1
+    assert sum(call_stats.histogram) == 2
+
+
+def test_record_calls_of_enumerator():
+    stats = Instrumentation()
+    context = make_context(stats)
+    devices = list(context.list_devices(subsystem='mem'))
+    statistics = stats.statistics()
+    assert statistics['udev_enumerate_scan_devices'].calls == 1
+    assert statistics['udev_device_new_from_syspath'].calls == len(devices)
+
+
+def test_record_failed_calls():
+    stats = Instrumentation()
+    context = make_context(stats)
+    with pytest.raises(ValueError):
+        context._libudev.udev_enumerate_add_match_parent(None, None)
+    assert stats.statistics()[
+        'udev_enumerate_add_match_parent'].calls == 1
+
+
+def test_wrap_cached():
+    stats = Instrumentation()
+    libudev = object()
+    assert stats.wrap(libudev) is stats.wrap(libudev)
+
+
+def test_reset():
+    stats = Instrumentation()
+    context = make_context(stats)
+    context.log_priority
+    stats.reset()
+    assert stats.statistics() == {}
+
+
+def test_dump():
+    stats = Instrumentation()
+    context = make_context(stats)
+    context.log_priority
+    stream = StringIO()
+    stats.dump(stream)
+    data = json.loads(stream.getvalue())
+    assert data['histogram_bounds'] == list(HISTOGRAM_BOUNDS)
+    function = data['functions']['udev_get_log_priority']
+    assert function['calls'] == 1
+    assert function['mean_time'] == function['total_time']
+    assert sum(function['histogram']) == 1
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 Sebastian Wiesner <lunaryorn@gmail.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+import sys
+
+import pytest
+import mock
+
+from pyudev import interning
+from pyudev._util import (ensure_unicode_string, ensure_byte_string,
+                          intern_strings)
+from pyudev.records import DeviceRecord
+
+
+def restore(previous):
+    if previous is None:
+        interning.disable()
+    else:
+        interning.enable(previous)
+
+
+def pytest_funcarg__table(request):
+    table = interning.InternTable(max_length=8, max_entries=4)
+    previous = interning.enable(table)
+    request.addfinalizer(lambda: restore(previous))
+    return table
+
+
+def test_disabled_by_default():
+    assert interning.current() is None
+
+
+def test_enable_disable(table):
+    assert interning.current() is table
+    assert interning.disable() is table
+    assert interning.current() is None
+    # decoding still works without table
+    assert ensure_unicode_string(b'spam') == 'spam'
+    assert ensure_byte_string('spam') == b'spam'
+    assert interning.enable(table) is table
+    assert interning.current() is table
+
+
+def test_enable_new_table(table):
+    new_table = interning.enable()
+    assert new_table is not table
+    assert interning.current() is new_table
+
+
+def test_decode(table):
+    first = ensure_unicode_string(b'disk')
+    second = ensure_unicode_string(b''.join([b'di', b'sk']))
+    assert first == 'disk'
+    assert pytest.is_unicode_string(first)
+    assert first is second
+    statistics = table.statistics()
+    assert statistics.entries == 1
+    assert statistics.hits == 1
+    assert statistics.misses == 1
+    assert statistics.saved_bytes == sys.getsizeof(first)
+
+
+def test_decode_long_string(table):
+    value = b'/dev/disk/by-id/spam'
+    with mock.patch.object(table, '_decoded') as decoded:
+        assert ensure_unicode_string(value) == value.decode('ascii')
+        # long strings are not even looked up
+        assert not decoded.get.called
+    assert table.statistics().entries == 0
+
+
+def test_encode(table):
+    name = 'ID_SPAM'
+    first = ensure_byte_string(name)
+    second = ensure_byte_string(''.join(['ID_', 'SPAM']))
+    assert first == b'ID_SPAM'
+    assert first is second
+    assert table.statistics().hits == 1
+
+
+def test_full_table(table):
+    values = [ensure_unicode_string(v) for v in
+              (b'a', b'b', b'c', b'd', b'e')]
+    assert values == ['a', 'b', 'c', 'd', 'e']
+    assert table.statistics().entries == 4
+    # the table is full, strings are still decoded correctly
+    assert ensure_unicode_string(b'f') == 'f'
+    assert table.statistics().entries == 4
+
+
+def test_intern_strings(table):
+    first = intern_strings([''.join(['di', 'sk']), 'partition'])
+    second = intern_strings([''.join(['d', 'isk']), 'partition'])
+    assert first == second == ['disk', 'partition']
+    assert first[0] is second[0]
+    interning.disable()
+    assert intern_strings(['disk']) == ['disk']
+
+
+def test_clear(table):
+    ensure_unicode_string(b'disk')
+    ensure_unicode_string(b'disk')
+    table.clear()
+    assert table.statistics() == interning.InternStatistics(0, 0, 0, 0)
+
+
+def pytest_funcarg__default_table(request):
+    previous = interning.enable()
+    request.addfinalizer(lambda: restore(previous))
+
+
+def test_records_share_strings(context, default_table):
+    devices = list(context.list_devices(subsystem='block'))
+    if len(devices) < 2:
+        pytest.skip('not enough block devices')
+    first, second = [DeviceRecord.from_device(d) for d in devices[:2]]
+    assert first.subsystem is second.subsystem
+    for name in set(first.properties) & set(second.properties):
+        first_name = [n for n in first.properties if n == name][0]
+        second_name = [n for n in second.properties if n == name][0]
+        assert first_name is second_name
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 Sebastian Wiesner <lunaryorn@gmail.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+import pytest
+
+from pyudev.inventory import Inventory, InventoryDevice, write_inventory
+
+
+def pytest_funcarg__inventory_file(request):
+    context = request.getfuncargvalue('context')
+    tmpdir = request.getfuncargvalue('tmpdir')
+    filename = str(tmpdir.join('inventory'))
+    write_inventory(context.list_devices(), filename, block_size=16)
+    return filename
+
+
+def pytest_funcarg__inventory(request):
+    inventory = Inventory(request.getfuncargvalue('inventory_file'))
+    request.addfinalizer(inventory.close)
+    return inventory
+
+
+def test_write_inventory(context, tmpdir):
+    filename = tmpdir.join('inventory')
+    count = write_inventory(context.list_devices(), str(filename))
+    assert count == len(list(context.list_devices()))
+    assert filename.check()
+    assert not tmpdir.join('inventory.tmp').check()
+
+
+def test_write_inventory_invalid_block_size(context, tmpdir):
+    with pytest.raises(ValueError):
+        write_inventory(context.list_devices(), str(tmpdir.join('spam')),
+                        block_size=0)
+
+
+def test_inventory(context, inventory):
+    assert inventory.sys_path == context.sys_path
+    devices = list(context.list_devices())
+    assert len(inventory) == len(devices)
+    assert list(inventory) == [d.device_path for d in devices]
+
+
+@pytest.mark.parametrize('compress', [True, False])
+def test_inventory_devices(context, tmpdir, compress):
+    filename = str(tmpdir.join('inventory'))
+    write_inventory(context.list_devices(), filename, compress=compress,
+                    block_size=7)
+    with Inventory(filename) as inventory:
+        for device in context.list_devices():
+            assert device.device_path in inventory
+            recorded = inventory[device.device_path]
+            assert isinstance(recorded, InventoryDevice)
+            assert recorded.sys_path == device.sys_path
+            assert recorded.device_path == device.device_path
+            assert dict(recorded) == dict(device)
+            assert recorded.subsystem == device.subsystem
+            assert recorded.device_type == device.device_type
+            assert recorded.device_node == device.device_node
+
+
+def test_inventory_random_access(context, inventory):
+    devices = list(context.list_devices())
+    for device in reversed(devices):
+        assert dict(inventory[device.device_path]) == dict(device)
+
+
+def test_inventory_byte_string_path(context, inventory):
+    device = next(iter(context.list_devices()))
+    device_path = device.device_path.encode('ascii')
+    assert device_path in inventory
+    assert inventory[device_path].device_path == device.device_path
+
+
+def test_inventory_missing(inventory):
+    assert '/devices/not/existing' not in inventory
+    with pytest.raises(KeyError):
+        inventory['/devices/not/existing']
+
+
+def test_inventory_empty(context, tmpdir):
+    filename = str(tmpdir.join('inventory'))
+    enumerator = context.list_devices(subsystem='not-existing')
+    assert write_inventory(enumerator, filename) == 0
+    with Inventory(filename) as inventory:
+        assert len(inventory) == 0
+        assert list(inventory) == []
+
+
+def test_inventory_invalid(tmpdir):
+    filename = tmpdir.join('inventory')
+    filename.write('{"version": 1}')
+    with pytest.raises(ValueError):
+        Inventory(str(filename))
+
+
+def test_inventory_truncated(inventory_file):
+    with open(inventory_file, 'rb') as stream:
+        data = stream.read()
+    with open(inventory_file, 'wb') as stream:
+        stream.write(data[:-4])
+    with pytest.raises(ValueError):
+        Inventory(inventory_file)
+
+
+def test_inventory_device():
+    device = InventoryDevice('/sys/devices/spam', '/devices/spam',
+                             {'SUBSYSTEM': 'spam', 'ID_EGGS': '1',
+                              'ID_HAM': '42'})
+    assert device.subsystem == 'spam'
+    assert device.device_type is None
+    assert device.driver is None
+    assert device['ID_HAM'] == '42'
+    assert device.asint('ID_HAM') == 42
+    assert device.asbool('ID_EGGS')
+    with pytest.raises(ValueError):
+        device.asbool('ID_HAM')
+    with pytest.raises(KeyError):
+        device['DEVNAME']
+    assert len(device) == 3
+    assert sorted(device) == ['ID_EGGS', 'ID_HAM', 'SUBSYSTEM']
@@ -20,9 +20,11 @@
                         absolute_import)
 
 import re
+import sys
 import ctypes
 
 import pytest
+import mock
 
 from pyudev import _libudev
 
@@ -127,7 +129,7 @@ def pytest_funcarg__libudev_function(request):
 
 def pytest_funcarg__libudev(request):
     try:
-        return _libudev.load_udev_library()
+        return _libudev.load_udev_library('ctypes')
     except ImportError:
         pytest.skip('udev not available')
 
@@ -157,3 +159,45 @@ def test_error_checker(function, libudev_function):
         assert function.errcheck == _libudev.ERROR_CHECKERS[name]
     else:
         pytest.skip('{0} has no error checker'.format(name))
+
+
+def test_load_udev_library_cached(libudev):
+    assert _libudev.load_udev_library('ctypes') is libudev
+    assert _libudev.load_udev_library() is _libudev.load_udev_library()
+
+
+def test_load_udev_library_default_backend(libudev):
+    try:
+        from pyudev._cffi_libudev import CffiUdevLibrary
+    except ImportError:
+        assert _libudev.load_udev_library() is libudev
+    else:
+        assert isinstance(_libudev.load_udev_library(), CffiUdevLibrary)
+
+
+def test_load_udev_library_without_cffi(libudev):
+    with mock.patch.dict(_libudev._libraries, clear=True):
+        with mock.patch.dict(sys.modules, {'pyudev._cffi_libudev': None}):
+            library = _libudev.load_udev_library()
+    assert isinstance(library, _libudev.UdevLibrary)
+    assert _libudev.load_udev_library('ctypes') is libudev
+
+
+def test_load_udev_library_unknown_backend():
+    with pytest.raises(ValueError):
+        _libudev.load_udev_library('spam')
+
+
+def test_lazy_binding(libudev):
+    library = _libudev.UdevLibrary(libudev._library)
+    assert 'udev_device_get_syspath' not in vars(library)
+    function = library.udev_device_get_syspath
+    assert vars(library)['udev_device_get_syspath'] is function
+    assert function.argtypes == [_libudev.udev_device_p]
+    assert library.udev_device_get_syspath is function
+
+
+def test_missing_function(libudev):
+    assert not hasattr(libudev, 'udev_non_existing_function')
+    with pytest.raises(AttributeError):
+        libudev._non_existing_attribute
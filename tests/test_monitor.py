@@ -19,6 +19,8 @@
 from __future__ import (print_function, division, unicode_literals,
                         absolute_import)
 
+import os
+import gc
 import errno
 from datetime import datetime, timedelta
 from contextlib import contextmanager
@@ -294,6 +296,42 @@ def test_iter(self, monitor):
         iterator.close()
 
 
+class TestMonitorClose(object):
+
+    def test_close(self, context):
+        monitor = Monitor.from_netlink(context)
+        # collect garbage first, to not count handles released by it
+        gc.collect()
+        with mock.patch('pyudev.monitor.release_handle') as release_handle:
+            monitor.close()
+            assert monitor._as_parameter_ is None
+            assert not monitor.started
+            release_handle.assert_called_once_with('monitors')
+            monitor.close()
+            release_handle.assert_called_once_with('monitors')
+        with pytest.raises(ValueError):
+            monitor.fileno()
+
+    def test_with(self, context):
+        gc.collect()
+        with mock.patch('pyudev.monitor.release_handle') as release_handle:
+            with Monitor.from_netlink(context) as monitor:
+                assert monitor._as_parameter_ is not None
+                assert not release_handle.called
+            assert monitor._as_parameter_ is None
+            release_handle.assert_called_once_with('monitors')
+
+
+def is_open(fd):
+    try:
+        os.fstat(fd)
+    except EnvironmentError as error:
+        assert error.errno == errno.EBADF
+        return False
+    else:
+        return True
+
+
 class TestMonitorObserver(object):
 
     def callback(self, device):
@@ -360,3 +398,28 @@ def test_real(self, context, monitor):
         assert [d.action for d in self.events] == ['add', 'remove']
         for device in self.events:
             assert device.device_path == '/devices/virtual/net/dummy0'
+
+    def test_close_not_started(self, fake_monitor):
+        observer = self.make_observer(fake_monitor)
+        fds = [observer._stop_event_source, observer._stop_event_sink]
+        observer.close()
+        assert not any(is_open(fd) for fd in fds)
+        # closing again has no effect
+        observer.close()
+
+    def test_close_running(self, fake_monitor, fake_monitor_device):
+        observer = self.make_observer(fake_monitor)
+        fds = [observer._stop_event_source, observer._stop_event_sink]
+        with observer:
+            observer.start()
+            fake_monitor.trigger_event()
+        assert not observer.is_alive()
+        assert not any(is_open(fd) for fd in fds)
+
+    def test_close_stopped(self, fake_monitor, fake_monitor_device):
+        observer = self.make_observer(fake_monitor)
+        fds = [observer._stop_event_source, observer._stop_event_sink]
+        observer.start()
+        observer.stop()
+        observer.close()
+        assert not any(is_open(fd) for fd in fds)
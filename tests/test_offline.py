@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 Sebastian Wiesner <lunaryorn@gmail.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+import io
+import gzip
+
+import pytest
+
+from pyudev import Context, Device, DeviceNotFoundAtPathError
+from pyudev.offline import OfflineUdevLibrary, iter_export_db, load
+
+
+EXPORT_DB = b"""\
+P: /devices/pci0000:00/0000:00:1f.2
+E: DEVPATH=/devices/pci0000:00/0000:00:1f.2
+E: DRIVER=ahci
+E: SUBSYSTEM=pci
+E: USEC_INITIALIZED=1000
+
+P: /devices/pci0000:00/0000:00:1f.2/ata1/host0/target0:0:0/0:0:0:0/block/sda
+N: sda
+S: disk/by-id/ata-SPAM
+S: disk/by-path/pci-0000:00:1f.2-ata-1
+E: DEVLINKS=/dev/disk/by-id/ata-SPAM /dev/disk/by-path/pci-0000:00:1f.2-ata-1
+E: DEVNAME=/dev/sda
+E: DEVPATH=/devices/pci0000:00/0000:00:1f.2/ata1/host0/target0:0:0/0:0:0:0/block/sda
+E: DEVTYPE=disk
+E: ID_BUS=ata
+E: MAJOR=8
+E: MINOR=0
+E: SUBSYSTEM=block
+E: TAGS=:systemd:
+E: USEC_INITIALIZED=2000
+
+P: /devices/pci0000:00/0000:00:1f.2/ata1/host0/target0:0:0/0:0:0:0/block/sda/sda1
+N: sda1
+S: disk/by-uuid/eggs
+G: systemd
+I: 3000
+E: DEVNAME=/dev/sda1
+E: DEVPATH=/devices/pci0000:00/0000:00:1f.2/ata1/host0/target0:0:0/0:0:0:0/block/sda/sda1
+E: DEVTYPE=partition
+E: ID_FS_TYPE=ext4
+E: MAJOR=8
+E: MINOR=1
+E: SUBSYSTEM=block
+
+P: /devices/virtual/net/lo
+E: DEVPATH=/devices/virtual/net/lo
+E: IFINDEX=1
+E: INTERFACE=lo
+E: SUBSYSTEM=net
+
+P: /devices/virtual/mem/null
+N: null
+E: DEVNAME=/dev/null
+E: DEVPATH=/devices/virtual/mem/null
+E: MAJOR=1
+E: MINOR=3
+E: SUBSYSTEM=mem
+"""
+
+
+DISK = ('/sys/devices/pci0000:00/0000:00:1f.2/ata1/host0/target0:0:0/'
+        '0:0:0:0/block/sda')
+PARTITION = DISK + '/sda1'
+CONTROLLER = '/sys/devices/pci0000:00/0000:00:1f.2'
+
+
+def pytest_funcarg__offline_context(request):
+    return Context(OfflineUdevLibrary(io.BytesIO(EXPORT_DB)))
+
+
+def sys_paths(devices):
+    return [device.sys_path for device in devices]
+
+
+def test_iter_export_db():
+    records = list(iter_export_db(io.BytesIO(EXPORT_DB)))
+    assert len(records) == 5
+    partition = records[2]
+    assert partition['P'].endswith(b'/sda1')
+    assert partition['N'] == b'sda1'
+    assert partition['I'] == b'3000'
+    assert partition['S'] == [b'disk/by-uuid/eggs']
+    assert partition['G'] == [b'systemd']
+    assert (b'ID_FS_TYPE', b'ext4') in partition['E']
+
+
+def test_iter_export_db_without_trailing_blank_line():
+    records = list(iter_export_db([b'P: /devices/spam\n',
+                                   b'E: SUBSYSTEM=eggs']))
+    assert records == [{'P': b'/devices/spam', 'S': [], 'G': [],
+                        'E': [(b'SUBSYSTEM', b'eggs')]}]
+
+
+def test_iter_export_db_empty():
+    assert list(iter_export_db([b'\n', b'\n'])) == []
+
+
+def test_len():
+    assert len(OfflineUdevLibrary(io.BytesIO(EXPORT_DB))) == 5
+
+
+def test_device(offline_context):
+    device = Device.from_sys_path(offline_context, DISK)
+    assert device.sys_path == DISK
+    assert device.sys_name == 'sda'
+    assert device.sys_number is None
+    assert device.subsystem == 'block'
+    assert device.device_type == 'disk'
+    assert device.device_node == '/dev/sda'
+    assert device.device_number == 2048
+    assert device['ID_BUS'] == 'ata'
+    assert sorted(device.device_links) == [
+        '/dev/disk/by-id/ata-SPAM', '/dev/disk/by-path/pci-0000:00:1f.2-ata-1']
+    assert list(device.tags) == ['systemd']
+    assert device.is_initialized
+    assert device.time_since_initialized.total_seconds() == 0
+    assert list(device.attributes) == []
+    assert device.attributes.get('size') is None
+
+
+def test_device_parent(offline_context):
+    partition = Device.from_sys_path(offline_context, PARTITION)
+    assert partition.sys_number == '1'
+    assert partition.parent.sys_path == DISK
+    # the ancestors between disk and controller are not part of the dump
+    assert partition.parent.parent.sys_path == CONTROLLER
+    assert partition.parent.parent.parent is None
+    assert partition.parent.parent.driver == 'ahci'
+
+
+def test_device_missing(offline_context):
+    with pytest.raises(DeviceNotFoundAtPathError):
+        Device.from_sys_path(offline_context, '/sys/devices/spam')
+
+
+def test_device_from_name(offline_context):
+    assert Device.from_name(offline_context, 'block', 'sda1').sys_path == \
+        PARTITION
+    assert Device.from_name(offline_context, 'net', 'lo').sys_name == 'lo'
+
+
+def test_device_from_device_number(offline_context):
+    device = Device.from_device_number(offline_context, 'block', 2049)
+    assert device.sys_path == PARTITION
+    device = Device.from_device_number(offline_context, 'char',
+                                       Device.from_name(
+                                           offline_context, 'mem',
+                                           'null').device_number)
+    assert device.device_node == '/dev/null'
+
+
+def test_is_initialized(offline_context):
+    assert Device.from_sys_path(offline_context, PARTITION).is_initialized
+    assert not Device.from_name(offline_context, 'net', 'lo').is_initialized
+
+
+def test_list_devices(offline_context):
+    assert len(list(offline_context.list_devices())) == 5
+
+
+def test_list_devices_subsystem(offline_context):
+    devices = offline_context.list_devices(subsystem='block')
+    assert sys_paths(devices) == [DISK, PARTITION]
+    devices = offline_context.list_devices().match_subsystem('block',
+                                                             nomatch=True)
+    assert len(list(devices)) == 3
+    devices = offline_context.list_devices(subsystem='m*')
+    assert [d.sys_name for d in devices] == ['null']
+
+
+def test_list_devices_property(offline_context):
+    devices = offline_context.list_devices(DEVTYPE='partition')
+    assert sys_paths(devices) == [PARTITION]
+    devices = offline_context.list_devices(ID_FS_TYPE='ext*')
+    assert sys_paths(devices) == [PARTITION]
+    devices = offline_context.list_devices(subsystem='block',
+                                           DEVTYPE='spam')
+    assert sys_paths(devices) == []
+
+
+def test_list_devices_tag(offline_context):
+    devices = offline_context.list_devices(tag='systemd')
+    assert sys_paths(devices) == [DISK, PARTITION]
+    devices = offline_context.list_devices(subsystem='net', tag='systemd')
+    assert sys_paths(devices) == []
+
+
+def test_list_devices_sys_name(offline_context):
+    devices = offline_context.list_devices(sys_name='sda*')
+    assert sys_paths(devices) == [DISK, PARTITION]
+
+
+def test_list_devices_parent(offline_context):
+    disk = Device.from_sys_path(offline_context, DISK)
+    devices = offline_context.list_devices(parent=disk)
+    assert sys_paths(devices) == [DISK, PARTITION]
+    controller = Device.from_sys_path(offline_context, CONTROLLER)
+    devices = offline_context.list_devices(parent=controller,
+                                           DEVTYPE='disk')
+    assert sys_paths(devices) == [DISK]
+
+
+def test_list_devices_is_initialized(offline_context):
+    devices = offline_context.list_devices().match_is_initialized()
+    assert 'lo' not in [d.sys_name for d in devices]
+
+
+def test_load_stream():
+    context = load(io.BytesIO(EXPORT_DB), dev_path='/spam')
+    assert context.device_path == '/spam'
+    device = Device.from_sys_path(context, PARTITION)
+    assert list(device.device_links) == ['/spam/disk/by-uuid/eggs']
+
+
+def test_load_file(tmpdir):
+    filename = tmpdir.join('udevdb')
+    filename.write(EXPORT_DB, mode='wb')
+    context = load(str(filename))
+    assert len(list(context.list_devices(subsystem='block'))) == 2
+
+
+def test_load_gzip(tmpdir):
+    filename = str(tmpdir.join('udevdb.gz'))
+    with gzip.open(filename, 'wb') as stream:
+        stream.write(EXPORT_DB)
+    context = load(filename)
+    assert len(list(context.list_devices(subsystem='block'))) == 2
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 Sebastian Wiesner <lunaryorn@gmail.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+import gc
+from threading import Thread
+
+import pytest
+import mock
+
+from pyudev import Context
+from pyudev.pool import (ContextPool, PoolStatistics, ForeignThreadError,
+                         thread_context)
+
+
+def run_in_thread(target):
+    results = []
+
+    def run():
+        try:
+            results.append(target())
+        except Exception as error:
+            results.append(error)
+    thread = Thread(target=run)
+    thread.start()
+    thread.join()
+    return results[0]
+
+
+def test_get():
+    pool = ContextPool()
+    context = pool.get()
+    assert isinstance(context, Context)
+    assert pool.get() is context
+    assert pool.statistics == PoolStatistics(1, 1, 1)
+
+
+def test_get_other_thread():
+    pool = ContextPool()
+    context = pool.get()
+    assert run_in_thread(pool.get) is not context
+    gc.collect()
+    assert pool.statistics == PoolStatistics(2, 0, 1)
+
+
+def test_get_after_fork():
+    pool = ContextPool()
+    context = pool.get()
+    with mock.patch('os.getpid', return_value=-1):
+        assert pool.get() is not context
+    assert pool.statistics.created == 2
+
+
+def test_thread_context():
+    assert thread_context() is thread_context()
+    assert run_in_thread(thread_context) is not thread_context()
+
+
+def test_check_threads():
+    pool = ContextPool(check_threads=True)
+    context = pool.get()
+    device = next(iter(context.list_devices()), None)
+    if device is None:
+        pytest.skip('no devices')
+    assert device.sys_path
+    error = run_in_thread(lambda: device.sys_path)
+    assert isinstance(error, ForeignThreadError)
+    error = run_in_thread(lambda: list(context.list_devices()))
+    assert isinstance(error, ForeignThreadError)
+    assert run_in_thread(lambda: list(pool.get().list_devices()))
+
+
+def test_check_threads_release_in_other_thread():
+    pool = ContextPool(check_threads=True)
+    devices = [list(pool.get().list_devices())]
+    # releasing objects in another thread is allowed
+    run_in_thread(devices.pop)
+    gc.collect()
+
+
+def test_no_check_threads():
+    pool = ContextPool()
+    devices = list(pool.get().list_devices())
+    assert run_in_thread(lambda: [d.sys_path for d in devices]) == [
+        d.sys_path for d in devices]
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 Sebastian Wiesner <lunaryorn@gmail.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+import pytest
+import mock
+
+from pyudev.query import (Subsystem, SysName, Property, Attribute, HasTag,
+                          And, Or, Not, plan)
+
+
+def make_device(subsystem='block', sys_name='sda', properties=None,
+                attributes=None, tags=()):
+    properties = properties or {}
+    attributes = attributes or {}
+    return mock.Mock(subsystem=subsystem, sys_name=sys_name, tags=list(tags),
+                     get=properties.get,
+                     attributes=mock.Mock(get=attributes.get))
+
+
+class TestPredicates(object):
+
+    def test_equality(self):
+        device = make_device(properties={'ID_BUS': 'usb'})
+        assert (Property('ID_BUS') == 'usb')(device)
+        assert not (Property('ID_BUS') == 'ata')(device)
+        assert not (Property('ID_TYPE') == 'disk')(device)
+
+    def test_inequality_missing(self):
+        device = make_device()
+        assert (Property('ID_BUS') != 'usb')(device)
+
+    def test_bool_operand(self):
+        device = make_device(properties={'ID_CDROM': '1'})
+        assert (Property('ID_CDROM') == True)(device)
+
+    def test_numeric(self):
+        device = make_device(attributes={'size': b'2048'})
+        assert (Attribute('size') > 1024)(device)
+        assert not (Attribute('size') <= 1024)(device)
+        assert not (Attribute('removable') >= 0)(device)
+
+    def test_numeric_invalid(self):
+        device = make_device(properties={'ID_BUS': 'usb'})
+        assert not (Property('ID_BUS') > 0)(device)
+
+    def test_numeric_operand_not_a_number(self):
+        for operand in ('1024', b'1024', None):
+            with pytest.raises(TypeError):
+                Attribute('size') > operand
+        with pytest.raises(TypeError):
+            Property('MAJOR') <= '8'
+
+    def test_string_matches(self):
+        device = make_device(sys_name='sda1')
+        assert SysName().glob('sd?1')(device)
+        assert SysName().startswith('sd')(device)
+        assert SysName().matches(r'\d$')(device)
+        assert not SysName().startswith('hd')(device)
+
+    def test_exists(self):
+        device = make_device(properties={'ID_BUS': 'usb'})
+        assert Property('ID_BUS').exists()(device)
+        assert not Property('ID_TYPE').exists()(device)
+
+    def test_has_tag(self):
+        assert HasTag('seat')(make_device(tags=['seat']))
+        assert not HasTag('seat')(make_device())
+
+    def test_combinators(self):
+        device = make_device(subsystem='net')
+        assert ((Subsystem() == 'block') | (Subsystem() == 'net'))(device)
+        assert not ((Subsystem() == 'net') & (SysName() == 'eth0'))(device)
+        assert (~(Subsystem() == 'block'))(device)
+        assert (~HasTag('seat'))(device)
+
+    def test_invert_comparison(self):
+        assert ~(Property('ID_BUS') == 'usb') == (Property('ID_BUS') != 'usb')
+        assert ~(Property('ID_BUS') != 'usb') == (Property('ID_BUS') == 'usb')
+        assert ~HasTag('seat') == Not(HasTag('seat'))
+
+    def test_and_ordered_by_cost(self):
+        predicate = (Attribute('size') > 0) & (Subsystem() == 'block')
+        assert isinstance(predicate, And)
+        assert predicate.operands == (Subsystem() == 'block',
+                                      Attribute('size') > 0)
+
+    def test_and_flattened(self):
+        predicate = (Subsystem() == 'block') & (HasTag('a') & HasTag('b'))
+        assert len(predicate.operands) == 3
+
+
+class TestPlan(object):
+
+    def test_push_down_equality(self):
+        result = plan((Subsystem() == 'block') & (Property('DEVTYPE') ==
+                                                  'disk'))
+        assert [(m, a) for m, a, _ in result.pushed] == [
+            ('match_subsystem', ('block',)),
+            ('match_property', ('DEVTYPE', 'disk'))]
+        assert result.residual is None
+
+    def test_push_down_same_kind_once(self):
+        result = plan((Property('DEVTYPE') == 'disk') &
+                      (Property('ID_BUS') == 'usb'))
+        assert len(result.pushed) == 1
+        assert result.residual is not None
+
+    def test_push_down_already_matched_kind(self):
+        result = plan(Subsystem() == 'block', pushed_kinds=['subsystem'])
+        assert not result.pushed
+        assert result.residual == (Subsystem() == 'block')
+
+    def test_push_down_negation(self):
+        result = plan(~(Subsystem() == 'block') & (Subsystem() != 'net') &
+                      (Attribute('ro') != '1'))
+        assert [(m, a) for m, a, _ in result.pushed] == [
+            ('match_subsystem', ('block', True)),
+            ('match_subsystem', ('net', True)),
+            ('match_attribute', ('ro', '1', True))]
+        assert result.residual is None
+
+    def test_push_down_or_same_kind(self):
+        result = plan((Subsystem() == 'block') | (Subsystem() == 'net'))
+        assert [(m, a) for m, a, _ in result.pushed] == [
+            ('match_subsystem', ('block',)),
+            ('match_subsystem', ('net',))]
+        assert result.residual is None
+
+    def test_no_push_down_or_across_kinds(self):
+        predicate = (Subsystem() == 'block') | (SysName() == 'eth0')
+        result = plan(predicate)
+        assert not result.pushed
+        assert result.residual == predicate
+
+    def test_no_push_down_glob_characters(self):
+        predicate = Property('ID_SERIAL') == 'foo*'
+        result = plan(predicate)
+        assert not result.pushed
+        assert result.residual == predicate
+
+    def test_push_down_glob(self):
+        result = plan(SysName().glob('sd*'))
+        assert [(m, a) for m, a, _ in result.pushed] == [
+            ('match_sys_name', ('sd*',))]
+
+    def test_residual_negated_property(self):
+        predicate = Property('ID_BUS') != 'usb'
+        result = plan(predicate)
+        assert not result.pushed
+        assert result.residual == predicate
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 Sebastian Wiesner <lunaryorn@gmail.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+import pickle
+
+import pytest
+import mock
+
+from pyudev import Device, records
+from pyudev.records import DeviceRecord, process_context
+
+
+def pytest_funcarg__device(request):
+    context = request.getfuncargvalue('context')
+    device = next(iter(context.list_devices(subsystem='block')), None)
+    if device is None:
+        pytest.skip('no block devices')
+    return device
+
+
+def pytest_funcarg__record(request):
+    device = request.getfuncargvalue('device')
+    return DeviceRecord.from_device(device, attributes=['dev', 'spam'])
+
+
+def test_from_device(device, record):
+    assert record.sys_path == device.sys_path
+    assert record.device_path == device.device_path
+    assert record.subsystem == device.subsystem
+    assert record.sys_name == device.sys_name
+    assert record.device_type == device.device_type
+    assert record.driver == device.driver
+    assert record.device_node == device.device_node
+    assert record.properties == dict(device)
+    assert record.get('DEVPATH') == device.device_path
+    assert record.get('NON_EXISTING_PROPERTY', 'eggs') == 'eggs'
+    assert record.attributes == {'dev': device.attributes.get('dev'),
+                                 'spam': None}
+
+
+def test_pickle(record):
+    restored = pickle.loads(pickle.dumps(record, pickle.HIGHEST_PROTOCOL))
+    assert restored == record
+    assert restored.properties == record.properties
+    assert restored._device is None
+
+
+def test_device(context, device, record):
+    rehydrated = record.device(context)
+    assert rehydrated == device
+    assert rehydrated.context is context
+    assert record.device(context) is rehydrated
+
+
+def test_device_process_context(record):
+    device = record.device()
+    assert device.context is process_context()
+    assert record.device() is device
+
+
+def test_process_context_after_fork():
+    context = process_context()
+    assert process_context() is context
+    with mock.patch('os.getpid', return_value=records.os.getpid() + 1):
+        assert process_context() is not context
+
+
+def test_device_after_fork(record):
+    device = record.device()
+    with mock.patch('os.getpid', return_value=records.os.getpid() + 1):
+        assert record.device() is not device
+
+
+def test_enumerator_records(context):
+    devices = list(context.list_devices(subsystem='block'))
+    device_records = list(context.list_devices(subsystem='block').records(
+        attributes=['size']))
+    assert [r.sys_path for r in device_records] == [
+        d.sys_path for d in devices]
+    for device, record in zip(devices, device_records):
+        assert record.attributes['size'] == device.attributes.get('size')
+        assert isinstance(record.device(), Device)
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 Sebastian Wiesner <lunaryorn@gmail.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+import errno
+from array import array
+
+import pytest
+import mock
+
+from pyudev import Device
+from pyudev import sampling
+from pyudev.sampling import (Sample, BlockStatsSampler,
+                             NetworkCounterSampler, AttributeWatcher, delta)
+
+
+def pytest_funcarg__block_sampler(request):
+    context = request.getfuncargvalue('context')
+    sampler = BlockStatsSampler(context)
+    request.addfinalizer(sampler.close)
+    return sampler
+
+
+def test_delta():
+    previous = Sample(1.0, ('/a', '/b'), [array(str('Q'), [1, 2]),
+                                          array(str('Q'), [3, 4])])
+    current = Sample(3.0, ('/c', '/a'), [array(str('Q'), [0, 0]),
+                                         array(str('Q'), [5, 1])])
+    result = delta(previous, current)
+    assert result.interval == 2.0
+    assert result.device_paths == ('/a',)
+    assert list(result.deltas[0]) == [4, 1]
+    assert list(result.rates[0]) == [2.0, 0.5]
+
+
+class TestBlockStatsSampler(object):
+
+    def test_device_paths(self, context, block_sampler):
+        devices = context.list_devices(subsystem='block')
+        assert block_sampler.device_paths == tuple(
+            d.device_path for d in devices)
+
+    def test_device_type(self, context):
+        sampler = BlockStatsSampler(context, device_type='disk')
+        try:
+            for device_path in sampler.device_paths:
+                device = Device.from_path(context, device_path)
+                assert device.device_type == 'disk'
+        finally:
+            sampler.close()
+
+    def test_sample(self, block_sampler):
+        sample = block_sampler.sample()
+        assert sample.device_paths == block_sampler.device_paths
+        assert len(sample.values) == len(sample.device_paths)
+        for row in sample.values:
+            assert len(row) == len(BlockStatsSampler.fields)
+
+    def test_sample_vanished_device(self, block_sampler):
+        device_paths = block_sampler.device_paths
+        if not device_paths:
+            pytest.skip('no block devices')
+        vanished = block_sampler._devices[0].files[0]
+        read_into = sampling._read_into
+
+        def read_or_fail(f, buffer):
+            if f is vanished:
+                raise EnvironmentError(errno.ENODEV, 'No such device')
+            return read_into(f, buffer)
+
+        with mock.patch.object(sampling, '_read_into', read_or_fail):
+            sample = block_sampler.sample()
+        assert sample.device_paths == device_paths[1:]
+        assert len(sample.values) == len(device_paths) - 1
+        assert block_sampler.device_paths == device_paths[1:]
+        assert vanished.closed
+
+    def test_sample_delta(self, block_sampler):
+        result = delta(block_sampler.sample(), block_sampler.sample())
+        assert result.interval >= 0
+        assert result.device_paths == block_sampler.device_paths
+
+    def test_handle_event_remove(self, block_sampler):
+        device_paths = block_sampler.device_paths
+        if not device_paths:
+            pytest.skip('no block devices')
+        event = mock.Mock(action='remove', device_path=device_paths[0])
+        block_sampler.handle_event(event)
+        assert block_sampler.device_paths == device_paths[1:]
+
+    def test_handle_event_add(self, context, block_sampler):
+        device = next(iter(context.list_devices(subsystem='block')), None)
+        if device is None:
+            pytest.skip('no block devices')
+        block_sampler.remove_device(device.device_path)
+        assert device.device_path not in block_sampler.device_paths
+        with mock.patch.object(type(device), 'action', 'add'):
+            block_sampler.handle_event(device)
+        assert device.device_path in block_sampler.device_paths
+        assert not block_sampler.add_device(device)
+
+
+class TestNetworkCounterSampler(object):
+
+    def test_counters(self, context):
+        sampler = NetworkCounterSampler(context, counters=['rx_bytes'])
+        try:
+            assert sampler.fields == ('rx_bytes',)
+            sample = sampler.sample()
+            for device_path, row in zip(sample.device_paths, sample.values):
+                device = Device.from_path(context, device_path)
+                assert row[0] == int(device.attributes['statistics/rx_bytes'])
+        finally:
+            sampler.close()
+
+    def test_handle_event_move(self, context):
+        device = next(iter(context.list_devices(subsystem='net')), None)
+        if device is None:
+            pytest.skip('no network interfaces')
+        sampler = NetworkCounterSampler(context, devices=[])
+        try:
+            old_path = '/devices/virtual/net/spam'
+            sampler._devices.append(mock.Mock(device_path=old_path))
+            event = mock.MagicMock(action='move', device_path=device.device_path,
+                                   sys_path=device.sys_path,
+                                   subsystem='net')
+            event.get.return_value = old_path
+            sampler.handle_event(event)
+            event.get.assert_called_with('DEVPATH_OLD')
+            assert sampler.device_paths == (device.device_path,)
+        finally:
+            sampler.close()
+
+
+def pytest_funcarg__block_device(request):
+    context = request.getfuncargvalue('context')
+    device = next(iter(context.list_devices(subsystem='block')), None)
+    if device is None:
+        pytest.skip('no block devices')
+    return device
+
+
+def pytest_funcarg__watcher(request):
+    watcher = AttributeWatcher()
+    request.addfinalizer(watcher.close)
+    return watcher
+
+
+class TestAttributeWatcher(object):
+
+    def test_watch(self, watcher, block_device):
+        value = watcher.watch(block_device, 'size', converter=int)
+        assert value == block_device.attributes.asint('size')
+        assert watcher.watched == [(block_device.device_path, 'size')]
+
+    def test_watch_missing_attribute(self, watcher, block_device):
+        with pytest.raises(EnvironmentError):
+            watcher.watch(block_device, 'no_such_attribute')
+        assert not watcher.watched
+
+    def test_unwatch(self, watcher, block_device):
+        watcher.watch(block_device, 'size')
+        assert watcher.unwatch(block_device.device_path, 'size')
+        assert not watcher.unwatch(block_device.device_path, 'size')
+        assert not watcher.watched
+
+    def test_poll_timeout(self, watcher, block_device):
+        watcher.watch(block_device, 'size')
+        assert watcher.poll(timeout=0) == []
+
+    def test_poll_interval_unchanged(self, watcher, block_device):
+        watcher.watch(block_device, 'size', interval=0)
+        assert watcher.poll(timeout=0.01) == []
+
+    def test_poll_interval_changed(self, watcher, block_device):
+        watcher.watch(block_device, 'size', interval=0)
+        watched = watcher._by_key[(block_device.device_path, 'size')]
+        watched.value = b'spam'
+        changes = watcher.poll(timeout=0.01)
+        assert changes == [(block_device.device_path, 'size',
+                            block_device.attributes['size'])]
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 Sebastian Wiesner <lunaryorn@gmail.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+import hashlib
+
+import pytest
+import mock
+
+from pyudev.snapshot import Snapshot, SnapshotDiff, diff
+
+
+def pytest_funcarg__snapshot(request):
+    context = request.getfuncargvalue('context')
+    return Snapshot.take(context.list_devices())
+
+
+def test_take(context, snapshot):
+    devices = list(context.list_devices())
+    assert len(snapshot) == len(devices)
+    assert sorted(snapshot) == sorted(d.device_path for d in devices)
+    for device in devices:
+        digest, hashes = snapshot.entry(device.device_path)
+        assert pytest.is_unicode_string(digest)
+        assert len(digest) == 40
+        assert [name for name, _ in hashes] == sorted(device)
+
+
+def test_take_matches(context):
+    snapshot = Snapshot.take(context.list_devices(subsystem='block'))
+    for device in context.list_devices(subsystem='block'):
+        assert device.device_path in snapshot
+    assert '/devices/not/existing' not in snapshot
+
+
+def test_diff_unchanged(context, snapshot):
+    assert diff(snapshot, Snapshot.take(context.list_devices())) == \
+        SnapshotDiff([], [], {})
+
+
+def test_diff():
+    old = Snapshot({'/devices/a': ('1', (('A', 1), ('B', 2))),
+                    '/devices/b': ('2', (('A', 1),)),
+                    '/devices/c': ('3', (('A', 1), ('B', 2), ('C', 3)))})
+    new = Snapshot({'/devices/b': ('2', (('A', 1),)),
+                    '/devices/c': ('4', (('A', 1), ('B', 5), ('D', 3))),
+                    '/devices/d': ('5', ())})
+    assert diff(old, new) == SnapshotDiff(['/devices/d'], ['/devices/a'],
+                                          {'/devices/c': ['B', 'C', 'D']})
+
+
+def test_save_load(snapshot, tmpdir):
+    filename = str(tmpdir.join('snapshot.json'))
+    snapshot.save(filename)
+    loaded = Snapshot.load(filename)
+    assert loaded == snapshot
+    assert diff(snapshot, loaded) == SnapshotDiff([], [], {})
+    assert not tmpdir.join('snapshot.json.tmp').check()
+
+
+def test_load_invalid(tmpdir):
+    filename = tmpdir.join('snapshot.json')
+    filename.write('{"version": 0}')
+    with pytest.raises(ValueError):
+        Snapshot.load(str(filename))
+
+
+def test_load_md5_format(tmpdir):
+    # version 1 snapshots have MD5 digests, which never match current ones
+    filename = tmpdir.join('snapshot.json')
+    filename.write('{"version": 1, "devices": {}}')
+    with pytest.raises(ValueError):
+        Snapshot.load(str(filename))
+
+
+def test_take_without_md5(context):
+    with mock.patch.object(hashlib, 'md5', side_effect=ValueError(
+            'disabled for FIPS')):
+        Snapshot.take(context.list_devices(subsystem='block'))
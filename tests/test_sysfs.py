@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 Sebastian Wiesner <lunaryorn@gmail.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+import os
+
+import pytest
+import mock
+
+from pyudev import Context, Device, Monitor
+from pyudev.sysfs import SysfsUdevLibrary
+from pyudev.database import DatabaseIndex
+
+
+def make_device(root, device_path, subsystem, uevent='', attributes=None):
+    directory = root.join('sys', device_path).ensure(dir=True)
+    directory.join('uevent').write(uevent)
+    for name, value in (attributes or {}).items():
+        directory.join(name).write(value)
+    subsystem_directory = root.join('sys', 'class', subsystem).ensure(
+        dir=True)
+    directory.join('subsystem').mksymlinkto(subsystem_directory)
+    subsystem_directory.join(directory.basename).mksymlinkto(directory)
+    return directory
+
+
+def pytest_funcarg__root(request):
+    root = request.getfuncargvalue('tmpdir')
+    disk = make_device(
+        root, 'devices/virtual/block/loop0', 'block',
+        'MAJOR=7\nMINOR=0\nDEVNAME=loop0\nDEVTYPE=disk\n',
+        {'size': '2048\n', 'ro': '0\n'})
+    power = disk.join('power').ensure(dir=True)
+    power.join('control').write('auto\n')
+    power.join('nested').ensure(dir=True).join('spam').write('eggs\n')
+    make_device(root, 'devices/virtual/block/loop0/loop0p1', 'block',
+                'MAJOR=259\nMINOR=0\nDEVNAME=loop0p1\nDEVTYPE=partition\n',
+                {'size': '1024\n'})
+    make_device(root, 'devices/virtual/net/lo', 'net',
+                'INTERFACE=lo\nIFINDEX=1\n', {'mtu': '65536\n'})
+    root.join('sys', 'dev', 'block').ensure(dir=True).join(
+        '7:0').mksymlinkto(disk)
+    data = root.join('run', 'udev', 'data').ensure(dir=True)
+    data.join('b7:0').write('S:disk/by-id/loop-spam\nE:ID_SPAM=eggs\n'
+                            'G:systemd\nI:1000\n')
+    data.join('n1').write('E:ID_NET_NAME=lo\n')
+    return root
+
+
+def pytest_funcarg__sysfs_context(request):
+    root = request.getfuncargvalue('root')
+    return Context(SysfsUdevLibrary(sys_path=str(root.join('sys')),
+                                    dev_path='/dev',
+                                    run_path=str(root.join('run', 'udev'))))
+
+
+def test_paths(root, sysfs_context):
+    assert sysfs_context.sys_path == str(root.join('sys'))
+    assert sysfs_context.device_path == '/dev'
+    assert sysfs_context.run_path == str(root.join('run', 'udev'))
+
+
+def test_device(root, sysfs_context):
+    sys_path = str(root.join('sys', 'devices/virtual/block/loop0'))
+    device = Device.from_sys_path(sysfs_context, sys_path)
+    assert device.sys_path == sys_path
+    assert device.device_path == '/devices/virtual/block/loop0'
+    assert device.subsystem == 'block'
+    assert device.sys_name == 'loop0'
+    assert device.sys_number == '0'
+    assert device.device_type == 'disk'
+    assert device.device_node == '/dev/loop0'
+    assert device.device_number == os.makedev(7, 0)
+    assert device.driver is None
+    assert device.is_initialized
+    assert list(device.device_links) == ['/dev/disk/by-id/loop-spam']
+    assert list(device.tags) == ['systemd']
+    assert 'systemd' in device.tags
+    assert device['ID_SPAM'] == 'eggs'
+    assert device['DEVNAME'] == '/dev/loop0'
+    assert device['DEVPATH'] == '/devices/virtual/block/loop0'
+    assert device['TAGS'] == ':systemd:'
+    assert device.attributes['size'] == b'2048'
+    assert device.attributes['subsystem'] == b'block'
+    assert 'missing' not in device.attributes
+    assert device.attributes['power/control'] == b'auto'
+    # like libudev, list links, uevent and direct subdirectories, but not
+    # children
+    assert sorted(device.attributes) == ['power/control', 'ro', 'size',
+                                         'subsystem', 'uevent']
+
+
+def test_device_through_link(root, sysfs_context):
+    device = Device.from_sys_path(
+        sysfs_context, str(root.join('sys', 'class', 'block', 'loop0')))
+    assert device.device_path == '/devices/virtual/block/loop0'
+
+
+def test_device_not_existing(root, sysfs_context):
+    with pytest.raises(LookupError):
+        Device.from_sys_path(sysfs_context,
+                             str(root.join('sys', 'devices', 'spam')))
+    with pytest.raises(LookupError):
+        Device.from_sys_path(sysfs_context, '/outside/of/sysfs')
+
+
+def test_device_not_initialized(sysfs_context):
+    device = Device.from_name(sysfs_context, 'block', 'loop0p1')
+    assert not device.is_initialized
+    assert list(device.tags) == []
+
+
+def test_from_name(sysfs_context):
+    device = Device.from_name(sysfs_context, 'net', 'lo')
+    assert device.device_path == '/devices/virtual/net/lo'
+    assert device['ID_NET_NAME'] == 'lo'
+    with pytest.raises(LookupError):
+        Device.from_name(sysfs_context, 'net', 'eth0')
+
+
+def test_from_device_number(sysfs_context):
+    device = Device.from_device_number(sysfs_context, 'block',
+                                       os.makedev(7, 0))
+    assert device.sys_name == 'loop0'
+    with pytest.raises(LookupError):
+        Device.from_device_number(sysfs_context, 'char', os.makedev(7, 0))
+
+
+def test_parent(sysfs_context):
+    partition = Device.from_name(sysfs_context, 'block', 'loop0p1')
+    assert partition.parent.sys_name == 'loop0'
+    assert partition.find_parent('block', 'disk').sys_name == 'loop0'
+    assert partition.find_parent('net') is None
+    # /devices/virtual/block has no uevent file
+    assert partition.parent.parent is None
+
+
+def test_list_devices(sysfs_context):
+    names = lambda devices: [d.sys_name for d in devices]
+    assert names(sysfs_context.list_devices()) == ['loop0', 'loop0p1', 'lo']
+    assert names(sysfs_context.list_devices(subsystem='net')) == ['lo']
+    assert names(sysfs_context.list_devices().match_subsystem(
+        'net', nomatch=True)) == ['loop0', 'loop0p1']
+    assert names(sysfs_context.list_devices(DEVTYPE='disk')) == ['loop0']
+    assert names(sysfs_context.list_devices(tag='systemd')) == ['loop0']
+    assert names(sysfs_context.list_devices(sys_name='loop*')) == [
+        'loop0', 'loop0p1']
+    assert names(sysfs_context.list_devices().match_attribute(
+        'size', '1024')) == ['loop0p1']
+    assert names(sysfs_context.list_devices().match_is_initialized()) == [
+        'loop0', 'lo']
+
+
+def test_list_devices_not_cached(root, sysfs_context):
+    assert sysfs_context.list_devices().match_attribute(
+        'size', '2048').count() == 1
+    sys_path = root.join('sys', 'devices/virtual/block/loop0')
+    sys_path.join('size').write('4096\n')
+    device = Device.from_sys_path(sysfs_context, str(sys_path))
+    assert device.attributes['size'] == b'4096'
+
+
+def test_list_devices_parent(sysfs_context):
+    disk = Device.from_name(sysfs_context, 'block', 'loop0')
+    devices = sysfs_context.list_devices().match_parent(disk)
+    assert [d.sys_name for d in devices] == ['loop0', 'loop0p1']
+
+
+def test_monitor(sysfs_context):
+    with pytest.raises(EnvironmentError):
+        Monitor.from_netlink(sysfs_context)
+
+
+def test_database_index(root):
+    run_path = str(root.join('run', 'udev'))
+    index = DatabaseIndex(run_path)
+    try:
+        context = Context(SysfsUdevLibrary(
+            sys_path=str(root.join('sys')), run_path=run_path,
+            database=index))
+        device = Device.from_name(context, 'block', 'loop0')
+        assert device['ID_SPAM'] == 'eggs'
+        root.join('run', 'udev', 'data', 'b7:0').write('E:ID_SPAM=ham\n')
+        device = Device.from_name(context, 'block', 'loop0')
+        assert device['ID_SPAM'] == 'ham'
+        assert [d.sys_name for d in context.list_devices(ID_SPAM='ham')] == [
+            'loop0']
+    finally:
+        index.close()
+
+
+def test_database_index_not_watched(root):
+    run_path = str(root.join('run', 'udev'))
+    index = DatabaseIndex(run_path, watch=False)
+    context = Context(SysfsUdevLibrary(
+        sys_path=str(root.join('sys')), run_path=run_path, database=index))
+    root.join('run', 'udev', 'data', 'b7:0').write('E:ID_SPAM=ham\n')
+    with mock.patch.object(index, 'refresh') as refresh:
+        device = Device.from_name(context, 'block', 'loop0p1')
+        assert device.parent['ID_SPAM'] == 'eggs'
+        assert not refresh.called
+    assert [d.sys_name for d in context.list_devices(ID_SPAM='ham')] == [
+        'loop0']
+
+
+def test_backend_name():
+    context = Context('sysfs')
+    assert isinstance(context._libudev, SysfsUdevLibrary)
+    assert context.sys_path == '/sys'
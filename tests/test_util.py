@@ -110,6 +110,38 @@ def test_udev_list_iterate_mock():
             ('spam', 'eggs'), ('foo', 'bar')]
 
 
+def test_udev_list_entries_no_entry():
+    assert _util.udev_list_entries(Mock(), None) == []
+
+
+def test_udev_list_entries_mock():
+    libudev = Mock(name='libudev')
+    items = [('spam', 'eggs'), ('foo', 'bar')]
+    with pytest.libudev_list(libudev, 'udev_enumerate_get_list_entry', items):
+        udev_list = libudev.udev_enumerate_get_list_entry()
+        assert _util.udev_list_entries(libudev, udev_list) == [
+            ('spam', 'eggs'), ('foo', 'bar')]
+
+
+def test_udev_list_names_mock():
+    libudev = Mock(name='libudev')
+    items = [('spam', 'eggs'), ('foo', 'bar')]
+    with pytest.libudev_list(libudev, 'udev_enumerate_get_list_entry', items):
+        udev_list = libudev.udev_enumerate_get_list_entry()
+        assert _util.udev_list_names(libudev, udev_list) == ['spam', 'foo']
+        assert not libudev.udev_list_entry_get_value.called
+
+
+def test_udev_list_length_mock():
+    libudev = Mock(name='libudev')
+    items = ['spam', 'eggs', 'foo']
+    with pytest.libudev_list(libudev, 'udev_enumerate_get_list_entry', items):
+        udev_list = libudev.udev_enumerate_get_list_entry()
+        assert _util.udev_list_length(libudev, udev_list) == 3
+        assert not libudev.udev_list_entry_get_name.called
+    assert _util.udev_list_length(Mock(), None) == 0
+
+
 def raise_valueerror():
     raise ValueError('from function')
 